@@ -8,7 +8,7 @@ import logging
 import re
 import yaml
 from ..core.model_interface import LLMClient
-from ..core.genre_classifier import GenreClassifier
+from ..core.genre_classifier import get_default_classifier
 from ..core.villain_analysis import VillainAnalyzer, SevenDeadlySins
 from ..core.hook_model import HookModelGuide, HookStage
 
@@ -27,7 +27,7 @@ class AnalystAgent:
         """
         self.llm_client = llm_client
         self.prompt_template = prompt_template or self._default_prompt_template()
-        self.genre_classifier = GenreClassifier()
+        self.genre_classifier = get_default_classifier()
         self.villain_analyzer = VillainAnalyzer()
         self.hook_guide = HookModelGuide()
         
@@ -27,50 +27,52 @@ class ArchivistAgent:
         Returns:
             归档结果，包含冲突列表
         """
-        conflicts = []
-        
-        # 归档世界观设定
-        if "世界观设定" in extracted_info and extracted_info["世界观设定"]:
-            worldview = extracted_info["世界观设定"]
-            # 检查冲突
-            worldview_conflicts = self.memory_manager.check_consistency(
-                worldview, "worldview"
-            )
-            conflicts.extend(worldview_conflicts)
+        # 批量模式：本块的所有更新在内存中完成，退出时每个记忆体文件只写盘一次
+        with self.memory_manager.batch():
+            conflicts = []
             
-            if not worldview_conflicts:
-                # 无冲突，更新记忆体
-                self.memory_manager.update_worldview(worldview, merge=True)
-                logger.info(f"世界观设定已归档 (块: {chunk_id})")
-        
-        # 归档人物信息
-        if "人物信息" in extracted_info and extracted_info["人物信息"]:
-            characters = extracted_info["人物信息"]
-            for char_name, char_info in characters.items():
+            # 归档世界观设定
+            if "世界观设定" in extracted_info and extracted_info["世界观设定"]:
+                worldview = extracted_info["世界观设定"]
                 # 检查冲突
-                char_conflicts = self.memory_manager.check_consistency(
-                    {char_name: char_info}, "character"
+                worldview_conflicts = self.memory_manager.check_consistency(
+                    worldview, "worldview"
                 )
-                conflicts.extend(char_conflicts)
-                
-                if not char_conflicts:
+                conflicts.extend(worldview_conflicts)
+            
+                if not worldview_conflicts:
                     # 无冲突，更新记忆体
-                    self.memory_manager.update_character(char_name, char_info, merge=True)
-                    logger.info(f"人物信息已归档: {char_name} (块: {chunk_id})")
-        
-        # 归档伏笔
-        if "伏笔线索" in extracted_info and extracted_info["伏笔线索"]:
-            foreshadowings = extracted_info["伏笔线索"]
-            for foreshadowing in foreshadowings:
-                if isinstance(foreshadowing, dict):
-                    self.memory_manager.add_foreshadowing(foreshadowing)
-                    logger.info(f"伏笔已归档 (块: {chunk_id})")
-        
-        return {
-            "archived": True,
-            "conflicts": conflicts,
-            "chunk_id": chunk_id
-        }
+                    self.memory_manager.update_worldview(worldview, merge=True)
+                    logger.info(f"世界观设定已归档 (块: {chunk_id})")
+            
+            # 归档人物信息
+            if "人物信息" in extracted_info and extracted_info["人物信息"]:
+                characters = extracted_info["人物信息"]
+                for char_name, char_info in characters.items():
+                    # 检查冲突
+                    char_conflicts = self.memory_manager.check_consistency(
+                        {char_name: char_info}, "character"
+                    )
+                    conflicts.extend(char_conflicts)
+                
+                    if not char_conflicts:
+                        # 无冲突，更新记忆体
+                        self.memory_manager.update_character(char_name, char_info, merge=True)
+                        logger.info(f"人物信息已归档: {char_name} (块: {chunk_id})")
+            
+            # 归档伏笔
+            if "伏笔线索" in extracted_info and extracted_info["伏笔线索"]:
+                foreshadowings = extracted_info["伏笔线索"]
+                for foreshadowing in foreshadowings:
+                    if isinstance(foreshadowing, dict):
+                        self.memory_manager.add_foreshadowing(foreshadowing)
+                        logger.info(f"伏笔已归档 (块: {chunk_id})")
+            
+            return {
+                "archived": True,
+                "conflicts": conflicts,
+                "chunk_id": chunk_id
+            }
     
     def resolve_conflicts(self, conflicts: List[str], resolution: str = "manual"):
         """
@@ -7,7 +7,7 @@ from typing import Dict, List, Optional
 import logging
 from ..core.model_interface import LLMClient
 from ..core.frankentexts import FrankentextsManager
-from ..core.genre_classifier import GenreClassifier, GenreCategory
+from ..core.genre_classifier import GenreCategory, get_default_classifier
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +24,7 @@ class ExtractorAgent:
         """
         self.llm_client = llm_client
         self.frankentexts_manager = frankentexts_manager
-        self.genre_classifier = GenreClassifier()
+        self.genre_classifier = get_default_classifier()
         self.prompt_templates = self._load_prompt_templates()
     
     def extract(self, scanned_chunk: Dict, novel_type: str = "通用") -> Dict:
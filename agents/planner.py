@@ -9,7 +9,7 @@ import yaml
 from pathlib import Path
 from ..core.model_interface import LLMClient
 from ..core.memory_manager import MemoryManager
-from ..core.genre_classifier import GenreClassifier
+from ..core.genre_classifier import get_default_classifier
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +26,7 @@ class PlannerAgent:
         """
         self.llm_client = llm_client
         self.memory_manager = memory_manager
-        self.genre_classifier = GenreClassifier()
+        self.genre_classifier = get_default_classifier()
         self.template_dir = Path(__file__).parent.parent / "outline_templates"
     
     def analyze_structure(self, all_chunks: List[Dict], novel_type: str = "通用") -> Dict:
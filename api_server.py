@@ -29,6 +29,7 @@ from core.rate_limiter import get_rate_limiter
 from core.workflow_storage import get_workflow_storage
 from core.performance_monitor import get_performance_monitor
 from core.data_exporter import DataExporter, create_exporter
+from core.file_processor import get_file_processor
 from core.exceptions import (
     NovelExtractorError,
     ConfigurationError,
@@ -508,14 +509,12 @@ async def process_novel(
 async def get_config():
     """获取当前配置信息"""
     try:
-        import yaml
         config_path = os.getenv("CONFIG_PATH", "config.yaml")
         
-        # 读取配置文件
+        # 读取配置文件（在线程中执行，不阻塞事件循环）
         config_data = {}
         if os.path.exists(config_path):
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config_data = yaml.safe_load(f) or {}
+            config_data = await get_file_processor().aread_yaml(config_path, use_cache=False)
         
         # 获取模型配置（隐藏敏感信息）
         model_config = config_data.get("model", {})
@@ -575,14 +574,13 @@ async def get_config():
 async def update_config(config: Dict):
     """更新配置信息（仅更新非敏感配置）"""
     try:
-        import yaml
+        file_processor = get_file_processor()
         config_path = os.getenv("CONFIG_PATH", "config.yaml")
         
         # 读取现有配置
         config_data = {}
         if os.path.exists(config_path):
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config_data = yaml.safe_load(f) or {}
+            config_data = await file_processor.aread_yaml(config_path, use_cache=False)
         
         # 更新配置（不允许更新 API 密钥等敏感信息）
         if "topology" in config:
@@ -597,8 +595,7 @@ async def update_config(config: Dict):
             config_data["corpus_dir"] = config["corpus_dir"]
         
         # 保存配置
-        with open(config_path, 'w', encoding='utf-8') as f:
-            yaml.dump(config_data, f, allow_unicode=True, default_flow_style=False)
+        await file_processor.awrite_yaml(config_path, config_data)
         
         # 重新加载提取器
         global extractor
@@ -1135,11 +1132,10 @@ async def export_data(
         if result_files:
             # 从最新的结果文件加载
             latest_file = max(result_files, key=lambda p: p.stat().st_mtime)
-            with open(latest_file, 'r', encoding='utf-8') as f:
-                result_data = json.load(f)
-                chunk_results = result_data.get('chunkResults', result_data.get('chunk_results', []))
-                outline = result_data.get('outline')
-                workflow_summary = result_data.get('workflow')
+            result_data = await get_file_processor().aread_json(latest_file, use_cache=False)
+            chunk_results = result_data.get('chunkResults', result_data.get('chunk_results', []))
+            outline = result_data.get('outline')
+            workflow_summary = result_data.get('workflow')
         
         # 生成基础文件名
         base_filename = f"export_{output_path.name}"
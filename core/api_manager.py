@@ -179,9 +179,10 @@ class APIPool:
             stats.error_count += 1
             stats.consecutive_errors += 1
     
-    def get_cache_key(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """生成缓存键"""
-        content = f"{system_prompt or ''}|{prompt}"
+    def get_cache_key(self, prompt: str, system_prompt: Optional[str] = None,
+                      provider: Optional[APIProvider] = None, model: Optional[str] = None) -> str:
+        """生成缓存键（包含提供商和模型，不同模型的回答不会互相命中）"""
+        content = f"{provider.value if provider else ''}|{model or ''}|{system_prompt or ''}|{prompt}"
         return hashlib.md5(content.encode()).hexdigest()
     
     def get_cached(self, cache_key: str) -> Optional[str]:
@@ -230,6 +231,15 @@ class UniversalAPIClient:
     def __init__(self, api_pool: APIPool):
         self.api_pool = api_pool
         self.session_cache = {}
+        # 提供商侧提示词前缀缓存统计（命中的输入token数）
+        self.prompt_cache_stats = {"requests": 0, "hits": 0, "cached_tokens": 0}
+    
+    def _record_prompt_cache_usage(self, cached_tokens: Optional[int]):
+        """记录提供商返回的前缀缓存命中情况"""
+        self.prompt_cache_stats["requests"] += 1
+        if cached_tokens:
+            self.prompt_cache_stats["hits"] += 1
+            self.prompt_cache_stats["cached_tokens"] += cached_tokens
     
     async def _get_http_client(self):
         """获取HTTP客户端"""
@@ -246,7 +256,8 @@ class UniversalAPIClient:
                           provider: Optional[APIProvider] = None, 
                           model: Optional[str] = None,
                           use_cache: bool = True,
-                          max_retries: int = 3) -> str:
+                          max_retries: int = 3,
+                          prompt_cache_key: Optional[str] = None) -> str:
         """
         发送请求（自动选择最佳API）
         
@@ -257,13 +268,14 @@ class UniversalAPIClient:
             model: 指定模型（可选）
             use_cache: 是否使用缓存
             max_retries: 最大重试次数
+            prompt_cache_key: 系统提示词指纹，用于启用提供商侧前缀缓存（可选）
         
         Returns:
             API响应文本
         """
         # 检查缓存
         if use_cache:
-            cache_key = self.api_pool.get_cache_key(prompt, system_prompt)
+            cache_key = self.api_pool.get_cache_key(prompt, system_prompt, provider, model)
             cached = self.api_pool.get_cached(cache_key)
             if cached:
                 logger.debug("使用缓存结果")
@@ -283,7 +295,8 @@ class UniversalAPIClient:
             try:
                 # 调用对应的API
                 result = await self._call_api(
-                    api_name, config, prompt, system_prompt, model
+                    api_name, config, prompt, system_prompt, model,
+                    prompt_cache_key=prompt_cache_key
                 )
                 
                 # 更新统计
@@ -315,14 +328,17 @@ class UniversalAPIClient:
     
     async def _call_api(self, api_name: str, config: APIConfig, 
                        prompt: str, system_prompt: Optional[str],
-                       model: Optional[str]) -> str:
+                       model: Optional[str],
+                       prompt_cache_key: Optional[str] = None) -> str:
         """调用具体API"""
         model = model or config.model
         
         if config.provider == APIProvider.OPENAI:
-            return await self._call_openai(config, prompt, system_prompt, model)
+            return await self._call_openai(config, prompt, system_prompt, model,
+                                           prompt_cache_key=prompt_cache_key)
         elif config.provider == APIProvider.ANTHROPIC:
-            return await self._call_anthropic(config, prompt, system_prompt, model)
+            return await self._call_anthropic(config, prompt, system_prompt, model,
+                                              prompt_cache_key=prompt_cache_key)
         elif config.provider == APIProvider.GEMINI:
             return await self._call_gemini(config, prompt, system_prompt, model)
         elif config.provider == APIProvider.DEEPSEEK:
@@ -343,7 +359,8 @@ class UniversalAPIClient:
             raise ValueError(f"不支持的API提供商: {config.provider}")
     
     async def _call_openai(self, config: APIConfig, prompt: str, 
-                          system_prompt: Optional[str], model: str) -> str:
+                          system_prompt: Optional[str], model: str,
+                          prompt_cache_key: Optional[str] = None) -> str:
         """调用OpenAI API"""
         try:
             from openai import AsyncOpenAI
@@ -354,17 +371,27 @@ class UniversalAPIClient:
                 messages.append({"role": "system", "content": system_prompt})
             messages.append({"role": "user", "content": prompt})
             
+            request_kwargs = {}
+            if prompt_cache_key and config.provider == APIProvider.OPENAI:
+                # 相同系统提示词路由到同一前缀缓存（兼容OpenAI的其他提供商不传）
+                request_kwargs["extra_body"] = {"prompt_cache_key": prompt_cache_key}
+            
             response = await client.chat.completions.create(
                 model=model,
                 messages=messages,
-                timeout=config.timeout
+                timeout=config.timeout,
+                **request_kwargs
             )
+            if prompt_cache_key:
+                details = getattr(response.usage, "prompt_tokens_details", None)
+                self._record_prompt_cache_usage(getattr(details, "cached_tokens", None))
             return response.choices[0].message.content
         except ImportError:
             raise ImportError("请安装openai库: pip install openai")
     
     async def _call_anthropic(self, config: APIConfig, prompt: str,
-                             system_prompt: Optional[str], model: str) -> str:
+                             system_prompt: Optional[str], model: str,
+                             prompt_cache_key: Optional[str] = None) -> str:
         """调用Anthropic (Claude) API"""
         try:
             import anthropic
@@ -372,6 +399,13 @@ class UniversalAPIClient:
             
             messages = [{"role": "user", "content": prompt}]
             system = system_prompt if system_prompt else None
+            if system and prompt_cache_key:
+                # 标记系统提示词为可缓存前缀
+                system = [{
+                    "type": "text",
+                    "text": system_prompt,
+                    "cache_control": {"type": "ephemeral"}
+                }]
             
             response = await client.messages.create(
                 model=model,
@@ -380,6 +414,10 @@ class UniversalAPIClient:
                 system=system,
                 timeout=config.timeout
             )
+            if prompt_cache_key:
+                self._record_prompt_cache_usage(
+                    getattr(response.usage, "cache_read_input_tokens", None)
+                )
             return response.content[0].text
         except ImportError:
             raise ImportError("请安装anthropic库: pip install anthropic")
@@ -66,6 +66,14 @@ class LRUCache:
     def size(self) -> int:
         """获取缓存大小"""
         return len(self.cache)
+    
+    def __contains__(self, key: str) -> bool:
+        """检查键是否在缓存中（不更新访问顺序）"""
+        return key in self.cache
+    
+    def __len__(self) -> int:
+        """获取缓存大小"""
+        return len(self.cache)
 
 
 class CacheManager:
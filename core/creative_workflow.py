@@ -5,9 +5,17 @@
 
 from __future__ import annotations
 
+import atexit
+import io
 import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
 from typing import Any, Dict, List, Optional
 
+from core.workflow_cache import WorkflowCache
 from tools.ai_detection_evader import AIDetectionEvader
 from tools.chapter_title_generator import ChapterTitleGenerator
 from tools.character_consistency_checker import CharacterConsistencyChecker
@@ -22,6 +30,92 @@ from tools.worldview_conflict_detector import WorldviewConflictDetector
 
 logger = logging.getLogger(__name__)
 
+# 平台名称/取值 -> 枚举 的索引，模块加载时构建一次
+_PLATFORM_INDEX: Dict[str, Platform] = {
+    **{platform.name: platform for platform in Platform},
+    **{platform.value: platform for platform in Platform},
+}
+
+@dataclass(frozen=True)
+class WorkflowConfig:
+    """创作工作流配置（初始化时解析一次）"""
+    platform: Optional[str] = None
+    protagonist: str = "主角"
+    location: str = ""
+    time: str = "某日"
+    opening_style: str = "auto"
+    title_style: str = "auto"
+    title_tone: Optional[str] = None
+    emotion_pattern: str = "wave"
+    ending_style: str = "happy_ending"
+    worldview_patch: Optional[Dict[str, Any]] = None
+    ai_strategy: str = "all"
+    ai_intensity: str = "medium"
+    detection_sample_chars: int = 3000
+    max_preview_chars: int = 800
+    parallel_chapter_threshold: int = 64
+    no_cache: bool = False
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "WorkflowConfig":
+        """从配置字典构建，忽略未知键"""
+        values = {field.name: config[field.name] for field in fields(cls) if field.name in config}
+        for name in ("detection_sample_chars", "max_preview_chars", "parallel_chapter_threshold"):
+            if name in values:
+                values[name] = int(values[name])
+        return cls(**values)
+
+
+# 模块级共享进程池：首次需要时创建，之后各次调用复用，进程退出时关闭
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """获取共享进程池（惰性创建）；单核机器返回None"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            workers = os.cpu_count() or 1
+            if workers < 2:
+                return None
+            # 不使用fork：父进程持有线程与已打开的句柄时fork不安全
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _process_pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        return _process_pool
+
+
+def _discard_process_pool(pool: ProcessPoolExecutor):
+    """丢弃已损坏的共享进程池，下次调用时重新创建"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False)
+
+
+@atexit.register
+def _shutdown_process_pool():
+    """进程退出时关闭共享进程池"""
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+# 工作进程内复用的情感评分器（每个进程各自实例化一次）
+_worker_emotion_optimizer: Optional[EmotionCurveOptimizer] = None
+
+
+def _score_emotion_chapter(content: str) -> float:
+    """进程池任务：计算单章情感分数"""
+    global _worker_emotion_optimizer
+    if _worker_emotion_optimizer is None:
+        _worker_emotion_optimizer = EmotionCurveOptimizer()
+    return _worker_emotion_optimizer.score_chapter(content)
+
 
 class CreativeWorkflowPipeline:
     """串联ALL_TOOLS_GUIDE中的工具，形成可编排的创作工作流"""
@@ -43,8 +137,18 @@ class CreativeWorkflowPipeline:
         self.ai_evader = AIDetectionEvader()
         self.hook_optimizer = HookOptimizer()
 
-        self.platform_target = self._resolve_platform(self.config.get("platform"))
-        self.preview_chars = int(self.config.get("max_preview_chars", 800))
+        self.cfg = WorkflowConfig.from_dict(self.config)
+        self.platform_target = self._resolve_platform(self.cfg.platform)
+
+        # 确定性工具结果缓存（按内容哈希），no_cache 时关闭
+        self.cache: Optional[WorkflowCache] = None
+        if not self.cfg.no_cache:
+            cache_dir = getattr(memory_manager, "output_dir", None)
+            if cache_dir:
+                self.cache = WorkflowCache(str(cache_dir))
+            else:
+                # 不在当前目录下隐式创建缓存文件
+                logger.debug("记忆体管理器没有输出目录，创作工作流缓存已关闭")
 
     def run(
         self,
@@ -59,45 +163,51 @@ class CreativeWorkflowPipeline:
 
         logger.debug("创作工作流: 开始执行，chunks=%d", len(chunks))
 
+        # 统一归一化分块，后续各流程只读取 content 字段
+        chapters = self._build_chapter_payload(chunks)
+
         creation_flow = self._safe_call(
             "creation_flow",
-            lambda: self._run_creation_flow(chunks, novel_type, outline),
+            lambda: self._run_creation_flow(chapters, novel_type, outline),
             default={},
         )
         optimization_flow = self._safe_call(
             "optimization_flow",
-            lambda: self._run_optimization_flow(chunks, novel_type, agent_results),
+            lambda: self._run_optimization_flow(chapters, novel_type, agent_results),
             default={},
         )
         detection_flow = self._safe_call(
             "detection_flow",
-            lambda: self._run_detection_flow(chunks),
+            lambda: self._run_detection_flow(chapters),
             default={},
         )
 
-        return {
+        summary = {
             "creation_flow": creation_flow,
             "optimization_flow": optimization_flow,
             "detection_flow": detection_flow,
         }
+        if self.cache is not None:
+            summary["cache_stats"] = self.cache.get_stats()
+        return summary
 
     # ------------------------------------------------------------------
     # Creation flow
     # ------------------------------------------------------------------
     def _run_creation_flow(
-        self, chunks: List[Dict[str, Any]], novel_type: str, outline: Optional[Dict[str, Any]]
+        self, chapters: List[Dict[str, Any]], novel_type: str, outline: Optional[Dict[str, Any]]
     ) -> Dict[str, Any]:
-        first_chapter = self._extract_chapter_text(chunks, 0)
+        first_chapter = chapters[0]["content"] if chapters else ""
         if not first_chapter:
             return {}
 
         context = {
-            "protagonist": self.config.get("protagonist", "主角"),
-            "location": self.config.get("location", ""),
-            "time": self.config.get("time", "某日"),
+            "protagonist": self.cfg.protagonist,
+            "location": self.cfg.location,
+            "time": self.cfg.time,
             "sample_text": first_chapter[:1000],
         }
-        opening_style = self.config.get("opening_style", "auto")
+        opening_style = self.cfg.opening_style
         opening = self.opening_generator.generate_opening(
             novel_type=novel_type, opening_style=opening_style, context=context
         )
@@ -105,8 +215,8 @@ class CreativeWorkflowPipeline:
         title_details = self.title_generator.generate_title(
             first_chapter,
             chapter_number=1,
-            style=self.config.get("title_style", "auto"),
-            tone=self.config.get("title_tone"),
+            style=self.cfg.title_style,
+            tone=self.cfg.title_tone,
             return_details=True,
         )
         selected_title = (title_details.get("titles") or ["临时标题"])[0]
@@ -114,12 +224,17 @@ class CreativeWorkflowPipeline:
             selected_title, novel_type=novel_type, return_details=True
         )
 
-        hook_report = self.hook_optimizer.optimize_chapter(first_chapter, 1)
+        hook_report = self._cached(
+            "hook_optimizer.optimize_chapter",
+            first_chapter,
+            {"chapter_number": 1},
+            lambda: self.hook_optimizer.optimize_chapter(first_chapter, 1),
+        )
 
         platform_payload = {
             "title": selected_title,
             "description": opening.get("full_opening", ""),
-            "chapters": self._build_chapter_payload(chunks[:3]),
+            "chapters": chapters[:3],
             "novel_type": novel_type,
             "outline": outline or {},
         }
@@ -143,25 +258,24 @@ class CreativeWorkflowPipeline:
     # Optimization flow
     # ------------------------------------------------------------------
     def _run_optimization_flow(
-        self, chunks: List[Dict[str, Any]], novel_type: str, agent_results: Optional[List[Dict[str, Any]]]
+        self, chapters: List[Dict[str, Any]], novel_type: str, agent_results: Optional[List[Dict[str, Any]]]
     ) -> Dict[str, Any]:
-        chapters = self._build_chapter_payload(chunks)
         if not chapters:
             return {}
 
-        target_pattern = self.config.get("emotion_pattern", "wave")
-        emotion_dashboard = self.emotion_optimizer.get_curve_dashboard(chapters, target_pattern=target_pattern)
+        target_pattern = self.cfg.emotion_pattern
+        emotion_dashboard = self._build_emotion_dashboard(chapters, target_pattern)
 
         character_issues = self.character_checker.check_all_characters()
         current_chapter = chapters[-1].get("chapter") or len(chapters)
         foreshadow_report = self.foreshadowing_reminder.get_reminder_report(current_chapter)
         foreshadow_schedule = self.foreshadowing_reminder.schedule_followups(current_chapter)
 
-        ending_style = self.config.get("ending_style", "happy_ending")
+        ending_style = self.cfg.ending_style
         ending_source = chapters[-3:] if len(chapters) >= 3 else chapters
         ending_analysis = self.ending_optimizer.optimize_ending(ending_source, novel_type, ending_style)
 
-        worldview_patch = self.config.get("worldview_patch")
+        worldview_patch = self.cfg.worldview_patch
         worldview_conflicts = (
             self.worldview_detector.generate_conflict_report(worldview_patch)
             if worldview_patch
@@ -181,20 +295,25 @@ class CreativeWorkflowPipeline:
     # ------------------------------------------------------------------
     # Detection flow
     # ------------------------------------------------------------------
-    def _run_detection_flow(self, chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
-        sample_text = self._collect_sample_text(chunks)
+    def _run_detection_flow(self, chapters: List[Dict[str, Any]]) -> Dict[str, Any]:
+        sample_text = self._collect_sample_text(chapters)
         if not sample_text:
             return {}
 
-        ai_likelihood = self.ai_evader.analyze_ai_likelihood(sample_text)
-        evasion_strategy = self.config.get("ai_strategy", "all")
-        evasion_intensity = self.config.get("ai_intensity", "medium")
+        ai_likelihood = self._cached(
+            "ai_evader.analyze_ai_likelihood",
+            sample_text,
+            None,
+            lambda: self.ai_evader.analyze_ai_likelihood(sample_text),
+        )
+        evasion_strategy = self.cfg.ai_strategy
+        evasion_intensity = self.cfg.ai_intensity
         evaded_text = self.ai_evader.evade_detection(
             sample_text, strategy=evasion_strategy, intensity=evasion_intensity
         )
 
-        preview = evaded_text[: self.preview_chars]
-        if len(evaded_text) > self.preview_chars:
+        preview = evaded_text[: self.cfg.max_preview_chars]
+        if len(evaded_text) > self.cfg.max_preview_chars:
             preview += "…"
 
         return {
@@ -214,11 +333,58 @@ class CreativeWorkflowPipeline:
             logger.exception("创作工作流阶段 %s 执行失败: %s", name, exc)
             return default
 
-    def _extract_chapter_text(self, chunks: List[Dict[str, Any]], index: int) -> str:
-        if index >= len(chunks):
-            return ""
-        chunk = chunks[index]
-        return chunk.get("text") or chunk.get("content", "")
+    def _build_emotion_dashboard(self, chapters: List[Dict[str, Any]], target_pattern: str) -> Dict[str, Any]:
+        """生成情感曲线仪表盘（逐章分数按章节内容缓存，汇总部分每次重新计算）"""
+        chapter_scores = self._score_emotion_chapters([chapter["content"] for chapter in chapters])
+        return self.emotion_optimizer.get_curve_dashboard(
+            chapters, target_pattern=target_pattern, chapter_scores=chapter_scores
+        )
+
+    def _score_emotion_chapters(self, contents: List[str]) -> List[float]:
+        """
+        逐章计算情感分数：按各章内容命中缓存，只重新评分修改过的章节；
+        待评分章节较多时分发到进程池
+        """
+        tool_name = "emotion_optimizer.score_chapter"
+        scores: List[Optional[float]] = [None] * len(contents)
+        keys: List[Optional[str]] = [None] * len(contents)
+        if self.cache is not None:
+            for idx, content in enumerate(contents):
+                keys[idx] = WorkflowCache.make_key(tool_name, content)
+                scores[idx] = self.cache.get(keys[idx])
+
+        missing = [idx for idx, score in enumerate(scores) if score is None]
+        computed = None
+        if self.emotion_optimizer.PARALLELIZABLE and len(missing) > self.cfg.parallel_chapter_threshold:
+            computed = self._parallel_map_chapters(_score_emotion_chapter, [contents[idx] for idx in missing])
+        if computed is None:
+            computed = [self.emotion_optimizer.score_chapter(contents[idx]) for idx in missing]
+
+        for idx, score in zip(missing, computed):
+            scores[idx] = score
+            if self.cache is not None:
+                self.cache.set(keys[idx], score)
+        return scores
+
+    def _parallel_map_chapters(self, fn, items: List[Any]) -> Optional[List[Any]]:
+        """使用共享进程池按章节并行执行纯函数，失败时返回None由调用方串行回退"""
+        pool = _get_process_pool()
+        if pool is None:
+            return None
+        chunksize = max(1, len(items) // (4 * (os.cpu_count() or 1)))
+        try:
+            return list(pool.map(fn, items, chunksize=chunksize))
+        except Exception as exc:
+            logger.warning("进程池并行执行失败，回退为串行: %s", exc)
+            _discard_process_pool(pool)
+            return None
+
+    def _cached(self, tool_name: str, text: str, params: Optional[Dict[str, Any]], compute) -> Any:
+        """对确定性工具调用做内容哈希缓存；缓存关闭时直接计算"""
+        if self.cache is None:
+            return compute()
+        key = WorkflowCache.make_key(tool_name, text, params)
+        return self.cache.get_or_compute(key, compute)
 
     def _build_chapter_payload(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         payload = []
@@ -236,27 +402,30 @@ class CreativeWorkflowPipeline:
             )
         return payload
 
-    def _collect_sample_text(self, chunks: List[Dict[str, Any]]) -> str:
-        texts = []
-        total_chars = 0
-        max_chars = self.config.get("detection_sample_chars", 3000)
-        for chunk in chunks:
-            text = chunk.get("text") or chunk.get("content", "")
-            if not text:
-                continue
-            texts.append(text)
-            total_chars += len(text)
-            if total_chars >= max_chars:
+    def _collect_sample_text(self, chapters: List[Dict[str, Any]]) -> str:
+        # 只搬运前 max_chars 个字符（含分隔换行），与语料总量无关
+        buffer = io.StringIO()
+        remaining = self.cfg.detection_sample_chars
+        for index, chapter in enumerate(chapters):
+            if index:
+                if remaining <= 1:
+                    break
+                buffer.write("\n")
+                remaining -= 1
+            text = chapter["content"]
+            if len(text) >= remaining:
+                buffer.write(text[:remaining])
                 break
-        return "\n".join(texts)
+            buffer.write(text)
+            remaining -= len(text)
+        return buffer.getvalue()
 
     def _resolve_platform(self, platform_name: Optional[str]) -> Optional[Platform]:
         if not platform_name:
             return None
-        name_upper = platform_name.upper()
-        for platform in Platform:
-            if platform.name == name_upper or platform.value == platform_name:
-                return platform
+        platform = _PLATFORM_INDEX.get(platform_name.upper()) or _PLATFORM_INDEX.get(platform_name)
+        if platform is not None:
+            return platform
         logger.warning("未知平台 %s，已回退至 FANQIE", platform_name)
         return Platform.FANQIE
 
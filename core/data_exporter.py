@@ -3,35 +3,264 @@
 支持将处理结果导出为多种格式：JSON、CSV、Excel、Markdown、HTML等
 """
 
+import codecs
+import html
+import io
 import json
 import csv
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
-import yaml
 
 logger = logging.getLogger(__name__)
 
-try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
-    logger.warning("pandas未安装，Excel导出功能将不可用")
+# CSV导出写缓冲大小（字节）
+CSV_BUFFER_SIZE = 1024 * 1024
+
+# 默认HTML模板（正文前后两段，直接拼接正文，无需逐次格式化CSS）
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>小说语料提取结果</title>
+    <style>
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Microsoft YaHei', sans-serif;
+            max-width: 1200px;
+            margin: 0 auto;
+            padding: 20px;
+            line-height: 1.6;
+            color: #333;
+        }
+        h1 {
+            color: #2c3e50;
+            border-bottom: 3px solid #3498db;
+            padding-bottom: 10px;
+        }
+        h2 {
+            color: #34495e;
+            margin-top: 30px;
+        }
+        h3 {
+            color: #555;
+        }
+        table {
+            border-collapse: collapse;
+            width: 100%;
+            margin: 20px 0;
+        }
+        th, td {
+            border: 1px solid #ddd;
+            padding: 12px;
+            text-align: left;
+        }
+        th {
+            background-color: #3498db;
+            color: white;
+        }
+        tr:nth-child(even) {
+            background-color: #f2f2f2;
+        }
+        code {
+            background-color: #f4f4f4;
+            padding: 2px 6px;
+            border-radius: 3px;
+            font-family: 'Courier New', monospace;
+        }
+        pre {
+            background-color: #f4f4f4;
+            padding: 15px;
+            border-radius: 5px;
+            overflow-x: auto;
+        }
+    </style>
+</head>
+<body>
+"""
+HTML_TAIL = """
+</body>
+</html>"""
+
+
+def _render_chunk_results(chunk_results: List[Dict[str, Any]], out: io.StringIO):
+    """渲染文本块分析结果"""
+    out.write("\n## 文本块分析结果\n\n")
+    out.write(f"共 {len(chunk_results)} 个文本块\n\n")
+    for i, chunk in enumerate(chunk_results, 1):
+        out.write(f"### 文本块 {i}\n\n")
+        if 'title' in chunk:
+            out.write(f"**标题**: {chunk['title']}\n\n")
+        if 'summary' in chunk:
+            out.write(f"**摘要**: {chunk['summary']}\n\n")
+        if 'themes' in chunk:
+            themes = chunk['themes']
+            out.write(f"**主题**: {', '.join(themes) if isinstance(themes, list) else themes}\n\n")
+        if 'hookScore' in chunk:
+            out.write(f"**钩子分数**: {chunk['hookScore']}\n\n")
+        out.write("---\n\n")
+
+
+def _render_outline(outline: Any, out: io.StringIO):
+    """渲染剧情大纲"""
+    out.write(f"\n## 剧情大纲\n\n{outline}\n\n---\n\n")
+
+
+def _render_memories(memories: List[Dict[str, Any]], out: io.StringIO):
+    """渲染记忆体"""
+    out.write("\n## 记忆体\n\n")
+    for memory in memories:
+        if 'title' in memory:
+            out.write(f"### {memory['title']}\n\n")
+        if 'entries' in memory:
+            for entry in memory['entries']:
+                out.write(f"- {entry}\n")
+        out.write("\n")
+    out.write("---\n\n")
+
+
+def _render_workflow(workflow: Any, out: io.StringIO):
+    """渲染工作流信息"""
+    out.write("\n## 工作流信息\n\n")
+    if isinstance(workflow, dict):
+        for key, value in workflow.items():
+            out.write(f"**{key}**: {value}\n\n")
+    out.write("---\n\n")
+
+
+def _render_creative(creative: Any, out: io.StringIO):
+    """渲染创作输出"""
+    out.write("\n## 创作输出\n\n")
+    if isinstance(creative, dict):
+        for key, value in creative.items():
+            out.write(f"### {key}\n\n")
+            if isinstance(value, str):
+                out.write(f"{value}\n\n")
+            elif isinstance(value, dict):
+                for k, v in value.items():
+                    out.write(f"**{k}**: {v}\n\n")
+    out.write("---\n\n")
+
+
+# Markdown各章节：(候选数据键, 渲染函数)，按顺序输出，取第一个非空的键
+_MARKDOWN_SECTIONS = (
+    (('chunkResults', 'chunk_results'), _render_chunk_results),
+    (('outline',), _render_outline),
+    (('memories',), _render_memories),
+    (('workflow',), _render_workflow),
+    (('creative',), _render_creative),
+)
+
+
+def _html_text(value: Any) -> str:
+    """转义文本并保留换行"""
+    return html.escape(str(value)).replace('\n', '<br>\n')
 
-try:
-    from markdown import markdown
-    from markdown.extensions import tables, fenced_code
-    MARKDOWN_AVAILABLE = True
-except ImportError:
-    MARKDOWN_AVAILABLE = False
-    logger.warning("markdown未安装，部分Markdown功能可能受限")
+
+def _render_chunk_results_html(chunk_results: List[Dict[str, Any]], out: io.StringIO):
+    """渲染文本块分析结果（HTML）"""
+    out.write("<section>\n<h2>文本块分析结果</h2>\n")
+    out.write(f"<p>共 {len(chunk_results)} 个文本块</p>\n")
+    for i, chunk in enumerate(chunk_results, 1):
+        out.write(f"<h3>文本块 {i}</h3>\n")
+        if 'title' in chunk:
+            out.write(f"<p><strong>标题</strong>: {_html_text(chunk['title'])}</p>\n")
+        if 'summary' in chunk:
+            out.write(f"<p><strong>摘要</strong>: {_html_text(chunk['summary'])}</p>\n")
+        if 'themes' in chunk:
+            themes = chunk['themes']
+            themes = ', '.join(themes) if isinstance(themes, list) else themes
+            out.write(f"<p><strong>主题</strong>: {_html_text(themes)}</p>\n")
+        if 'hookScore' in chunk:
+            out.write(f"<p><strong>钩子分数</strong>: {_html_text(chunk['hookScore'])}</p>\n")
+        out.write("<hr>\n")
+    out.write("</section>\n")
+
+
+def _render_outline_html(outline: Any, out: io.StringIO):
+    """渲染剧情大纲（HTML）"""
+    out.write(f"<section>\n<h2>剧情大纲</h2>\n<p>{_html_text(outline)}</p>\n</section>\n<hr>\n")
+
+
+def _render_memories_html(memories: List[Dict[str, Any]], out: io.StringIO):
+    """渲染记忆体（HTML）"""
+    out.write("<section>\n<h2>记忆体</h2>\n")
+    for memory in memories:
+        if 'title' in memory:
+            out.write(f"<h3>{_html_text(memory['title'])}</h3>\n")
+        if 'entries' in memory:
+            out.write("<ul>\n")
+            for entry in memory['entries']:
+                out.write(f"<li>{_html_text(entry)}</li>\n")
+            out.write("</ul>\n")
+    out.write("</section>\n<hr>\n")
+
+
+def _render_workflow_html(workflow: Any, out: io.StringIO):
+    """渲染工作流信息（HTML）"""
+    out.write("<section>\n<h2>工作流信息</h2>\n")
+    if isinstance(workflow, dict):
+        for key, value in workflow.items():
+            out.write(f"<p><strong>{_html_text(key)}</strong>: {_html_text(value)}</p>\n")
+    out.write("</section>\n<hr>\n")
+
+
+def _render_creative_html(creative: Any, out: io.StringIO):
+    """渲染创作输出（HTML）"""
+    out.write("<section>\n<h2>创作输出</h2>\n")
+    if isinstance(creative, dict):
+        for key, value in creative.items():
+            out.write(f"<h3>{_html_text(key)}</h3>\n")
+            if isinstance(value, str):
+                out.write(f"<p>{_html_text(value)}</p>\n")
+            elif isinstance(value, dict):
+                for k, v in value.items():
+                    out.write(f"<p><strong>{_html_text(k)}</strong>: {_html_text(v)}</p>\n")
+    out.write("</section>\n<hr>\n")
+
+
+# HTML各章节，与 _MARKDOWN_SECTIONS 一一对应
+_HTML_SECTIONS = (
+    (('chunkResults', 'chunk_results'), _render_chunk_results_html),
+    (('outline',), _render_outline_html),
+    (('memories',), _render_memories_html),
+    (('workflow',), _render_workflow_html),
+    (('creative',), _render_creative_html),
+)
 
 
 class DataExporter:
     """数据导出器"""
     
+    # pandas / xlsxwriter 导入开销较大，首次使用时再加载（False 表示未安装）
+    _pd: Any = None
+    _xlsxwriter: Any = None
+    
+    @classmethod
+    def _get_pandas(cls):
+        """按需导入pandas，未安装时返回None"""
+        if cls._pd is None:
+            try:
+                import pandas as pd
+                cls._pd = pd
+            except ImportError:
+                cls._pd = False
+                logger.warning("pandas未安装，Excel导出功能将不可用")
+        return cls._pd or None
+    
+    @classmethod
+    def _get_xlsxwriter(cls):
+        """按需导入xlsxwriter，未安装时返回None"""
+        if cls._xlsxwriter is None:
+            try:
+                import xlsxwriter
+                cls._xlsxwriter = xlsxwriter
+            except ImportError:
+                cls._xlsxwriter = False
+        return cls._xlsxwriter or None
+    
     def __init__(self, output_dir: Union[str, Path] = "exports"):
         """
         初始化导出器
@@ -117,13 +346,24 @@ class DataExporter:
         fieldnames = sorted(fieldnames)
         
         # 写入CSV
-        with open(output_path, 'w', encoding='utf-8-sig', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
+        field_count = len(fieldnames)
+        
+        def iter_rows():
             for item in flattened_data:
-                # 确保所有字段都存在
-                row = {field: item.get(field, '') for field in fieldnames}
-                writer.writerow(row)
+                if len(item) == field_count:
+                    # 字段齐全的行直接按列取值
+                    yield [item[field] for field in fieldnames]
+                else:
+                    # 稀疏行补齐缺失字段
+                    yield [item.get(field, '') for field in fieldnames]
+        
+        # 二进制写入BOM后套一层大缓冲文本流，减少逐行编码与系统调用
+        with open(output_path, 'wb', buffering=CSV_BUFFER_SIZE) as raw:
+            raw.write(codecs.BOM_UTF8)
+            with io.TextIOWrapper(raw, encoding='utf-8', newline='', write_through=False) as f:
+                writer = csv.writer(f)
+                writer.writerow(fieldnames)
+                writer.writerows(iter_rows())
         
         logger.info(f"CSV导出完成: {output_path}")
         return output_path
@@ -143,8 +383,10 @@ class DataExporter:
         Returns:
             导出文件路径
         """
-        if not PANDAS_AVAILABLE:
-            raise ImportError("pandas未安装，无法导出Excel格式。请运行: pip install pandas openpyxl")
+        xlsxwriter = self._get_xlsxwriter()
+        pd = None if xlsxwriter is not None else self._get_pandas()
+        if xlsxwriter is None and pd is None:
+            raise ImportError("xlsxwriter/pandas未安装，无法导出Excel格式。请运行: pip install xlsxwriter")
         
         if filename is None:
             filename = f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -154,6 +396,11 @@ class DataExporter:
         
         output_path = self.output_dir / filename
         
+        if xlsxwriter is not None:
+            self._write_excel_streaming(xlsxwriter, output_path, data)
+            logger.info(f"Excel导出完成: {output_path}")
+            return output_path
+        
         with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
             for sheet_name, sheet_data in data.items():
                 if sheet_data:
@@ -168,6 +415,38 @@ class DataExporter:
         logger.info(f"Excel导出完成: {output_path}")
         return output_path
     
+    def _write_excel_streaming(self, xlsxwriter, output_path: Path, data: Dict[str, List[Dict[str, Any]]]):
+        """
+        使用xlsxwriter常量内存模式逐行写出工作表
+        
+        常量内存模式要求按行顺序写入，因此不经过pandas（其按列输出单元格）
+        """
+        options = {
+            'constant_memory': True,
+            'strings_to_urls': False,
+            'strings_to_formulas': False,
+        }
+        workbook = xlsxwriter.Workbook(str(output_path), options)
+        try:
+            for sheet_name, sheet_data in data.items():
+                worksheet = workbook.add_worksheet(sheet_name[:31])  # Excel工作表名限制31字符
+                if not sheet_data:
+                    continue
+                # 展平嵌套字典，列顺序与pandas一致（按首次出现顺序）
+                flattened_data = [self._flatten_dict(item) for item in sheet_data]
+                columns = list(dict.fromkeys(key for item in flattened_data for key in item))
+                worksheet.write_row(0, 0, [str(column) for column in columns])
+                for row_idx, item in enumerate(flattened_data, start=1):
+                    for col_idx, column in enumerate(columns):
+                        value = item.get(column)
+                        if value is None:
+                            continue
+                        if not isinstance(value, (str, int, float, bool)):
+                            value = str(value)
+                        worksheet.write(row_idx, col_idx, value)
+        finally:
+            workbook.close()
+    
     def export_markdown(
         self,
         data: Dict[str, Any],
@@ -193,80 +472,52 @@ class DataExporter:
         
         output_path = self.output_dir / filename
         
-        md_content = []
-        
-        # 标题
-        md_content.append("# 小说语料提取结果\n")
-        md_content.append(f"**导出时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        md_content.append("\n---\n")
-        
-        # 文本块结果
-        if 'chunkResults' in data or 'chunk_results' in data:
-            chunk_results = data.get('chunkResults') or data.get('chunk_results', [])
-            if chunk_results:
-                md_content.append("\n## 文本块分析结果\n\n")
-                md_content.append(f"共 {len(chunk_results)} 个文本块\n\n")
-                
-                for i, chunk in enumerate(chunk_results, 1):
-                    md_content.append(f"### 文本块 {i}\n\n")
-                    if 'title' in chunk:
-                        md_content.append(f"**标题**: {chunk['title']}\n\n")
-                    if 'summary' in chunk:
-                        md_content.append(f"**摘要**: {chunk['summary']}\n\n")
-                    if 'themes' in chunk:
-                        md_content.append(f"**主题**: {', '.join(chunk['themes']) if isinstance(chunk['themes'], list) else chunk['themes']}\n\n")
-                    if 'hookScore' in chunk:
-                        md_content.append(f"**钩子分数**: {chunk['hookScore']}\n\n")
-                    md_content.append("---\n\n")
-        
-        # 大纲
-        if 'outline' in data and data['outline']:
-            md_content.append("\n## 剧情大纲\n\n")
-            md_content.append(f"{data['outline']}\n\n")
-            md_content.append("---\n\n")
-        
-        # 记忆体
-        if 'memories' in data and data['memories']:
-            md_content.append("\n## 记忆体\n\n")
-            for memory in data['memories']:
-                if 'title' in memory:
-                    md_content.append(f"### {memory['title']}\n\n")
-                if 'entries' in memory:
-                    for entry in memory['entries']:
-                        md_content.append(f"- {entry}\n")
-                md_content.append("\n")
-            md_content.append("---\n\n")
-        
-        # 工作流信息
-        if 'workflow' in data and data['workflow']:
-            md_content.append("\n## 工作流信息\n\n")
-            workflow = data['workflow']
-            if isinstance(workflow, dict):
-                for key, value in workflow.items():
-                    md_content.append(f"**{key}**: {value}\n\n")
-            md_content.append("---\n\n")
-        
-        # 创作输出
-        if 'creative' in data and data['creative']:
-            md_content.append("\n## 创作输出\n\n")
-            creative = data['creative']
-            if isinstance(creative, dict):
-                for key, value in creative.items():
-                    md_content.append(f"### {key}\n\n")
-                    if isinstance(value, str):
-                        md_content.append(f"{value}\n\n")
-                    elif isinstance(value, dict):
-                        for k, v in value.items():
-                            md_content.append(f"**{k}**: {v}\n\n")
-            md_content.append("---\n\n")
-        
-        # 写入文件
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(''.join(md_content))
+            f.write(self._render_markdown(data))
         
         logger.info(f"Markdown导出完成: {output_path}")
         return output_path
     
+    def _render_markdown(self, data: Dict[str, Any]) -> str:
+        """
+        将导出数据渲染为Markdown文本
+        
+        Args:
+            data: 要导出的数据
+        
+        Returns:
+            Markdown文本
+        """
+        out = io.StringIO()
+        out.write("# 小说语料提取结果\n")
+        out.write(f"**导出时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        out.write("\n---\n")
+        for keys, render in _MARKDOWN_SECTIONS:
+            value = next((data[key] for key in keys if data.get(key)), None)
+            if value:
+                render(value, out)
+        return out.getvalue()
+    
+    def _render_html(self, data: Dict[str, Any]) -> str:
+        """
+        将导出数据直接渲染为HTML正文（不经过Markdown中间格式）
+        
+        Args:
+            data: 要导出的数据
+        
+        Returns:
+            HTML正文片段
+        """
+        out = io.StringIO()
+        out.write("<h1>小说语料提取结果</h1>\n")
+        out.write(f"<p><strong>导出时间</strong>: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>\n")
+        out.write("<hr>\n")
+        for keys, render in _HTML_SECTIONS:
+            value = next((data[key] for key in keys if data.get(key)), None)
+            if value:
+                render(value, out)
+        return out.getvalue()
+    
     def export_html(
         self,
         data: Dict[str, Any],
@@ -292,89 +543,13 @@ class DataExporter:
         
         output_path = self.output_dir / filename
         
-        # 生成Markdown内容
-        md_exporter = DataExporter(self.output_dir)
-        md_path = md_exporter.export_markdown(data, filename.replace('.html', '_temp.md'), include_metadata=False)
+        html_body = self._render_html(data)
         
-        # 读取Markdown内容
-        with open(md_path, 'r', encoding='utf-8') as f:
-            md_content = f.read()
-        
-        # 删除临时Markdown文件
-        md_path.unlink()
-        
-        # 转换为HTML
-        if MARKDOWN_AVAILABLE:
-            html_body = markdown(md_content, extensions=['tables', 'fenced_code'])
+        if template:
+            # 自定义模板沿用 str.format 的 {body} 占位符
+            html_content = template.format(body=html_body)
         else:
-            # 简单转换
-            html_body = md_content.replace('\n', '<br>\n')
-        
-        # HTML模板
-        html_template = template or """<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>小说语料提取结果</title>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Microsoft YaHei', sans-serif;
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 20px;
-            line-height: 1.6;
-            color: #333;
-        }}
-        h1 {{
-            color: #2c3e50;
-            border-bottom: 3px solid #3498db;
-            padding-bottom: 10px;
-        }}
-        h2 {{
-            color: #34495e;
-            margin-top: 30px;
-        }}
-        h3 {{
-            color: #555;
-        }}
-        table {{
-            border-collapse: collapse;
-            width: 100%;
-            margin: 20px 0;
-        }}
-        th, td {{
-            border: 1px solid #ddd;
-            padding: 12px;
-            text-align: left;
-        }}
-        th {{
-            background-color: #3498db;
-            color: white;
-        }}
-        tr:nth-child(even) {{
-            background-color: #f2f2f2;
-        }}
-        code {{
-            background-color: #f4f4f4;
-            padding: 2px 6px;
-            border-radius: 3px;
-            font-family: 'Courier New', monospace;
-        }}
-        pre {{
-            background-color: #f4f4f4;
-            padding: 15px;
-            border-radius: 5px;
-            overflow-x: auto;
-        }}
-    </style>
-</head>
-<body>
-{body}
-</body>
-</html>"""
-        
-        html_content = html_template.format(body=html_body)
+            html_content = HTML_HEAD + html_body + HTML_TAIL
         
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(html_content)
@@ -400,33 +575,35 @@ class DataExporter:
         if base_filename is None:
             base_filename = f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        results = {}
-        
-        # JSON
-        results['json'] = self.export_json(data, base_filename)
+        chunk_results = data.get('chunkResults') or data.get('chunk_results') or []
         
-        # CSV（如果有文本块结果）
-        if 'chunkResults' in data or 'chunk_results' in data:
-            chunk_results = data.get('chunkResults') or data.get('chunk_results', [])
+        # 各格式写入不同文件且互不依赖，并发执行；结果按固定格式顺序返回
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = {}
+            
+            # JSON
+            futures['json'] = executor.submit(self.export_json, data, base_filename)
+            
+            # CSV（如果有文本块结果）
             if chunk_results:
-                results['csv'] = self.export_csv(chunk_results, f"{base_filename}_chunks")
-        
-        # Excel（如果有多个数据表）
-        if 'chunkResults' in data or 'chunk_results' in data:
-            chunk_results = data.get('chunkResults') or data.get('chunk_results', [])
-            if chunk_results and PANDAS_AVAILABLE:
+                futures['csv'] = executor.submit(self.export_csv, chunk_results, f"{base_filename}_chunks")
+            
+            # Excel（如果有多个数据表）
+            if chunk_results and (self._get_xlsxwriter() is not None or self._get_pandas() is not None):
                 excel_data = {
                     '文本块结果': chunk_results,
                 }
                 if 'memories' in data and data['memories']:
                     excel_data['记忆体'] = data['memories']
-                results['excel'] = self.export_excel(excel_data, base_filename)
-        
-        # Markdown
-        results['markdown'] = self.export_markdown(data, base_filename)
-        
-        # HTML
-        results['html'] = self.export_html(data, base_filename)
+                futures['excel'] = executor.submit(self.export_excel, excel_data, base_filename)
+            
+            # Markdown
+            futures['markdown'] = executor.submit(self.export_markdown, data, base_filename)
+            
+            # HTML
+            futures['html'] = executor.submit(self.export_html, data, base_filename)
+            
+            results = {fmt: future.result() for fmt, future in futures.items()}
         
         return results
     
@@ -463,7 +640,7 @@ class DataExporter:
         if workflow_summary:
             data['workflow'] = workflow_summary
         
-        # 加载记忆体
+        # 加载记忆体（MemoryManager按文件签名缓存解析结果，文件未变时不会重复解析）
         memories = []
         
         worldview = memory_manager.load_worldview()
@@ -516,17 +693,24 @@ class DataExporter:
         Returns:
             展平后的字典
         """
-        items = []
-        for k, v in d.items():
-            new_key = f"{parent_key}{sep}{k}" if parent_key else k
-            if isinstance(v, dict):
-                items.extend(self._flatten_dict(v, new_key, sep=sep).items())
-            elif isinstance(v, list):
-                # 列表转换为字符串
-                items.append((new_key, ', '.join(str(item) for item in v)))
+        flattened = {}
+        # 显式栈代替递归，保持深度优先的字段顺序
+        stack = [(parent_key, iter(d.items()))]
+        while stack:
+            prefix, items = stack[-1]
+            for k, v in items:
+                new_key = f"{prefix}{sep}{k}" if prefix else k
+                if isinstance(v, dict):
+                    stack.append((new_key, iter(v.items())))
+                    break
+                elif isinstance(v, list):
+                    # 列表转换为字符串
+                    flattened[new_key] = ', '.join(str(item) for item in v)
+                else:
+                    flattened[new_key] = v
             else:
-                items.append((new_key, v))
-        return dict(items)
+                stack.pop()
+        return flattened
 
 
 def create_exporter(output_dir: Union[str, Path] = "exports") -> DataExporter:
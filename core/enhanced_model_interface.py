@@ -4,41 +4,125 @@
 """
 
 from typing import Optional, AsyncGenerator
+import asyncio
+import hashlib
+import json
 import logging
+import threading
 from .api_manager import (
     UniversalAPIClient, APIPool, APIConfig, APIProvider
 )
 from .model_interface import LLMClient
+from .cache_manager import LRUCache
+from .rate_limiter import LoopLocalRedis, RedisTokenBucket
 
 logger = logging.getLogger(__name__)
 
+# LiteLLM路由使用的模型前缀（月之暗面、零一万物和自定义API走OpenAI兼容协议）
+_LITELLM_PROVIDER_PREFIX = {
+    APIProvider.OPENAI: "openai",
+    APIProvider.ANTHROPIC: "anthropic",
+    APIProvider.GEMINI: "gemini",
+    APIProvider.DEEPSEEK: "deepseek",
+    APIProvider.COHERE: "cohere",
+    APIProvider.MOONSHOT: "openai",
+    APIProvider.ZEROONE: "openai",
+    APIProvider.CUSTOM: "openai",
+}
+
+_LITELLM_DEFAULT_API_BASE = {
+    APIProvider.MOONSHOT: "https://api.moonshot.cn/v1",
+    APIProvider.ZEROONE: "https://api.lingyiwanwu.com/v1",
+}
+
 
 class EnhancedLLMClient(LLMClient):
     """增强的LLM客户端，支持多API、负载均衡等"""
     
-    def __init__(self, api_pool: APIPool, default_provider: Optional[APIProvider] = None):
+    # 同步调用共享的后台事件循环（首次使用时启动，所有实例复用）
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _loop_thread: Optional[threading.Thread] = None
+    _loop_lock = threading.Lock()
+    
+    def __init__(self, api_pool: APIPool, default_provider: Optional[APIProvider] = None,
+                 response_cache_size: int = 256, router=None,
+                 rate_limit_buckets: Optional[dict] = None):
         """
         初始化增强客户端
         Args:
             api_pool: API池
             default_provider: 默认API提供商
+            response_cache_size: 响应缓存容量（0表示关闭）
+            router: 可选的LiteLLM Router，按提供商分组路由（见build_litellm_router）
+            rate_limit_buckets: 提供商名称 -> 分布式令牌桶（跨worker共享的限流）
         """
         self.api_pool = api_pool
         self.client = UniversalAPIClient(api_pool)
         self.default_provider = default_provider
+        self.router = router
+        self.rate_limit_buckets = rate_limit_buckets or {}
+        self._router_groups = {
+            deployment["model_name"] for deployment in router.model_list
+        } if router is not None else set()
+        # 完全相同请求的响应缓存，命中时跳过HTTP往返
+        self._response_cache = LRUCache(response_cache_size) if response_cache_size > 0 else None
+        # 进行中的请求：(事件循环id, 缓存键) -> 共享的上游请求任务
+        self._inflight: dict = {}
+    
+    @staticmethod
+    def _system_prompt_fingerprint(system_prompt: str) -> str:
+        """
+        获取系统提示词的稳定指纹，用于提供商侧前缀缓存
+        
+        每次调用直接计算（短文本的sha1开销可忽略），不按提示词缓存，
+        避免按请求拼接的系统提示词在长期运行的服务中无限累积。
+        """
+        return hashlib.sha1(system_prompt.encode("utf-8")).hexdigest()[:16]
+    
+    @staticmethod
+    def _response_cache_key(prompt: str, system_prompt: Optional[str],
+                            provider: Optional[APIProvider], model: Optional[str],
+                            params: dict) -> str:
+        """根据提示词、提供商、模型和采样参数生成缓存键"""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (
+            system_prompt or "",
+            prompt,
+            provider.value if provider else "",
+            model or "",
+            json.dumps(params, sort_keys=True, ensure_ascii=False, default=str),
+        ):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    @classmethod
+    def _get_background_loop(cls) -> asyncio.AbstractEventLoop:
+        """获取（必要时启动）后台事件循环线程"""
+        if cls._loop is None:
+            with cls._loop_lock:
+                if cls._loop is None:
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(
+                        target=loop.run_forever,
+                        name="EnhancedLLMClientLoop",
+                        daemon=True
+                    )
+                    thread.start()
+                    cls._loop_thread = thread
+                    cls._loop = loop
+        return cls._loop
     
     def send_prompt(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
-        """同步发送提示词（使用异步实现）"""
-        import asyncio
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+        """同步发送提示词（提交到后台事件循环执行，可在运行中的事件循环内安全调用）"""
+        loop = self._get_background_loop()
+        if threading.current_thread() is self._loop_thread:
+            raise RuntimeError("不能在后台事件循环线程内同步调用send_prompt，请使用send_prompt_async")
         
-        return loop.run_until_complete(
-            self.send_prompt_async(prompt, system_prompt, **kwargs)
+        future = asyncio.run_coroutine_threadsafe(
+            self.send_prompt_async(prompt, system_prompt, **kwargs), loop
         )
+        return future.result()
     
     async def send_prompt_async(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
         """异步发送提示词"""
@@ -52,13 +136,86 @@ class EnhancedLLMClient(LLMClient):
         use_cache = kwargs.get("use_cache", True)
         max_retries = kwargs.get("max_retries", 3)
         
+        # 仅OpenAI/Anthropic支持提供商侧前缀缓存
+        prompt_cache_key = None
+        if (system_prompt and kwargs.get("use_prompt_cache", True)
+                and provider in (None, APIProvider.OPENAI, APIProvider.ANTHROPIC)):
+            prompt_cache_key = self._system_prompt_fingerprint(system_prompt)
+        
+        if not use_cache:
+            return await self._dispatch(
+                prompt, system_prompt, provider, model,
+                max_retries, prompt_cache_key
+            )
+        
+        params = {
+            key: value for key, value in kwargs.items()
+            if key not in ("provider", "model", "use_cache", "max_retries", "use_prompt_cache")
+        }
+        cache_key = self._response_cache_key(prompt, system_prompt, provider, model, params)
+        if self._response_cache is not None:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("命中响应缓存")
+                return cached
+        
+        # 单飞：同一事件循环内并发的相同请求共享一次上游调用
+        # 上游调用在独立任务中执行，各调用方通过shield等待，取消某个调用方不会取消共享请求
+        loop = asyncio.get_running_loop()
+        inflight_key = (id(loop), cache_key)
+        task = self._inflight.get(inflight_key)
+        if task is None:
+            task = loop.create_task(self._dispatch_and_cache(
+                cache_key, prompt, system_prompt, provider, model,
+                max_retries, prompt_cache_key
+            ))
+            self._inflight[inflight_key] = task
+            task.add_done_callback(lambda t: self._finish_inflight(inflight_key, t))
+        else:
+            logger.debug("合并进行中的相同请求")
+        return await asyncio.shield(task)
+    
+    def _finish_inflight(self, inflight_key: tuple, task: asyncio.Task):
+        """共享请求结束后移出进行中表（并获取异常，避免无等待者时的告警）"""
+        if self._inflight.get(inflight_key) is task:
+            del self._inflight[inflight_key]
+        if not task.cancelled():
+            task.exception()
+    
+    async def _dispatch_and_cache(self, cache_key: str, *args) -> str:
+        """发送上游请求并写入响应缓存"""
+        result = await self._dispatch(*args)
+        if self._response_cache is not None and result is not None:
+            self._response_cache.set(cache_key, result)
+        return result
+    
+    async def _dispatch(self, prompt: str, system_prompt: Optional[str],
+                        provider: Optional[APIProvider], model: Optional[str],
+                        max_retries: int,
+                        prompt_cache_key: Optional[str]) -> str:
+        """发送上游请求：配置了LiteLLM路由且该提供商有部署时走路由，否则走API池"""
+        group = provider.value if provider else None
+        bucket = self.rate_limit_buckets.get(group)
+        if bucket is not None:
+            await bucket.acquire()
+        
+        if self.router is not None and model is None and group in self._router_groups:
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
+            response = await self.router.acompletion(model=group, messages=messages)
+            return response.choices[0].message.content
+        
         return await self.client.send_request(
             prompt=prompt,
             system_prompt=system_prompt,
             provider=provider,
             model=model,
-            use_cache=use_cache,
-            max_retries=max_retries
+            # 响应缓存只由本类维护，不再叠加API池的缓存，避免两层缓存结果不一致
+            use_cache=False,
+            max_retries=max_retries,
+            prompt_cache_key=prompt_cache_key
         )
     
     async def stream_prompt(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> AsyncGenerator[str, None]:
@@ -76,20 +233,125 @@ class EnhancedLLMClient(LLMClient):
         """获取API统计信息"""
         return self.api_pool.get_stats_report()
     
+    def get_prompt_cache_stats(self) -> dict:
+        """获取提供商侧前缀缓存命中统计"""
+        return dict(self.client.prompt_cache_stats)
+    
     def add_api(self, name: str, config: APIConfig):
         """添加API到池中"""
         self.api_pool.add_api(name, config)
 
 
-def create_enhanced_client_from_config(configs: list) -> EnhancedLLMClient:
+def build_litellm_router(api_configs: list, routing_strategy: str = "latency-based-routing",
+                         num_retries: int = 3):
+    """
+    用LiteLLM Router接管负载均衡、重试和跨提供商回退
+    
+    每个提供商一个模型组，组内按routing_strategy分流，组间按优先级回退。
+    通义千问、文心一言、智谱等非OpenAI兼容协议的提供商不加入路由，仍由API池调用。
+    
+    Args:
+        api_configs: (API名称, APIConfig)列表
+        routing_strategy: LiteLLM路由策略
+        num_retries: 重试次数
+    Returns:
+        Router实例；未安装litellm或没有可路由的API时返回None
+    """
+    try:
+        from litellm import Router
+    except ImportError:
+        logger.warning("未安装litellm，使用内置API池路由")
+        return None
+    
+    model_list = []
+    groups = []
+    for api_name, config in sorted(api_configs, key=lambda item: item[1].priority):
+        prefix = _LITELLM_PROVIDER_PREFIX.get(config.provider)
+        if prefix is None or not config.enabled:
+            continue
+        
+        litellm_params = {
+            "model": f"{prefix}/{config.model}",
+            "api_key": config.api_key,
+            "timeout": config.timeout,
+            "rpm": config.rate_limit,
+        }
+        api_base = config.base_url or _LITELLM_DEFAULT_API_BASE.get(config.provider)
+        if api_base:
+            litellm_params["api_base"] = api_base
+        
+        model_list.append({
+            "model_name": config.provider.value,
+            "litellm_params": litellm_params,
+            "model_info": {"id": api_name},
+        })
+        if config.provider.value not in groups:
+            groups.append(config.provider.value)
+    
+    if not model_list:
+        return None
+    
+    fallbacks = [
+        {group: [other for other in groups if other != group]}
+        for group in groups if len(groups) > 1
+    ]
+    return Router(
+        model_list=model_list,
+        routing_strategy=routing_strategy,
+        num_retries=num_retries,
+        fallbacks=fallbacks
+    )
+
+
+def build_rate_limit_buckets(api_configs: list, redis_url: str) -> dict:
+    """
+    按提供商创建Redis分布式令牌桶，容量为该提供商所有启用API的rate_limit之和
+    
+    Args:
+        api_configs: (API名称, APIConfig)列表
+        redis_url: Redis连接地址
+    Returns:
+        提供商名称 -> RedisTokenBucket；未安装redis时返回空字典
+    """
+    try:
+        import redis.asyncio as aioredis
+    except ImportError:
+        logger.warning("未安装redis，跳过分布式限流")
+        return {}
+    
+    rpm_by_provider: dict = {}
+    for _, config in api_configs:
+        if config.enabled and config.rate_limit > 0:
+            key = config.provider.value
+            rpm_by_provider[key] = rpm_by_provider.get(key, 0) + config.rate_limit
+    
+    # redis.asyncio连接绑定事件循环，同步调用的后台循环与异步调用方各用各的连接
+    connections = LoopLocalRedis(lambda: aioredis.from_url(redis_url))
+    return {
+        provider: RedisTokenBucket(
+            connections, name=f"llm:{provider}",
+            capacity=rpm, refill_amount=rpm, refill_frequency=60
+        )
+        for provider, rpm in rpm_by_provider.items()
+    }
+
+
+def create_enhanced_client_from_config(configs: list,
+                                       routing_strategy: Optional[str] = None,
+                                       redis_url: Optional[str] = None) -> EnhancedLLMClient:
     """
     从配置列表创建增强客户端
     Args:
         configs: API配置列表，每个配置包含provider, api_key等
+        routing_strategy: 指定时使用LiteLLM Router按该策略路由（如"latency-based-routing"），
+            未安装litellm时回退到内置API池
+        redis_url: 指定时按提供商启用Redis分布式令牌桶，多worker共享rate_limit配额
     Returns:
         EnhancedLLMClient实例
     """
     api_pool = APIPool()
+    default_provider = None
+    api_configs = []
     
     for i, cfg in enumerate(configs):
         provider_str = cfg.get("provider", "openai").lower()
@@ -115,10 +377,18 @@ def create_enhanced_client_from_config(configs: list) -> EnhancedLLMClient:
         
         api_name = cfg.get("name", f"{provider.value}_{i}")
         api_pool.add_api(api_name, api_config)
+        api_configs.append((api_name, api_config))
+        
+        # 默认提供商取第一个成功解析的配置，无需再次解析
+        if default_provider is None:
+            default_provider = provider
     
-    default_provider = None
-    if configs:
-        default_provider = APIProvider(configs[0].get("provider", "openai").lower())
+    router = None
+    if routing_strategy:
+        router = build_litellm_router(api_configs, routing_strategy=routing_strategy)
+    
+    rate_limit_buckets = build_rate_limit_buckets(api_configs, redis_url) if redis_url else None
     
-    return EnhancedLLMClient(api_pool, default_provider)
+    return EnhancedLLMClient(api_pool, default_provider, router=router,
+                             rate_limit_buckets=rate_limit_buckets)
 
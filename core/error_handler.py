@@ -3,12 +3,18 @@
 提供统一的错误处理装饰器和中间件
 """
 
+import json
 import logging
-import traceback
-from functools import wraps
+from functools import lru_cache, wraps
 from typing import Callable, Any
 from fastapi import HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from core.exceptions import (
     NovelExtractorError,
@@ -33,23 +39,26 @@ EXCEPTION_STATUS_MAP = {
 }
 
 
-def get_status_code(exception: Exception) -> int:
-    """获取异常对应的HTTP状态码"""
-    exception_type = type(exception)
-    
-    # 检查直接映射
-    if exception_type in EXCEPTION_STATUS_MAP:
-        handler = EXCEPTION_STATUS_MAP[exception_type]
-        if callable(handler):
-            return handler(exception)
-        return handler
+def _log_handled_error(exc: Exception):
+    """
+    记录已知业务异常
     
-    # 检查父类映射
-    for exc_type, status_code in EXCEPTION_STATUS_MAP.items():
-        if isinstance(exception, exc_type):
-            if callable(status_code):
-                return status_code(exception)
-            return status_code
+    业务异常是预期内的错误路径，仅在DEBUG级别附带堆栈，避免每次都格式化traceback；
+    未处理的异常仍始终记录堆栈。
+    """
+    if logger.isEnabledFor(logging.ERROR):
+        logger.error("%s: %s", type(exc).__name__, exc,
+                     exc_info=logger.isEnabledFor(logging.DEBUG))
+
+
+def get_status_code(exception: Exception) -> int:
+    """获取异常对应的HTTP状态码（沿MRO查找最具体的映射）"""
+    for exc_type in type(exception).__mro__:
+        handler = EXCEPTION_STATUS_MAP.get(exc_type)
+        if handler is not None:
+            if callable(handler):
+                return handler(exception)
+            return handler
     
     # 默认状态码
     return 500
@@ -70,14 +79,14 @@ def error_handler(func: Callable) -> Callable:
         except NovelExtractorError as e:
             # 自定义异常转换为HTTPException
             status_code = get_status_code(e)
-            logger.error(f"{type(e).__name__}: {e}", exc_info=True)
+            _log_handled_error(e)
             raise HTTPException(
                 status_code=status_code,
                 detail=str(e)
             )
         except Exception as e:
             # 其他异常记录详细信息并返回500
-            logger.error(f"未处理的异常: {e}", exc_info=True)
+            logger.error("未处理的异常: %s", e, exc_info=True)
             raise HTTPException(
                 status_code=500,
                 detail=f"内部服务器错误: {str(e)}"
@@ -98,13 +107,13 @@ def sync_error_handler(func: Callable) -> Callable:
             raise
         except NovelExtractorError as e:
             status_code = get_status_code(e)
-            logger.error(f"{type(e).__name__}: {e}", exc_info=True)
+            _log_handled_error(e)
             raise HTTPException(
                 status_code=status_code,
                 detail=str(e)
             )
         except Exception as e:
-            logger.error(f"未处理的异常: {e}", exc_info=True)
+            logger.error("未处理的异常: %s", e, exc_info=True)
             raise HTTPException(
                 status_code=500,
                 detail=f"内部服务器错误: {str(e)}"
@@ -113,49 +122,56 @@ def sync_error_handler(func: Callable) -> Callable:
     return wrapper
 
 
-async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+def _dump_error_body(status_code: int, message: Any, error_type: str) -> bytes:
+    """序列化错误响应体（优先使用orjson）"""
+    content = {
+        "error": {
+            "code": status_code,
+            "message": message,
+            "type": error_type
+        }
+    }
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(content)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@lru_cache(maxsize=64)
+def _internal_error_body(error_type: str) -> bytes:
+    """未处理异常的500响应体只随异常类型变化，按类型缓存序列化结果"""
+    return _dump_error_body(500, "内部服务器错误", error_type)
+
+
+def _error_response(status_code: int, body: bytes) -> Response:
+    """构造JSON错误响应"""
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
+async def global_exception_handler(request: Request, exc: Exception) -> Response:
     """
     全局异常处理器
     用于FastAPI的异常处理
     """
     if isinstance(exc, HTTPException):
-        return JSONResponse(
-            status_code=exc.status_code,
-            content={
-                "error": {
-                    "code": exc.status_code,
-                    "message": exc.detail,
-                    "type": "HTTPException"
-                }
-            }
+        return _error_response(
+            exc.status_code,
+            _dump_error_body(exc.status_code, exc.detail, "HTTPException")
         )
     
     if isinstance(exc, NovelExtractorError):
         status_code = get_status_code(exc)
-        logger.error(f"{type(exc).__name__}: {exc}", exc_info=True)
-        return JSONResponse(
-            status_code=status_code,
-            content={
-                "error": {
-                    "code": status_code,
-                    "message": str(exc),
-                    "type": type(exc).__name__
-                }
-            }
+        _log_handled_error(exc)
+        return _error_response(
+            status_code,
+            _dump_error_body(status_code, str(exc), type(exc).__name__)
         )
     
     # 未处理的异常
-    logger.error(f"未处理的异常: {exc}", exc_info=True)
-    return JSONResponse(
-        status_code=500,
-        content={
-            "error": {
-                "code": 500,
-                "message": "内部服务器错误",
-                "type": type(exc).__name__
-            }
-        }
-    )
+    logger.error("未处理的异常: %s", exc, exc_info=True)
+    return _error_response(500, _internal_error_body(type(exc).__name__))
 
 
 def validate_request_data(data: dict, required_fields: list, field_types: dict = None):
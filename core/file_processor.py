@@ -3,6 +3,7 @@
 提供高效的文件读写和处理功能
 """
 
+import asyncio
 import json
 import yaml
 from pathlib import Path
@@ -11,23 +12,41 @@ import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 
+# 优先使用libyaml的C实现
+try:
+    from yaml import CSafeLoader as YAMLLoader, CSafeDumper as YAMLDumper
+except ImportError:
+    from yaml import SafeLoader as YAMLLoader, SafeDumper as YAMLDumper
+
+from .cache_manager import LRUCache
+from .utils import dump_json_bytes, load_json_bytes
+
 logger = logging.getLogger(__name__)
 
 
 class FileProcessor:
     """文件处理器（优化版）"""
     
-    def __init__(self, max_workers: int = 4):
+    # 文件路径锁的分段数
+    PATH_LOCK_STRIPES = 64
+    
+    def __init__(self, max_workers: int = 4, cache_size: int = 256):
         """
         初始化文件处理器
         
         Args:
             max_workers: 最大并发工作线程数
+            cache_size: 缓存的最大文件数（LRU淘汰）
         """
         self.max_workers = max_workers
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
-        self._lock = threading.Lock()
-        self._cache: Dict[str, Any] = {}
+        self._cache = LRUCache(cache_size)
+        # 按文件路径分段加锁（固定数量的锁，不随访问过的文件数增长），不同文件的读写基本互不阻塞
+        self._path_locks = tuple(threading.Lock() for _ in range(self.PATH_LOCK_STRIPES))
+    
+    def _get_path_lock(self, cache_key: str) -> threading.Lock:
+        """获取指定文件所在分段的锁（同一文件总是映射到同一把锁）"""
+        return self._path_locks[hash(cache_key) % len(self._path_locks)]
     
     def read_json(self, file_path: Union[str, Path], use_cache: bool = True) -> Dict[str, Any]:
         """
@@ -43,16 +62,28 @@ class FileProcessor:
         file_path = Path(file_path)
         cache_key = str(file_path.absolute())
         
-        if use_cache and cache_key in self._cache:
-            return self._cache[cache_key]
+        if use_cache:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
         
+        with self._get_path_lock(cache_key):
+            if use_cache:
+                # 等锁期间可能已由其他线程加载
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            return self._load_json(file_path, cache_key, use_cache)
+    
+    def _load_json(self, file_path: Path, cache_key: str, use_cache: bool) -> Dict[str, Any]:
+        """从磁盘加载JSON并写入缓存（调用方持有路径锁）"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # 优先用orjson直接解析UTF-8字节；NaN/超64位整数等情况由辅助函数回退到标准库
+            with open(file_path, 'rb') as f:
+                data = load_json_bytes(f.read())
             
             if use_cache:
-                with self._lock:
-                    self._cache[cache_key] = data
+                self._cache.set(cache_key, data)
             
             return data
         except FileNotFoundError:
@@ -84,14 +115,14 @@ class FileProcessor:
         file_path = Path(file_path)
         file_path.parent.mkdir(parents=True, exist_ok=True)
         
+        cache_key = str(file_path.absolute())
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=indent, ensure_ascii=ensure_ascii)
-            
-            # 更新缓存
-            cache_key = str(file_path.absolute())
-            with self._lock:
-                self._cache[cache_key] = data
+            payload = dump_json_bytes(data, indent, ensure_ascii)
+            with self._get_path_lock(cache_key):
+                file_path.write_bytes(payload)
+                
+                # 更新缓存
+                self._cache.set(cache_key, data)
             
             logger.debug(f"JSON文件已保存: {file_path}")
         except Exception as e:
@@ -112,16 +143,27 @@ class FileProcessor:
         file_path = Path(file_path)
         cache_key = str(file_path.absolute())
         
-        if use_cache and cache_key in self._cache:
-            return self._cache[cache_key]
+        if use_cache:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
         
+        with self._get_path_lock(cache_key):
+            if use_cache:
+                # 等锁期间可能已由其他线程加载
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            return self._load_yaml(file_path, cache_key, use_cache)
+    
+    def _load_yaml(self, file_path: Path, cache_key: str, use_cache: bool) -> Dict[str, Any]:
+        """从磁盘加载YAML并写入缓存（调用方持有路径锁）"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f) or {}
+                data = yaml.load(f, Loader=YAMLLoader) or {}
             
             if use_cache:
-                with self._lock:
-                    self._cache[cache_key] = data
+                self._cache.set(cache_key, data)
             
             return data
         except FileNotFoundError:
@@ -151,20 +193,74 @@ class FileProcessor:
         file_path = Path(file_path)
         file_path.parent.mkdir(parents=True, exist_ok=True)
         
+        cache_key = str(file_path.absolute())
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                yaml.dump(data, f, allow_unicode=True, default_flow_style=default_flow_style)
-            
-            # 更新缓存
-            cache_key = str(file_path.absolute())
-            with self._lock:
-                self._cache[cache_key] = data
+            with self._get_path_lock(cache_key):
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    yaml.dump(data, f, Dumper=YAMLDumper, allow_unicode=True,
+                              default_flow_style=default_flow_style)
+                
+                # 更新缓存
+                self._cache.set(cache_key, data)
             
             logger.debug(f"YAML文件已保存: {file_path}")
         except Exception as e:
             logger.error(f"写入文件失败 {file_path}: {e}")
             raise
     
+    async def aread_json(self, file_path: Union[str, Path], use_cache: bool = True) -> Dict[str, Any]:
+        """
+        异步读取JSON文件（磁盘I/O在线程中执行，不阻塞事件循环）
+        
+        Args:
+            file_path: 文件路径
+            use_cache: 是否使用缓存
+        
+        Returns:
+            JSON数据字典
+        """
+        if use_cache:
+            cached = self._cache.get(str(Path(file_path).absolute()))
+            if cached is not None:
+                return cached
+        return await asyncio.to_thread(self.read_json, file_path, use_cache)
+    
+    async def awrite_json(
+        self,
+        file_path: Union[str, Path],
+        data: Dict[str, Any],
+        indent: int = 2,
+        ensure_ascii: bool = False
+    ):
+        """异步写入JSON文件（参数同write_json）"""
+        await asyncio.to_thread(self.write_json, file_path, data, indent, ensure_ascii)
+    
+    async def aread_yaml(self, file_path: Union[str, Path], use_cache: bool = True) -> Dict[str, Any]:
+        """
+        异步读取YAML文件（磁盘I/O在线程中执行，不阻塞事件循环）
+        
+        Args:
+            file_path: 文件路径
+            use_cache: 是否使用缓存
+        
+        Returns:
+            YAML数据字典
+        """
+        if use_cache:
+            cached = self._cache.get(str(Path(file_path).absolute()))
+            if cached is not None:
+                return cached
+        return await asyncio.to_thread(self.read_yaml, file_path, use_cache)
+    
+    async def awrite_yaml(
+        self,
+        file_path: Union[str, Path],
+        data: Dict[str, Any],
+        default_flow_style: bool = False
+    ):
+        """异步写入YAML文件（参数同write_yaml）"""
+        await asyncio.to_thread(self.write_yaml, file_path, data, default_flow_style)
+    
     def read_json_batch(
         self,
         file_paths: List[Union[str, Path]],
@@ -196,6 +292,35 @@ class FileProcessor:
         
         return results
     
+    async def aread_json_batch(
+        self,
+        file_paths: List[Union[str, Path]],
+        use_cache: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        异步批量读取JSON文件（并发gather，供异步调用方使用）
+        
+        Args:
+            file_paths: 文件路径列表
+            use_cache: 是否使用缓存
+        
+        Returns:
+            文件路径到数据的映射字典（读取失败的文件不包含在内）
+        """
+        outcomes = await asyncio.gather(
+            *(self.aread_json(file_path, use_cache) for file_path in file_paths),
+            return_exceptions=True
+        )
+        
+        results = {}
+        for file_path, outcome in zip(file_paths, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"读取文件失败 {file_path}: {outcome}")
+            else:
+                results[str(file_path)] = outcome
+        
+        return results
+    
     def write_json_batch(
         self,
         file_data: Dict[Union[str, Path], Dict[str, Any]],
@@ -230,12 +355,11 @@ class FileProcessor:
         Args:
             file_path: 要清除的文件路径（None表示清除所有缓存）
         """
-        with self._lock:
-            if file_path is None:
-                self._cache.clear()
-            else:
-                cache_key = str(Path(file_path).absolute())
-                self._cache.pop(cache_key, None)
+        if file_path is None:
+            self._cache.clear()
+        else:
+            cache_key = str(Path(file_path).absolute())
+            self._cache.delete(cache_key)
     
     def invalidate_cache(self, file_path: Union[str, Path]):
         """使指定文件的缓存失效"""
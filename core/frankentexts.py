@@ -5,19 +5,126 @@ Frankentexts语料库管理
 
 import os
 import json
+import mmap
+import itertools
 import re
-from typing import List, Dict, Optional, Tuple
+import sqlite3
+import threading
+import time
+import weakref
+from typing import List, Dict, Optional, Tuple, TextIO
 from pathlib import Path
 import logging
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Hyperscan数据库的scratch不可并发使用
+_hyperscan_lock = threading.Lock()
+
+_FTS_INSERT_SQL = (
+    "INSERT INTO fragments (id, text, type, genre, metadata, template, extracted_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+# save_fragment写入的单条语料记录（分隔符之间的部分）
+_RECORD_PATTERN = re.compile(
+    r"片段ID: (?P<id>[^\n]*)\n类型: (?P<type>[^\n]*)\n提取时间: (?P<extracted_at>[^\n]*)\n"
+    r"元数据: (?P<metadata>.*?)\n\n原文:\n(?P<text>.*?)\n(?:\n模板:\n(?P<template>.*)\n)?",
+    re.DOTALL
+)
+
+
+@lru_cache(maxsize=128)
+def _compile_placeholders_hyperscan(items: Tuple[Tuple[str, str], ...]):
+    """将专有名词编译为Hyperscan多模式数据库（忽略大小写、UTF-8），编译失败返回None"""
+    keys = [original for original, _ in items if original]
+    if not keys:
+        return None
+    flags = (hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST
+             | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP)
+    try:
+        db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        db.compile(
+            expressions=[re.escape(key).encode('utf-8') for key in keys],
+            ids=list(range(len(keys))),
+            elements=len(keys),
+            flags=flags
+        )
+    except hyperscan.error as e:
+        logger.warning(f"Hyperscan编译失败: {e}，使用正则替换")
+        return None
+    placeholders = [placeholder for original, placeholder in items if original]
+    return db, [placeholder.encode('utf-8') for placeholder in placeholders]
+
+
+def _hyperscan_substitute(items: Tuple[Tuple[str, str], ...], text: str) -> Optional[str]:
+    """
+    用Hyperscan单次扫描替换所有专有名词
+    
+    与正则交替的语义一致：从左到右取不重叠的匹配，同一位置取最长者，
+    等长时取先出现的占位符。不可用时返回None，由调用方回退到正则。
+    """
+    compiled = _compile_placeholders_hyperscan(items)
+    if compiled is None:
+        return None
+    db, replacements = compiled
+    
+    try:
+        data = text.encode('utf-8')
+    except UnicodeEncodeError:
+        return None
+    
+    matches = []
+    with _hyperscan_lock:
+        db.scan(data, match_event_handler=lambda pid, start, end, flags, ctx: matches.append((start, start - end, pid)))
+    if not matches:
+        return text
+    
+    matches.sort()
+    parts = []
+    pos = 0
+    for start, neg_length, pid in matches:
+        if start < pos:
+            continue
+        parts.append(data[pos:start])
+        parts.append(replacements[pid])
+        pos = start - neg_length
+    parts.append(data[pos:])
+    return b"".join(parts).decode('utf-8')
+
+
+@lru_cache(maxsize=128)
+def _compile_placeholders(items: Tuple[Tuple[str, str], ...]) -> Tuple["re.Pattern", Dict[str, str]]:
+    """将专有名词编译为单个忽略大小写的交替正则（长词优先），结果按占位符集合缓存"""
+    mapping: Dict[str, str] = {}
+    for original, placeholder in items:
+        if original:
+            mapping.setdefault(original.lower(), placeholder)
+    alternation = "|".join(re.escape(key) for key in sorted(mapping, key=len, reverse=True))
+    return re.compile(alternation or "(?!)", re.IGNORECASE), mapping
+
+
+
+def _close_file_handles(fh_cache: "OrderedDict[Path, TextIO]", fh_lock: threading.Lock):
+    """关闭全部语料文件句柄"""
+    with fh_lock:
+        while fh_cache:
+            _, handle = fh_cache.popitem()
+            handle.close()
 
 class FrankentextsManager:
     """Frankentexts语料库管理器"""
     
-    def __init__(self, corpus_dir: str = "corpus_samples"):
+    def __init__(self, corpus_dir: str = "corpus_samples", use_fts_index: bool = True):
         self.corpus_dir = Path(corpus_dir)
         self.corpus_dir.mkdir(parents=True, exist_ok=True)
         
@@ -73,6 +180,25 @@ class FrankentextsManager:
         # 向量数据库（可选，如果安装了相关库）
         self.vector_db = None
         self._init_vector_db()
+        
+        # 语料文件解析结果缓存：路径 -> ((修改时间, 大小), 片段)
+        self._parse_cache: Dict[Path, Tuple[Tuple[int, int], Tuple[Dict, ...]]] = {}
+        
+        # 片段ID自增计数（next()在GIL下是原子操作）
+        self._id_counter = itertools.count()
+        
+        # 语料文件的追加写句柄（LRU，避免每个片段都打开/关闭文件）
+        self._fh_cache: "OrderedDict[Path, TextIO]" = OrderedDict()
+        self._fh_lock = threading.Lock()
+        self.max_open_files = 8
+        # 未显式close()时，在对象回收或解释器退出时关闭句柄
+        self._file_handles_finalizer = weakref.finalize(self, _close_file_handles, self._fh_cache, self._fh_lock)
+        
+        # SQLite FTS5全文索引（替代逐文件线性扫描）
+        self.fts_db: Optional[sqlite3.Connection] = None
+        self._fts_lock = threading.Lock()
+        if use_fts_index:
+            self._init_fts_index()
     
     def _init_vector_db(self):
         """初始化向量数据库（可选）"""
@@ -89,6 +215,64 @@ class FrankentextsManager:
             logger.warning(f"向量数据库初始化失败: {e}，将使用文件存储模式")
             self.vector_db = None
     
+    def _init_fts_index(self):
+        """初始化SQLite FTS5全文索引"""
+        try:
+            conn = sqlite3.connect(str(self.corpus_dir / "corpus.db"), check_same_thread=False)
+            created = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='fragments'"
+            ).fetchone() is None
+            # trigram分词支持中文子串匹配（unicode61会把连续汉字当作一个词）
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS fragments USING fts5("
+                "id UNINDEXED, text, type UNINDEXED, genre UNINDEXED, "
+                "metadata UNINDEXED, template UNINDEXED, extracted_at UNINDEXED, "
+                "tokenize='trigram')"
+            )
+            if created:
+                self._backfill_fts_index(conn)
+            conn.commit()
+            self.fts_db = conn
+        except sqlite3.Error as e:
+            logger.warning(f"全文索引初始化失败: {e}，将使用文件扫描模式")
+            self.fts_db = None
+    
+    def _backfill_fts_index(self, conn: sqlite3.Connection):
+        """新建索引时导入已有语料文件中的片段，建立索引前写入的语料也能走全文检索"""
+        corpus_files = list(self.corpus_files.items())
+        corpus_files.append(("通用", self.corpus_dir / "通用预料库.txt"))
+        rows = []
+        for genre, corpus_file in corpus_files:
+            if not corpus_file.exists():
+                continue
+            try:
+                for part in self._iter_fragment_parts(corpus_file):
+                    row = self._parse_record(part, genre)
+                    if row is not None:
+                        rows.append(row)
+            except (OSError, UnicodeDecodeError) as e:
+                logger.warning(f"导入语料文件 {corpus_file} 到全文索引失败: {e}")
+        if rows:
+            conn.executemany(_FTS_INSERT_SQL, rows)
+            logger.info(f"全文索引已导入 {len(rows)} 个已有片段")
+    
+    def _parse_record(self, part: str, genre: str) -> Optional[Tuple]:
+        """把语料文件中的一段解析为索引行；非save_fragment格式的文本按未知类型整段导入"""
+        part = part.replace('\r\n', '\n').replace('\r', '\n')
+        if not part.strip():
+            return None
+        match = _RECORD_PATTERN.fullmatch(part.lstrip('\n'))
+        if match is None:
+            return (self._generate_fragment_id(), part.strip(), "未知", genre, "{}", None, None)
+        try:
+            metadata = json.dumps(json.loads(match.group("metadata")), ensure_ascii=False)
+        except ValueError:
+            metadata = "{}"
+        return (
+            match.group("id"), match.group("text"), match.group("type"), genre,
+            metadata, match.group("template"), match.group("extracted_at")
+        )
+    
     def extract_fragment(self, text: str, fragment_type: str, metadata: Dict) -> Dict:
         """提取文本片段并添加元数据"""
         fragment = {
@@ -106,11 +290,15 @@ class FrankentextsManager:
         text = fragment["text"]
         template = text
         
-        # 替换专有名词
-        for original, placeholder in placeholders.items():
-            # 使用正则表达式进行替换，保持大小写
-            pattern = re.compile(re.escape(original), re.IGNORECASE)
-            template = pattern.sub(placeholder, template)
+        # 替换专有名词（所有占位符合并为一个正则，单次扫描完成替换）
+        if placeholders:
+            items = tuple(placeholders.items())
+            substituted = _hyperscan_substitute(items, template) if HYPERSCAN_AVAILABLE else None
+            if substituted is not None:
+                template = substituted
+            else:
+                pattern, mapping = _compile_placeholders(items)
+                template = pattern.sub(lambda m: mapping.get(m.group(0).lower(), m.group(0)), template)
         
         fragment["template"] = template
         return template
@@ -123,17 +311,40 @@ class FrankentextsManager:
         else:
             corpus_file = self.corpus_files[genre]
         
-        # 追加到文件
-        with open(corpus_file, 'a', encoding='utf-8') as f:
-            f.write(f"\n{'='*80}\n")
-            f.write(f"片段ID: {fragment['id']}\n")
-            f.write(f"类型: {fragment['type']}\n")
-            f.write(f"提取时间: {fragment['extracted_at']}\n")
-            f.write(f"元数据: {json.dumps(fragment['metadata'], ensure_ascii=False, indent=2)}\n")
-            f.write(f"\n原文:\n{fragment['text']}\n")
-            if fragment.get('template'):
-                f.write(f"\n模板:\n{fragment['template']}\n")
-            f.write(f"{'='*80}\n")
+        # 拼接完整记录后一次写入
+        separator = '=' * 80
+        parts = [
+            f"\n{separator}\n",
+            f"片段ID: {fragment['id']}\n",
+            f"类型: {fragment['type']}\n",
+            f"提取时间: {fragment['extracted_at']}\n",
+            f"元数据: {json.dumps(fragment['metadata'], ensure_ascii=False, indent=2)}\n",
+            f"\n原文:\n{fragment['text']}\n",
+        ]
+        if fragment.get('template'):
+            parts.append(f"\n模板:\n{fragment['template']}\n")
+        parts.append(f"{separator}\n")
+        
+        with self._fh_lock:
+            handle = self._get_file_handle(corpus_file)
+            handle.write("".join(parts))
+            # 每条记录写完即落盘（仍省去每次打开/关闭文件），异常退出不会丢失片段，其他进程也能立即读到
+            handle.flush()
+        
+        if self.fts_db is not None:
+            try:
+                with self._fts_lock:
+                    self.fts_db.execute(
+                        _FTS_INSERT_SQL,
+                        (
+                            fragment['id'], fragment['text'], fragment['type'], genre,
+                            json.dumps(fragment['metadata'], ensure_ascii=False),
+                            fragment.get('template'), fragment['extracted_at']
+                        )
+                    )
+                    self.fts_db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"全文索引写入失败: {e}")
         
         # 如果启用了向量数据库，也存储到向量库
         if self.vector_db:
@@ -148,6 +359,27 @@ class FrankentextsManager:
         
         logger.info(f"片段已保存到 {corpus_file}")
     
+    def _get_file_handle(self, corpus_file: Path) -> TextIO:
+        """获取语料文件的追加写句柄（调用方持有_fh_lock），超出上限时关闭最久未用的句柄"""
+        handle = self._fh_cache.get(corpus_file)
+        if handle is not None:
+            self._fh_cache.move_to_end(corpus_file)
+            return handle
+        
+        while len(self._fh_cache) >= self.max_open_files:
+            _, oldest = self._fh_cache.popitem(last=False)
+            oldest.close()
+        
+        handle = open(corpus_file, 'a', encoding='utf-8')
+        self._fh_cache[corpus_file] = handle
+        return handle
+    
+    def flush(self):
+        """将缓冲的片段写入语料文件（save_fragment已逐条落盘，保留供外部调用）"""
+        with self._fh_lock:
+            for handle in self._fh_cache.values():
+                handle.flush()
+    
     def search_fragments(self, query: str, fragment_type: Optional[str] = None, 
                         genre: Optional[str] = None, top_k: int = 5) -> List[Dict]:
         """搜索匹配的片段"""
@@ -178,12 +410,68 @@ class FrankentextsManager:
             except Exception as e:
                 logger.warning(f"向量数据库搜索失败: {e}")
         
-        # 如果向量数据库不可用，使用文件搜索
+        if not results and self.fts_db is not None:
+            results = self._fts_search(query, fragment_type, genre, top_k)
+        
+        # 索引未命中时回退到文件搜索（兼容建立索引前写入的语料）
         if not results:
             results = self._file_search(query, fragment_type, genre, top_k)
         
         return results
     
+    def _fts_search(self, query: str, fragment_type: Optional[str],
+                    genre: Optional[str], top_k: int) -> List[Dict]:
+        """从FTS5全文索引中搜索片段（按BM25相关度排序）"""
+        conditions = []
+        params: List = []
+        # bm25()只能在MATCH查询中使用
+        score_expr = "NULL"
+        order_by = "rowid"
+        
+        if len(query) >= 3:
+            # trigram分词下短语查询即子串匹配
+            conditions.append("text MATCH ?")
+            params.append('"' + query.replace('"', '""') + '"')
+            score_expr = "bm25(fragments)"
+            order_by = score_expr
+        elif query:
+            # 不足3个字符时trigram无法MATCH，改用LIKE
+            conditions.append("text LIKE ? ESCAPE '\\'")
+            escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
+        if fragment_type:
+            conditions.append("type = ?")
+            params.append(fragment_type)
+        if genre and genre in self.corpus_files:
+            conditions.append("genre = ?")
+            params.append(genre)
+        
+        sql = (
+            f"SELECT id, text, type, metadata, template, {score_expr} FROM fragments"
+            + (" WHERE " + " AND ".join(conditions) if conditions else "")
+            + f" ORDER BY {order_by} LIMIT ?"
+        )
+        params.append(top_k)
+        
+        try:
+            with self._fts_lock:
+                rows = self.fts_db.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"全文索引搜索失败: {e}")
+            return []
+        
+        return [
+            {
+                "id": fragment_id,
+                "text": text,
+                "type": ftype,
+                "metadata": json.loads(metadata) if metadata else {},
+                "template": template,
+                "score": score
+            }
+            for fragment_id, text, ftype, metadata, template, score in rows
+        ]
+    
     def _file_search(self, query: str, fragment_type: Optional[str], 
                     genre: Optional[str], top_k: int) -> List[Dict]:
         """从文件中搜索片段（简单实现）"""
@@ -195,60 +483,124 @@ class FrankentextsManager:
         else:
             search_files = list(self.corpus_files.values())
         
+        text_pattern = re.compile(re.escape(query), re.IGNORECASE)
+        # 字节级预筛：bytes正则的IGNORECASE只折叠ASCII字母，
+        # 查询含非ASCII的大小写字母时无法保证不漏检，此时跳过预筛
+        byte_pattern = None
+        if query and all(c.isascii() or c.lower() == c.upper() for c in query):
+            byte_pattern = re.compile(re.escape(query.encode('utf-8')), re.IGNORECASE)
+        
         for corpus_file in search_files:
+            if len(results) >= top_k:
+                break
             if not corpus_file.exists():
                 continue
             
             try:
-                with open(corpus_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    # 简单的关键词匹配
-                    if query.lower() in content.lower():
-                        # 提取包含查询的片段
-                        fragments = self._parse_fragments_from_file(corpus_file)
-                        for fragment in fragments:
-                            if query.lower() in fragment['text'].lower():
-                                if not fragment_type or fragment.get('type') == fragment_type:
-                                    results.append(fragment)
+                if byte_pattern is not None and not self._file_contains(corpus_file, byte_pattern):
+                    continue
+                # 提取包含查询的片段
+                for fragment in self._get_parsed_fragments(corpus_file):
+                    if text_pattern.search(fragment['text']):
+                        if not fragment_type or fragment.get('type') == fragment_type:
+                            results.append(dict(fragment))
+                            if len(results) >= top_k:
+                                break
             except Exception as e:
                 logger.warning(f"搜索文件 {corpus_file} 失败: {e}")
         
         return results[:top_k]
     
+    @staticmethod
+    def _file_contains(file_path: Path, byte_pattern: "re.Pattern") -> bool:
+        """在内存映射的文件字节上查找，命中即返回，不创建整文件的字符串副本"""
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return byte_pattern.search(mm) is not None
+    
     def _parse_fragments_from_file(self, file_path: Path) -> List[Dict]:
         """从文件中解析片段"""
+        return [dict(fragment) for fragment in self._get_parsed_fragments(file_path)]
+    
+    def _get_parsed_fragments(self, file_path: Path) -> Tuple[Dict, ...]:
+        """
+        获取文件的解析结果（只读，按(修改时间, 大小)缓存）
+        
+        每个文件只保留最新一份结果，文件被追加或修改后自动重新解析。
+        """
+        try:
+            stat = file_path.stat()
+        except OSError as e:
+            logger.warning(f"解析文件 {file_path} 失败: {e}")
+            return ()
+        
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._parse_cache.get(file_path)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
+        
+        fragments = tuple(self._load_fragments(file_path))
+        self._parse_cache[file_path] = (stat_key, fragments)
+        return fragments
+    
+    def _load_fragments(self, file_path: Path) -> List[Dict]:
+        """从磁盘读取并解析文件中的片段"""
         fragments = []
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                # 按分隔符分割片段
-                parts = content.split('=' * 80)
-                for part in parts:
-                    if not part.strip():
-                        continue
-                    # 简单解析（实际应该更完善）
-                    fragment = {
-                        "text": part,
-                        "type": "未知",
-                        "metadata": {}
-                    }
-                    fragments.append(fragment)
+            for part in self._iter_fragment_parts(file_path):
+                if not part.strip():
+                    continue
+                if '\r' in part:
+                    # 与文本模式读取一致，统一换行符（Windows下写入的是\r\n）
+                    part = part.replace('\r\n', '\n').replace('\r', '\n')
+                # 简单解析（实际应该更完善）
+                fragment = {
+                    "text": part,
+                    "type": "未知",
+                    "metadata": {}
+                }
+                fragments.append(fragment)
         except Exception as e:
             logger.warning(f"解析文件 {file_path} 失败: {e}")
         return fragments
     
+    @staticmethod
+    def _iter_fragment_parts(file_path: Path):
+        """按分隔符逐段读取文件（内存映射上查找分隔符，不生成整文件的字符串和split列表）"""
+        separator = b'=' * 80
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = 0
+                while True:
+                    nxt = mm.find(separator, pos)
+                    if nxt == -1:
+                        yield mm[pos:].decode('utf-8')
+                        return
+                    yield mm[pos:nxt].decode('utf-8')
+                    pos = nxt + len(separator)
+    
     def _generate_fragment_id(self) -> str:
-        """生成片段ID"""
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        import random
-        random_suffix = random.randint(1000, 9999)
-        return f"FRAG_{timestamp}_{random_suffix}"
+        """生成片段ID（纳秒时间戳+自增计数，单调且不会在同一秒内冲突）"""
+        return f"FRAG_{time.time_ns()}_{next(self._id_counter)}"
     
     def get_fragments_by_type(self, fragment_type: str, genre: Optional[str] = None, 
                              limit: int = 10) -> List[Dict]:
         """按类型获取片段"""
         return self.search_fragments("", fragment_type=fragment_type, genre=genre, top_k=limit)
     
+    def close(self):
+        """关闭语料文件句柄和全文索引连接"""
+        self._file_handles_finalizer()
+        
+        if self.fts_db is not None:
+            with self._fts_lock:
+                self.fts_db.close()
+                self.fts_db = None
+    
     def stitch_fragments(self, fragments: List[Dict], transitions: Optional[List[str]] = None) -> str:
         """拼接多个片段，生成连贯文本"""
         if not fragments:
@@ -3,13 +3,41 @@
 支持36+种小说类型、流派、设定和背景分类
 """
 
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Final, Iterable, List, Optional, Tuple
 from enum import Enum
+import hashlib
+import heapq
+import itertools
+import operator
 import re
 import logging
+import sys
+import threading
+
+import numpy as np
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+from .cache_manager import LRUCache
 
 logger = logging.getLogger(__name__)
 
+# 每个匹配0.1分，达到该匹配数即饱和为1.0，后续匹配无需再统计
+_SATURATION_MATCHES = 10
+
+# classify_many拼接文本使用的分隔符（记录分隔符，不会出现在关键词中）
+_BATCH_SEPARATOR = "\x1e"
+
 
 class GenreCategory(Enum):
     """类型分类枚举"""
@@ -60,14 +88,182 @@ class GenreCategory(Enum):
     ADVENTURE = "冒险小说"
 
 
+# 类型描述（静态数据，所有实例共享）
+_GENRE_DESCRIPTIONS: Dict[GenreCategory, str] = {
+    GenreCategory.ROMANCE: "以男女主角的情感拉扯为核心的故事",
+    GenreCategory.XUANHUAN: "包含东方幻想元素，如修炼、法术等的小说",
+    GenreCategory.XIANXIA: "以修仙、成仙为主题的幻想小说",
+    GenreCategory.SUSPENSE: "充满谜题、信息差和紧张氛围，让读者不断猜测的故事",
+    GenreCategory.SCIFI: "包含未来科技、星际社会等元素的小说",
+    GenreCategory.FANTASY: "泛指包含魔法、异世界等元素的幻想故事",
+    GenreCategory.BRAINHOLE: "设定新颖、创意独特的小说",
+    GenreCategory.URBAN: "故事背景发生在现代城市的小说，常与异能、商战等元素结合",
+    GenreCategory.HISTORY: "以历史时期为背景的小说",
+    GenreCategory.GUVAN: "背景设定在古代的言情小说",
+    GenreCategory.NO_CP: "没有固定恋爱关系或感情线的小说",
+    GenreCategory.REBIRTH: "主角死亡后回到过去，获得重来一次机会的故事",
+    GenreCategory.TRANSMIGRATION: "主角的灵魂穿越到另一个时空或另一个人身上的故事",
+    GenreCategory.BOOK_TRANSMIGRATION: "主角穿越到自己读过的一本小说世界里的故事",
+    GenreCategory.SYSTEM: "主角获得一个类似游戏系统的金手指，可以通过完成任务获得奖励",
+    GenreCategory.UNLIMITED_FLOW: "主角被卷入一个个不同的、充满任务和危机的副本世界中求生",
+    GenreCategory.REVENGE: "以主角向仇人复仇为主线的故事",
+    GenreCategory.LEVEL_UP: "主角通过不断打怪、修炼或完成任务来提升自身实力",
+    GenreCategory.SATISFYING: "情节让读者感到极度畅快、满足的小说",
+    GenreCategory.UNDERDOG: "出身平凡或处于困境的主角，最终逆风翻盘，走向人生巅峰",
+    GenreCategory.TRASH_TO_TREASURE: "开局是被人看不起的'废柴'主角，后期展现出惊人天赋",
+    GenreCategory.FACE_SLAPPING: "主角通过展示实力或揭露真相，让曾经看不起自己的人感到震惊",
+    GenreCategory.GROVELING: "前期伤害女主角的男主角，在女主角离开后，幡然醒悟并追回",
+    GenreCategory.SECRET_IDENTITY: "主角拥有多重不为人知的强大身份，并在关键时刻逐一揭露",
+    GenreCategory.TRUE_FALSE_DAUGHTER: "围绕身份被互换的两位女性角色展开的故事",
+    GenreCategory.DEIFICATION: "主角的普通行为被周围人过度解读，误认为他是深不可测的高人",
+    GenreCategory.GOING_CRAZY: "主角打破常规，用不合常理但又极其直接的方式应对冲突",
+    GenreCategory.ANGST: "情节曲折，情感痛苦，旨在让读者感受到'虐心'体验",
+    GenreCategory.CP_FOCUSED: "以塑造和描写人物配对的互动和情感发展为核心",
+    GenreCategory.FARMING: "主角通过种地、经商、搞基建等方式，从无到有、发家致富",
+    GenreCategory.PALACE_INTRIGUE: "故事背景设定在皇宫或大家族，围绕权力、地位和人际关系斗争",
+    GenreCategory.APOCALYPTIC: "故事背景设定在世界末日，主角需要努力求生",
+    GenreCategory.ENTERTAINMENT: "故事围绕演艺圈的明星、经纪人等展开",
+    GenreCategory.CEO: "以霸道总裁和普通女主角的爱情故事为核心的现代言情小说",
+    GenreCategory.SUPERNATURAL: "包含鬼怪、灵异事件等元素的故事",
+    GenreCategory.CYBERPUNK: "背景通常是'高科技、低生活'的未来社会",
+    GenreCategory.BUSINESS_WAR: "以现代商业竞争、公司斗争为主要情节的小说",
+    GenreCategory.ADVENTURE: "主角前往未知或危险的地方进行探索，经历重重磨难"
+}
+
+# 类型标签（用于检索和分类）
+_GENRE_TAGS: Dict[GenreCategory, Tuple[str, ...]] = {
+    GenreCategory.ROMANCE: ("言情", "Romance", "爱情", "情感"),
+    GenreCategory.XUANHUAN: ("玄幻", "Xuanhuan", "Fantasy", "东方幻想"),
+    GenreCategory.XIANXIA: ("仙侠", "Xianxia", "修仙"),
+    GenreCategory.SUSPENSE: ("悬疑", "Suspense", "推理", "谜题"),
+    GenreCategory.SCIFI: ("科幻", "Sci-Fi", "未来", "科技"),
+    GenreCategory.FANTASY: ("奇幻", "Fantasy", "魔法", "异世界"),
+    GenreCategory.BRAINHOLE: ("脑洞", "High-concept", "创意"),
+    GenreCategory.URBAN: ("都市", "Urban", "现代", "城市"),
+    GenreCategory.HISTORY: ("历史", "History", "古代"),
+    GenreCategory.GUVAN: ("古言", "Historical Romance", "古代言情"),
+    GenreCategory.NO_CP: ("无CP", "No Couple", "无感情线"),
+    GenreCategory.REBIRTH: ("重生文", "Rebirth", "重生"),
+    GenreCategory.TRANSMIGRATION: ("穿越文", "Transmigration", "穿越"),
+    GenreCategory.BOOK_TRANSMIGRATION: ("穿书文", "Book Transmigration", "穿书"),
+    GenreCategory.SYSTEM: ("系统文", "System", "系统", "金手指"),
+    GenreCategory.UNLIMITED_FLOW: ("无限流", "Unlimited Flow", "无限"),
+    GenreCategory.REVENGE: ("复仇文", "Revenge", "复仇"),
+    GenreCategory.LEVEL_UP: ("升级流", "Level-up", "升级"),
+    GenreCategory.SATISFYING: ("爽文", "Satisfying", "爽"),
+    GenreCategory.UNDERDOG: ("屌丝逆袭", "Underdog", "逆袭"),
+    GenreCategory.TRASH_TO_TREASURE: ("废柴流", "Trash-to-Treasure", "废柴"),
+    GenreCategory.FACE_SLAPPING: ("打脸爽文", "Face-slapping", "打脸"),
+    GenreCategory.GROVELING: ("追妻火葬场", "Groveling", "追妻"),
+    GenreCategory.SECRET_IDENTITY: ("马甲文", "Secret Identity", "马甲"),
+    GenreCategory.TRUE_FALSE_DAUGHTER: ("真假千金", "True/False Daughter", "真假"),
+    GenreCategory.DEIFICATION: ("迪化文", "Deification", "迪化", "误解"),
+    GenreCategory.GOING_CRAZY: ("发疯文学", "Going Crazy", "发疯"),
+    GenreCategory.ANGST: ("虐文", "Angst", "虐"),
+    GenreCategory.CP_FOCUSED: ("CP塑造", "CP-focused", "CP"),
+    GenreCategory.FARMING: ("种田文", "Farming", "种田"),
+    GenreCategory.PALACE_INTRIGUE: ("宫斗/宅斗", "Palace Intrigue", "宫斗"),
+    GenreCategory.APOCALYPTIC: ("末世文", "Apocalyptic", "末世"),
+    GenreCategory.ENTERTAINMENT: ("娱乐圈文", "Entertainment", "娱乐圈"),
+    GenreCategory.CEO: ("总裁文", "CEO", "总裁"),
+    GenreCategory.SUPERNATURAL: ("灵异文", "Supernatural", "灵异"),
+    GenreCategory.CYBERPUNK: ("赛博朋克", "Cyberpunk", "赛博"),
+    GenreCategory.BUSINESS_WAR: ("商战文", "Business War", "商战"),
+    GenreCategory.ADVENTURE: ("冒险小说", "Adventure", "冒险")
+}
+# 标签与关键词驻留为同一字符串对象
+_GENRE_TAGS = {genre: tuple(map(sys.intern, tags)) for genre, tags in _GENRE_TAGS.items()}
+
+
+# 分类 -> 类型（get_genres_by_category查表使用）
+_CATEGORY_MAP: Final[Dict[str, Tuple[GenreCategory, ...]]] = {
+    "基础类型": (
+        GenreCategory.ROMANCE, GenreCategory.XUANHUAN, GenreCategory.XIANXIA,
+        GenreCategory.SUSPENSE, GenreCategory.SCIFI, GenreCategory.FANTASY,
+        GenreCategory.BRAINHOLE, GenreCategory.URBAN, GenreCategory.HISTORY,
+        GenreCategory.GUVAN, GenreCategory.NO_CP
+    ),
+    "核心情节": (
+        GenreCategory.REBIRTH, GenreCategory.TRANSMIGRATION,
+        GenreCategory.BOOK_TRANSMIGRATION, GenreCategory.SYSTEM,
+        GenreCategory.UNLIMITED_FLOW, GenreCategory.REVENGE,
+        GenreCategory.LEVEL_UP
+    ),
+    "热门设定": (
+        GenreCategory.SATISFYING, GenreCategory.UNDERDOG,
+        GenreCategory.TRASH_TO_TREASURE, GenreCategory.FACE_SLAPPING,
+        GenreCategory.GROVELING, GenreCategory.SECRET_IDENTITY,
+        GenreCategory.TRUE_FALSE_DAUGHTER, GenreCategory.DEIFICATION,
+        GenreCategory.GOING_CRAZY, GenreCategory.ANGST,
+        GenreCategory.CP_FOCUSED
+    ),
+    "背景职业": (
+        GenreCategory.FARMING, GenreCategory.PALACE_INTRIGUE,
+        GenreCategory.APOCALYPTIC, GenreCategory.ENTERTAINMENT,
+        GenreCategory.CEO, GenreCategory.SUPERNATURAL,
+        GenreCategory.CYBERPUNK, GenreCategory.BUSINESS_WAR,
+        GenreCategory.ADVENTURE
+    ),
+}
+
+
 class GenreClassifier:
     """小说类型分类器"""
     
-    def __init__(self):
-        """初始化分类器"""
+    __slots__ = (
+        "genre_patterns", "genre_descriptions", "genre_tags",
+        "_genre_by_idx", "_genre_index", "_score_cache", "_compiled_patterns",
+        "_keyword_entries", "_keyword_genres", "_kw2genres", "_keyword_automaton",
+        "_keyword_hs_db", "_keyword_hs_entries", "_keyword_hs_lock",
+        "_keyword_trie_pattern", "_keyword_prefixes",
+    )
+    
+    def __init__(self, cache_size: int = 1024):
+        """
+        初始化分类器
+        
+        Args:
+            cache_size: 分类结果缓存容量（0表示关闭）
+        """
         self.genre_patterns = self._build_patterns()
-        self.genre_descriptions = self._build_descriptions()
-        self.genre_tags = self._build_tags()
+        # 得分数组的下标即类型序号
+        self._genre_by_idx: List[GenreCategory] = list(GenreCategory)
+        self._genre_index: Dict[GenreCategory, int] = {
+            genre: idx for idx, genre in enumerate(self._genre_by_idx)
+        }
+        # 文本摘要 -> 只读得分数组
+        self._score_cache = LRUCache(cache_size) if cache_size > 0 else None
+        # 纯关键词的类型合并为一个多模式匹配器，一次扫描统计所有类型：
+        # 优先使用Aho-Corasick自动机，其次Hyperscan，都未安装时使用前缀树正则。
+        # 关键词已统一小写，匹配时只需将文本小写一次，无需逐字符忽略大小写
+        self._keyword_entries = self._build_keyword_entries()
+        self._keyword_genres = {
+            genre for entries in self._keyword_entries.values() for genre, _, _ in entries
+        }
+        # 关键词 -> 所属类型序号（已分词输入直接查表）
+        self._kw2genres: Dict[str, Tuple[int, ...]] = {
+            keyword: tuple(self._genre_index[genre] for genre, _, _ in entries)
+            for keyword, entries in self._keyword_entries.items()
+        }
+        # 含正则元字符的类型仍走正则：构造时一次性编译，每个类型的多个模式合并为一个交替正则。
+        # 模式本身不能安全地改写为小写（如\S、\W），这部分保留IGNORECASE
+        self._compiled_patterns: Dict[GenreCategory, "re.Pattern"] = {
+            genre: re.compile("(?:" + ")|(?:".join(patterns) + ")", re.IGNORECASE)
+            for genre, patterns in self.genre_patterns.items()
+            if genre not in self._keyword_genres
+        }
+        self._keyword_automaton = None
+        self._keyword_hs_db = None
+        self._keyword_trie_pattern = None
+        if self._keyword_entries:
+            if AHOCORASICK_AVAILABLE:
+                self._keyword_automaton = self._build_keyword_automaton()
+            elif HYPERSCAN_AVAILABLE:
+                self._keyword_hs_db = self._build_keyword_hyperscan()
+            if self._keyword_automaton is None and self._keyword_hs_db is None:
+                self._keyword_trie_pattern = self._build_keyword_trie_pattern()
+        self.genre_descriptions = _GENRE_DESCRIPTIONS
+        self.genre_tags = _GENRE_TAGS
     
     def _build_patterns(self) -> Dict[GenreCategory, List[str]]:
         """构建类型识别模式"""
@@ -241,90 +437,149 @@ class GenreClassifier:
             ]
         }
     
-    def _build_descriptions(self) -> Dict[GenreCategory, str]:
-        """构建类型描述"""
+    def _build_keyword_entries(self) -> Dict[str, List[Tuple[GenreCategory, int, int]]]:
+        """
+        收集纯关键词模式：小写关键词 -> [(类型, 在该类型交替正则中的次序, 关键词长度)]
+        
+        次序用于还原正则的最左优先匹配语义；含正则元字符的类型不收集，仍走正则。
+        """
+        entries: Dict[str, Dict[GenreCategory, int]] = {}
+        for genre, patterns in self.genre_patterns.items():
+            keywords = [keyword for pattern in patterns for keyword in pattern.split("|")]
+            if not all(keyword and re.escape(keyword) == keyword for keyword in keywords):
+                continue
+            for priority, keyword in enumerate(keywords):
+                # 驻留关键词：多个类型共用的关键词、标签及前缀表共享同一字符串对象
+                entries.setdefault(sys.intern(keyword.lower()), {}).setdefault(genre, priority)
+        
         return {
-            GenreCategory.ROMANCE: "以男女主角的情感拉扯为核心的故事",
-            GenreCategory.XUANHUAN: "包含东方幻想元素，如修炼、法术等的小说",
-            GenreCategory.XIANXIA: "以修仙、成仙为主题的幻想小说",
-            GenreCategory.SUSPENSE: "充满谜题、信息差和紧张氛围，让读者不断猜测的故事",
-            GenreCategory.SCIFI: "包含未来科技、星际社会等元素的小说",
-            GenreCategory.FANTASY: "泛指包含魔法、异世界等元素的幻想故事",
-            GenreCategory.BRAINHOLE: "设定新颖、创意独特的小说",
-            GenreCategory.URBAN: "故事背景发生在现代城市的小说，常与异能、商战等元素结合",
-            GenreCategory.HISTORY: "以历史时期为背景的小说",
-            GenreCategory.GUVAN: "背景设定在古代的言情小说",
-            GenreCategory.NO_CP: "没有固定恋爱关系或感情线的小说",
-            GenreCategory.REBIRTH: "主角死亡后回到过去，获得重来一次机会的故事",
-            GenreCategory.TRANSMIGRATION: "主角的灵魂穿越到另一个时空或另一个人身上的故事",
-            GenreCategory.BOOK_TRANSMIGRATION: "主角穿越到自己读过的一本小说世界里的故事",
-            GenreCategory.SYSTEM: "主角获得一个类似游戏系统的金手指，可以通过完成任务获得奖励",
-            GenreCategory.UNLIMITED_FLOW: "主角被卷入一个个不同的、充满任务和危机的副本世界中求生",
-            GenreCategory.REVENGE: "以主角向仇人复仇为主线的故事",
-            GenreCategory.LEVEL_UP: "主角通过不断打怪、修炼或完成任务来提升自身实力",
-            GenreCategory.SATISFYING: "情节让读者感到极度畅快、满足的小说",
-            GenreCategory.UNDERDOG: "出身平凡或处于困境的主角，最终逆风翻盘，走向人生巅峰",
-            GenreCategory.TRASH_TO_TREASURE: "开局是被人看不起的'废柴'主角，后期展现出惊人天赋",
-            GenreCategory.FACE_SLAPPING: "主角通过展示实力或揭露真相，让曾经看不起自己的人感到震惊",
-            GenreCategory.GROVELING: "前期伤害女主角的男主角，在女主角离开后，幡然醒悟并追回",
-            GenreCategory.SECRET_IDENTITY: "主角拥有多重不为人知的强大身份，并在关键时刻逐一揭露",
-            GenreCategory.TRUE_FALSE_DAUGHTER: "围绕身份被互换的两位女性角色展开的故事",
-            GenreCategory.DEIFICATION: "主角的普通行为被周围人过度解读，误认为他是深不可测的高人",
-            GenreCategory.GOING_CRAZY: "主角打破常规，用不合常理但又极其直接的方式应对冲突",
-            GenreCategory.ANGST: "情节曲折，情感痛苦，旨在让读者感受到'虐心'体验",
-            GenreCategory.CP_FOCUSED: "以塑造和描写人物配对的互动和情感发展为核心",
-            GenreCategory.FARMING: "主角通过种地、经商、搞基建等方式，从无到有、发家致富",
-            GenreCategory.PALACE_INTRIGUE: "故事背景设定在皇宫或大家族，围绕权力、地位和人际关系斗争",
-            GenreCategory.APOCALYPTIC: "故事背景设定在世界末日，主角需要努力求生",
-            GenreCategory.ENTERTAINMENT: "故事围绕演艺圈的明星、经纪人等展开",
-            GenreCategory.CEO: "以霸道总裁和普通女主角的爱情故事为核心的现代言情小说",
-            GenreCategory.SUPERNATURAL: "包含鬼怪、灵异事件等元素的故事",
-            GenreCategory.CYBERPUNK: "背景通常是'高科技、低生活'的未来社会",
-            GenreCategory.BUSINESS_WAR: "以现代商业竞争、公司斗争为主要情节的小说",
-            GenreCategory.ADVENTURE: "主角前往未知或危险的地方进行探索，经历重重磨难"
+            keyword: [(genre, priority, len(keyword)) for genre, priority in genres.items()]
+            for keyword, genres in entries.items()
         }
     
-    def _build_tags(self) -> Dict[GenreCategory, List[str]]:
-        """构建类型标签（用于检索和分类）"""
+    def _build_keyword_automaton(self):
+        """将关键词构建为Aho-Corasick自动机"""
+        automaton = ahocorasick.Automaton()
+        for keyword, entries in self._keyword_entries.items():
+            automaton.add_word(keyword, entries)
+        automaton.make_automaton()
+        return automaton
+    
+    def _build_keyword_hyperscan(self):
+        """
+        将关键词编译为Hyperscan多模式数据库（未安装pyahocorasick时使用），编译失败返回None
+        
+        Hyperscan按UTF-8字节报告偏移，条目中的长度也换算为字节数，贪心去重语义不变。
+        """
+        keywords = list(self._keyword_entries)
+        try:
+            db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            db.compile(
+                expressions=[re.escape(keyword).encode("utf-8") for keyword in keywords],
+                ids=list(range(len(keywords))),
+                elements=len(keywords),
+                flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(keywords)
+            )
+        except hyperscan.error as e:
+            logger.warning(f"Hyperscan编译失败: {e}，使用前缀树正则")
+            return None
+        
+        self._keyword_hs_entries = [
+            [(genre, priority, len(keyword.encode("utf-8")))
+             for genre, priority, _ in self._keyword_entries[keyword]]
+            for keyword in keywords
+        ]
+        # 数据库的scratch空间不支持并发扫描
+        self._keyword_hs_lock = threading.Lock()
+        return db
+    
+    def _build_keyword_trie_pattern(self) -> "re.Pattern":
+        """
+        将关键词构建为前缀树，并渲染为按前缀分解的正则（未安装pyahocorasick时使用）
+        
+        正则在每个位置以零宽断言取出最长的关键词；同一位置命中的其余关键词
+        都是它的前缀，由_keyword_prefixes一次查表得到。
+        """
+        trie: Dict = {}
+        for keyword in self._keyword_entries:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = True
+        
+        self._keyword_prefixes: Dict[str, List[str]] = {
+            keyword: [sys.intern(keyword[:i]) for i in range(1, len(keyword) + 1)
+                      if keyword[:i] in self._keyword_entries]
+            for keyword in self._keyword_entries
+        }
+        return re.compile("(?=(" + self._render_trie(trie) + "))")
+    
+    @classmethod
+    def _render_trie(cls, node: Dict) -> str:
+        """将前缀树节点渲染为正则（可选分支为贪婪匹配，保证取到最长关键词）"""
+        branches = [re.escape(char) + cls._render_trie(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if "" in node else group
+    
+    def _iter_keyword_hits(self, text: str):
+        """
+        遍历文本中所有（可重叠的）关键词命中，产出(起点, 条目列表)
+        
+        使用Hyperscan时起点和长度为UTF-8字节偏移，其余为字符偏移。
+        """
+        if self._keyword_automaton is not None:
+            for end, entries in self._keyword_automaton.iter(text):
+                yield end - entries[0][2] + 1, entries
+        elif self._keyword_hs_db is not None:
+            matches = []
+            with self._keyword_hs_lock:
+                self._keyword_hs_db.scan(
+                    text.encode("utf-8"),
+                    match_event_handler=lambda pid, start, end, flags, ctx: matches.append((start, pid))
+                )
+            entries = self._keyword_hs_entries
+            for start, pid in matches:
+                yield start, entries[pid]
+        else:
+            for match in self._keyword_trie_pattern.finditer(text):
+                start = match.start()
+                for keyword in self._keyword_prefixes[match.group(1)]:
+                    yield start, self._keyword_entries[keyword]
+    
+    def _collect_keyword_hits(self, text_lower: str) -> Dict[GenreCategory, List[Tuple[int, int, int]]]:
+        """收集各类型的关键词命中：类型 -> [(起点, 交替次序, 长度)]"""
+        hits: Dict[GenreCategory, List[Tuple[int, int, int]]] = {}
+        for start, entries in self._iter_keyword_hits(text_lower):
+            for genre, priority, length in entries:
+                hits.setdefault(genre, []).append((start, priority, length))
+        return hits
+    
+    @staticmethod
+    def _iter_non_overlapping(genre_hits: List[Tuple[int, int, int]]):
+        """
+        按起点和交替次序贪心选取不重叠的命中，产出选中命中的起点
+        
+        与交替正则findall的计数一致。
+        """
+        genre_hits.sort()
+        pos = 0
+        for start, _, length in genre_hits:
+            if start >= pos:
+                yield start
+                pos = start + length
+    
+    def _count_keyword_matches(self, text_lower: str) -> Dict[GenreCategory, int]:
+        """一次扫描统计各类型的关键词匹配数（达到饱和数即停止计数；文本需已小写）"""
+        hits = self._collect_keyword_hits(text_lower)
         return {
-            GenreCategory.ROMANCE: ["言情", "Romance", "爱情", "情感"],
-            GenreCategory.XUANHUAN: ["玄幻", "Xuanhuan", "Fantasy", "东方幻想"],
-            GenreCategory.XIANXIA: ["仙侠", "Xianxia", "修仙"],
-            GenreCategory.SUSPENSE: ["悬疑", "Suspense", "推理", "谜题"],
-            GenreCategory.SCIFI: ["科幻", "Sci-Fi", "未来", "科技"],
-            GenreCategory.FANTASY: ["奇幻", "Fantasy", "魔法", "异世界"],
-            GenreCategory.BRAINHOLE: ["脑洞", "High-concept", "创意"],
-            GenreCategory.URBAN: ["都市", "Urban", "现代", "城市"],
-            GenreCategory.HISTORY: ["历史", "History", "古代"],
-            GenreCategory.GUVAN: ["古言", "Historical Romance", "古代言情"],
-            GenreCategory.NO_CP: ["无CP", "No Couple", "无感情线"],
-            GenreCategory.REBIRTH: ["重生文", "Rebirth", "重生"],
-            GenreCategory.TRANSMIGRATION: ["穿越文", "Transmigration", "穿越"],
-            GenreCategory.BOOK_TRANSMIGRATION: ["穿书文", "Book Transmigration", "穿书"],
-            GenreCategory.SYSTEM: ["系统文", "System", "系统", "金手指"],
-            GenreCategory.UNLIMITED_FLOW: ["无限流", "Unlimited Flow", "无限"],
-            GenreCategory.REVENGE: ["复仇文", "Revenge", "复仇"],
-            GenreCategory.LEVEL_UP: ["升级流", "Level-up", "升级"],
-            GenreCategory.SATISFYING: ["爽文", "Satisfying", "爽"],
-            GenreCategory.UNDERDOG: ["屌丝逆袭", "Underdog", "逆袭"],
-            GenreCategory.TRASH_TO_TREASURE: ["废柴流", "Trash-to-Treasure", "废柴"],
-            GenreCategory.FACE_SLAPPING: ["打脸爽文", "Face-slapping", "打脸"],
-            GenreCategory.GROVELING: ["追妻火葬场", "Groveling", "追妻"],
-            GenreCategory.SECRET_IDENTITY: ["马甲文", "Secret Identity", "马甲"],
-            GenreCategory.TRUE_FALSE_DAUGHTER: ["真假千金", "True/False Daughter", "真假"],
-            GenreCategory.DEIFICATION: ["迪化文", "Deification", "迪化", "误解"],
-            GenreCategory.GOING_CRAZY: ["发疯文学", "Going Crazy", "发疯"],
-            GenreCategory.ANGST: ["虐文", "Angst", "虐"],
-            GenreCategory.CP_FOCUSED: ["CP塑造", "CP-focused", "CP"],
-            GenreCategory.FARMING: ["种田文", "Farming", "种田"],
-            GenreCategory.PALACE_INTRIGUE: ["宫斗/宅斗", "Palace Intrigue", "宫斗"],
-            GenreCategory.APOCALYPTIC: ["末世文", "Apocalyptic", "末世"],
-            GenreCategory.ENTERTAINMENT: ["娱乐圈文", "Entertainment", "娱乐圈"],
-            GenreCategory.CEO: ["总裁文", "CEO", "总裁"],
-            GenreCategory.SUPERNATURAL: ["灵异文", "Supernatural", "灵异"],
-            GenreCategory.CYBERPUNK: ["赛博朋克", "Cyberpunk", "赛博"],
-            GenreCategory.BUSINESS_WAR: ["商战文", "Business War", "商战"],
-            GenreCategory.ADVENTURE: ["冒险小说", "Adventure", "冒险"]
+            genre: sum(1 for _ in itertools.islice(self._iter_non_overlapping(genre_hits),
+                                                   _SATURATION_MATCHES))
+            for genre, genre_hits in hits.items()
         }
     
     def classify_text(self, text: str) -> Dict[GenreCategory, float]:
@@ -333,28 +588,125 @@ class GenreClassifier:
         Returns:
             {类型: 匹配度(0-1)}
         """
-        scores = {}
-        text_lower = text.lower()
+        scores, genres = self.classify_text_array(text)
+        return dict(zip(genres, scores.tolist()))
+    
+    def classify_text_array(self, text: str) -> Tuple[np.ndarray, List[GenreCategory]]:
+        """
+        分类文本，以数组形式返回匹配度
         
-        for genre, patterns in self.genre_patterns.items():
-            score = 0.0
-            matches = 0
-            
-            for pattern in patterns:
-                pattern_matches = len(re.findall(pattern, text, re.IGNORECASE))
-                matches += pattern_matches
-                score += pattern_matches * 0.1  # 每个匹配增加0.1分
-            
-            # 归一化到0-1
-            scores[genre] = min(score, 1.0)
+        Returns:
+            (得分数组, 类型列表)，scores[i]为genres[i]的匹配度；数组只读
+        """
+        if self._score_cache is None:
+            return self._score_text(text), self._genre_by_idx
         
+        # 以摘要为键，不在缓存中保存整段文本
+        cache_key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        scores = self._score_cache.get(cache_key)
+        if scores is None:
+            scores = self._score_text(text)
+            self._score_cache.set(cache_key, scores)
+        return scores, self._genre_by_idx
+    
+    def _score_text(self, text: str) -> np.ndarray:
+        """计算各类型得分（下标为类型序号）"""
+        scores = np.zeros(len(self._genre_by_idx), dtype=np.float64)
+        if self._keyword_genres:
+            for genre, count in self._count_keyword_matches(text.lower()).items():
+                scores[self._genre_index[genre]] = count
+        
+        for genre, pattern in self._compiled_patterns.items():
+            # 饱和后停止扫描，不再统计全部匹配
+            matches = pattern.finditer(text)
+            scores[self._genre_index[genre]] = sum(1 for _ in itertools.islice(matches, _SATURATION_MATCHES))
+        
+        # 每个匹配增加0.1分，归一化到0-1
+        np.multiply(scores, 0.1, out=scores)
+        np.minimum(scores, 1.0, out=scores)
+        # 结果会被缓存共享，禁止调用方原地修改
+        scores.flags.writeable = False
         return scores
     
+    def classify_tokens(self, tokens: Iterable[str]) -> Dict[GenreCategory, float]:
+        """
+        分类已分词的文本，每个词直接查关键词表，不再扫描原文
+        
+        只统计纯关键词类型；含正则元字符的类型需要原文，请使用classify_text。
+        
+        Args:
+            tokens: 词序列
+        
+        Returns:
+            {类型: 匹配度(0-1)}
+        """
+        # 逐词累加用列表，避免每个词一次数组索引的开销
+        counts = [0] * len(self._genre_by_idx)
+        kw2genres = self._kw2genres
+        for token in tokens:
+            indices = kw2genres.get(token.lower())
+            if indices:
+                for idx in indices:
+                    counts[idx] += 1
+        
+        # 每个匹配增加0.1分，归一化到0-1
+        return {
+            genre: min(count * 0.1, 1.0)
+            for genre, count in zip(self._genre_by_idx, counts)
+        }
+    
+    def classify_many(self, texts: List[str]) -> np.ndarray:
+        """
+        批量分类多段文本（适合章节标题、摘要等大量短文本）
+        
+        文本以分隔符拼接后每个匹配器只扫描一遍，再按命中位置归属到各段文本。
+        
+        Args:
+            texts: 文本列表
+        
+        Returns:
+            形状为(文本数, 类型数)的得分数组，列顺序同get_all_genres()
+        """
+        counts = np.zeros((len(texts), len(self._genre_by_idx)), dtype=np.float64)
+        if not texts:
+            return counts
+        
+        if self._keyword_genres:
+            # 小写可能改变长度，偏移量按小写后的文本计算
+            lowered = [text.lower() for text in texts]
+            if self._keyword_hs_db is not None:
+                # Hyperscan按UTF-8字节报告偏移
+                ends = np.cumsum([len(text.encode("utf-8")) + 1 for text in lowered])
+            else:
+                ends = np.cumsum([len(text) + 1 for text in lowered])
+            hits = self._collect_keyword_hits(_BATCH_SEPARATOR.join(lowered))
+            for genre, genre_hits in hits.items():
+                starts = np.fromiter(self._iter_non_overlapping(genre_hits), dtype=np.int64)
+                rows = np.searchsorted(ends, starts, side="right")
+                np.add.at(counts[:, self._genre_index[genre]], rows, 1)
+        
+        if self._compiled_patterns:
+            ends = np.cumsum([len(text) + 1 for text in texts])
+            joined = _BATCH_SEPARATOR.join(texts)
+            for genre, pattern in self._compiled_patterns.items():
+                starts = np.fromiter(
+                    (match.start() for match in pattern.finditer(joined)),
+                    dtype=np.int64
+                )
+                rows = np.searchsorted(ends, starts, side="right")
+                np.add.at(counts[:, self._genre_index[genre]], rows, 1)
+        
+        # 每个匹配增加0.1分，归一化到0-1
+        np.multiply(counts, 0.1, out=counts)
+        np.minimum(counts, 1.0, out=counts)
+        return counts
+    
     def get_primary_genres(self, text: str, top_k: int = 3) -> List[Tuple[GenreCategory, float]]:
         """获取主要类型（按匹配度排序）"""
-        scores = self.classify_text(text)
-        sorted_genres = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-        return [(genre, score) for genre, score in sorted_genres[:top_k] if score > 0]
+        scores, genres = self.classify_text_array(text)
+        # 类型数很少，堆选取top-k比数组分区的调用开销更低；并列时保持类型顺序
+        top = heapq.nlargest(top_k, zip(genres, scores.tolist()), key=operator.itemgetter(1))
+        return [(genre, score) for genre, score in top if score > 0]
     
     def get_genre_description(self, genre: GenreCategory) -> str:
         """获取类型描述"""
@@ -362,7 +714,7 @@ class GenreClassifier:
     
     def get_genre_tags(self, genre: GenreCategory) -> List[str]:
         """获取类型标签"""
-        return self.genre_tags.get(genre, [])
+        return list(self.genre_tags.get(genre, ()))
     
     def get_all_genres(self) -> List[GenreCategory]:
         """获取所有支持的类型"""
@@ -373,37 +725,19 @@ class GenreClassifier:
         按分类获取类型
         category: "基础类型" / "核心情节" / "热门设定" / "背景职业"
         """
-        if category == "基础类型":
-            return [
-                GenreCategory.ROMANCE, GenreCategory.XUANHUAN, GenreCategory.XIANXIA,
-                GenreCategory.SUSPENSE, GenreCategory.SCIFI, GenreCategory.FANTASY,
-                GenreCategory.BRAINHOLE, GenreCategory.URBAN, GenreCategory.HISTORY,
-                GenreCategory.GUVAN, GenreCategory.NO_CP
-            ]
-        elif category == "核心情节":
-            return [
-                GenreCategory.REBIRTH, GenreCategory.TRANSMIGRATION,
-                GenreCategory.BOOK_TRANSMIGRATION, GenreCategory.SYSTEM,
-                GenreCategory.UNLIMITED_FLOW, GenreCategory.REVENGE,
-                GenreCategory.LEVEL_UP
-            ]
-        elif category == "热门设定":
-            return [
-                GenreCategory.SATISFYING, GenreCategory.UNDERDOG,
-                GenreCategory.TRASH_TO_TREASURE, GenreCategory.FACE_SLAPPING,
-                GenreCategory.GROVELING, GenreCategory.SECRET_IDENTITY,
-                GenreCategory.TRUE_FALSE_DAUGHTER, GenreCategory.DEIFICATION,
-                GenreCategory.GOING_CRAZY, GenreCategory.ANGST,
-                GenreCategory.CP_FOCUSED
-            ]
-        elif category == "背景职业":
-            return [
-                GenreCategory.FARMING, GenreCategory.PALACE_INTRIGUE,
-                GenreCategory.APOCALYPTIC, GenreCategory.ENTERTAINMENT,
-                GenreCategory.CEO, GenreCategory.SUPERNATURAL,
-                GenreCategory.CYBERPUNK, GenreCategory.BUSINESS_WAR,
-                GenreCategory.ADVENTURE
-            ]
-        else:
-            return []
+        return list(_CATEGORY_MAP.get(category, ()))
+
+
+# 全局默认分类器实例（构建模式与关键词匹配器开销较大，进程内共享）
+_default_classifier: Optional[GenreClassifier] = None
+_default_classifier_lock = threading.Lock()
+
 
+def get_default_classifier() -> GenreClassifier:
+    """获取默认分类器实例（单例模式，线程安全）"""
+    global _default_classifier
+    if _default_classifier is None:
+        with _default_classifier_lock:
+            if _default_classifier is None:
+                _default_classifier = GenreClassifier()
+    return _default_classifier
@@ -3,22 +3,48 @@
 用于指导情节设计和节奏控制
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from collections import Counter
 from enum import Enum
 from dataclasses import dataclass
+import hashlib
 import logging
+import re
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+from .cache_manager import LRUCache
 
 logger = logging.getLogger(__name__)
 
 
-class HookStage(Enum):
-    """Hook模型四个阶段"""
+class HookStage(str, Enum):
+    """Hook模型四个阶段（继承str，作为字典键时使用str的C实现哈希）"""
     TRIGGER = "触发"
     ACTION = "行动"
     REWARD = "奖励"
     INVESTMENT = "投入"
 
 
+# 各阶段的检查关键词及得分倍率：得分 = min(命中关键词数 / 关键词总数 * 倍率, 1.0)
+_STAGE_KEYWORDS: Dict[HookStage, Tuple[str, ...]] = {
+    HookStage.TRIGGER: ("逆袭", "打脸", "屈辱", "嘲笑", "愤怒", "不甘", "发誓", "决心"),
+    HookStage.ACTION: ("立刻", "突然", "眨眼间", "毫不犹豫", "直接", "马上"),
+    HookStage.REWARD: ("没想到", "出乎意料", "意外", "惊喜", "峰回路转", "异变"),
+    HookStage.INVESTMENT: ("一步步", "渐渐", "积累", "成就", "羁绊", "回忆", "不舍"),
+}
+_STAGE_WEIGHTS: Dict[HookStage, int] = {
+    HookStage.TRIGGER: 3,
+    HookStage.ACTION: 2,
+    HookStage.REWARD: 2,
+    HookStage.INVESTMENT: 2,
+}
+
+
 @dataclass
 class StageGuide:
     """阶段指导"""
@@ -33,8 +59,56 @@ class StageGuide:
 class HookModelGuide:
     """Hook模型写作指导"""
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 256):
+        """
+        初始化写作指导
+        
+        Args:
+            cache_size: 章节分析结果缓存容量（0表示关闭）
+        """
         self.stage_guides = self._build_stage_guides()
+        # 章节内容摘要 -> 各阶段得分；重复分析同一章节（如先分析再给建议）时不再扫描全文
+        self._score_cache = LRUCache(cache_size) if cache_size > 0 else None
+        # 关键词 -> 所属阶段；所有阶段的关键词合并为一个自动机，单次扫描章节
+        self._keyword_stages: Dict[str, Tuple[HookStage, ...]] = {}
+        for stage, keywords in _STAGE_KEYWORDS.items():
+            for keyword in keywords:
+                self._keyword_stages[keyword] = self._keyword_stages.get(keyword, ()) + (stage,)
+        self._keyword_automaton = self._build_keyword_automaton() if AHOCORASICK_AVAILABLE else None
+        # 未安装pyahocorasick时使用合并后的正则，与其他关键词重叠的关键词单独检查
+        self._keyword_pattern: Optional["re.Pattern"] = None
+        self._overlapping_keywords: Tuple[str, ...] = ()
+        if self._keyword_automaton is None:
+            self._build_keyword_pattern()
+    
+    def _build_keyword_automaton(self):
+        """将各阶段关键词构建为Aho-Corasick自动机"""
+        automaton = ahocorasick.Automaton()
+        for keyword in self._keyword_stages:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return automaton
+    
+    def _build_keyword_pattern(self):
+        """
+        将关键词合并为一个正则（未安装pyahocorasick时使用）
+        
+        正则按非重叠方式扫描，会漏掉与其他关键词包含或首尾相接的关键词，
+        这些关键词不放入正则，改为单独用in检查。
+        """
+        keywords = list(self._keyword_stages)
+        
+        def overlaps(a: str, b: str) -> bool:
+            return a in b or b in a or any(
+                a.endswith(b[:i]) or b.endswith(a[:i]) for i in range(1, min(len(a), len(b)))
+            )
+        
+        self._overlapping_keywords = tuple(
+            a for a in keywords if any(a != b and overlaps(a, b) for b in keywords)
+        )
+        pattern_keywords = [k for k in keywords if k not in self._overlapping_keywords]
+        if pattern_keywords:
+            self._keyword_pattern = re.compile("|".join(map(re.escape, pattern_keywords)))
     
     def _build_stage_guides(self) -> Dict[HookStage, StageGuide]:
         """构建阶段指导"""
@@ -134,53 +208,92 @@ class HookModelGuide:
         Returns:
             {阶段: 应用程度(0-1)}
         """
+        stage_scores = self._get_stage_scores(chapter_content)
         scores = {}
         
         # 根据章节位置判断主要阶段
         if chapter_number <= 5:
             # 前5章主要是触发和行动阶段
-            scores[HookStage.TRIGGER] = self._check_trigger_elements(chapter_content)
-            scores[HookStage.ACTION] = self._check_action_elements(chapter_content)
-            scores[HookStage.REWARD] = self._check_reward_elements(chapter_content)
+            scores[HookStage.TRIGGER] = stage_scores[HookStage.TRIGGER]
+            scores[HookStage.ACTION] = stage_scores[HookStage.ACTION]
+            scores[HookStage.REWARD] = stage_scores[HookStage.REWARD]
             scores[HookStage.INVESTMENT] = 0.2  # 早期投入较少
         elif chapter_number <= 50:
             # 中期主要是行动和奖励阶段
             scores[HookStage.TRIGGER] = 0.3
-            scores[HookStage.ACTION] = self._check_action_elements(chapter_content)
-            scores[HookStage.REWARD] = self._check_reward_elements(chapter_content)
-            scores[HookStage.INVESTMENT] = self._check_investment_elements(chapter_content)
+            scores[HookStage.ACTION] = stage_scores[HookStage.ACTION]
+            scores[HookStage.REWARD] = stage_scores[HookStage.REWARD]
+            scores[HookStage.INVESTMENT] = stage_scores[HookStage.INVESTMENT]
         else:
             # 后期主要是奖励和投入阶段
             scores[HookStage.TRIGGER] = 0.2
             scores[HookStage.ACTION] = 0.4
-            scores[HookStage.REWARD] = self._check_reward_elements(chapter_content)
-            scores[HookStage.INVESTMENT] = self._check_investment_elements(chapter_content)
+            scores[HookStage.REWARD] = stage_scores[HookStage.REWARD]
+            scores[HookStage.INVESTMENT] = stage_scores[HookStage.INVESTMENT]
         
         return scores
     
-    def _check_trigger_elements(self, content: str) -> float:
-        """检查触发元素"""
-        trigger_keywords = ["逆袭", "打脸", "屈辱", "嘲笑", "愤怒", "不甘", "发誓", "决心"]
-        matches = sum(1 for keyword in trigger_keywords if keyword in content)
-        return min(matches / len(trigger_keywords) * 3, 1.0)
-    
-    def _check_action_elements(self, content: str) -> float:
-        """检查行动元素"""
-        action_keywords = ["立刻", "突然", "眨眼间", "毫不犹豫", "直接", "马上"]
-        matches = sum(1 for keyword in action_keywords if keyword in content)
-        return min(matches / len(action_keywords) * 2, 1.0)
+    def analyze_chapters(self, contents: List[str], chapter_numbers: List[int]) -> List[Dict[HookStage, float]]:
+        """
+        批量分析多个章节的Hook模型应用情况
+        
+        Args:
+            contents: 章节内容列表
+            chapter_numbers: 与contents一一对应的章节序号
+        
+        Returns:
+            与输入顺序一致的 [{阶段: 应用程度(0-1)}]
+        """
+        if len(contents) != len(chapter_numbers):
+            raise ValueError(f"章节内容与章节序号数量不一致: {len(contents)} != {len(chapter_numbers)}")
+        
+        # 各章节共用同一自动机和得分缓存，重复章节只扫描一次
+        return [
+            self.analyze_chapter(content, chapter_number)
+            for content, chapter_number in zip(contents, chapter_numbers)
+        ]
     
-    def _check_reward_elements(self, content: str) -> float:
-        """检查奖励元素"""
-        reward_keywords = ["没想到", "出乎意料", "意外", "惊喜", "峰回路转", "异变"]
-        matches = sum(1 for keyword in reward_keywords if keyword in content)
-        return min(matches / len(reward_keywords) * 2, 1.0)
+    def _get_stage_scores(self, content: str) -> Dict[HookStage, float]:
+        """获取各阶段得分（按内容摘要缓存，返回值不可修改）"""
+        if self._score_cache is None:
+            return self._score_all(content)
+        
+        # 以摘要为键，不在缓存中保存整章文本
+        cache_key = hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+        stage_scores = self._score_cache.get(cache_key)
+        if stage_scores is None:
+            stage_scores = self._score_all(content)
+            self._score_cache.set(cache_key, stage_scores)
+        return stage_scores
     
-    def _check_investment_elements(self, content: str) -> float:
-        """检查投入元素"""
-        investment_keywords = ["一步步", "渐渐", "积累", "成就", "羁绊", "回忆", "不舍"]
-        matches = sum(1 for keyword in investment_keywords if keyword in content)
-        return min(matches / len(investment_keywords) * 2, 1.0)
+    def _score_all(self, content: str) -> Dict[HookStage, float]:
+        """
+        单次扫描检查各阶段元素
+        
+        每个关键词只按是否出现计一次；所有关键词都已出现时提前结束扫描。
+        优先使用Aho-Corasick自动机，未安装时使用合并后的正则，两者都在C层完成扫描。
+        """
+        if self._keyword_automaton is not None:
+            found = set()
+            for _, keyword in self._keyword_automaton.iter(content):
+                found.add(keyword)
+                if len(found) == len(self._keyword_stages):
+                    break
+        else:
+            found = set()
+            if self._keyword_pattern is not None:
+                target = len(self._keyword_stages) - len(self._overlapping_keywords)
+                for match in self._keyword_pattern.finditer(content):
+                    found.add(match.group())
+                    if len(found) == target:
+                        break
+            found.update(keyword for keyword in self._overlapping_keywords if keyword in content)
+        
+        counts = Counter(stage for keyword in found for stage in self._keyword_stages[keyword])
+        return {
+            stage: min(counts[stage] / len(keywords) * _STAGE_WEIGHTS[stage], 1.0)
+            for stage, keywords in _STAGE_KEYWORDS.items()
+        }
     
     def generate_stage_guidance(self, stage: HookStage, context: str = "") -> str:
         """生成阶段写作指导"""
@@ -4,20 +4,55 @@
 """
 
 import re
-from typing import Any, Dict, List, Optional, Callable
+from typing import Any, Dict, List, Optional, Callable, Tuple, Union
 from datetime import datetime
+from functools import lru_cache
 import logging
 
 from .exceptions import ValidationError
 
 logger = logging.getLogger(__name__)
 
+# 内置格式的正则在模块加载时编译一次
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_URL_RE = re.compile(r'^https?://[^\s/$.?#].[^\s]*$')
+# 显式列出大小写字符类代替re.IGNORECASE（忽略大小写匹配逐字符折叠，慢约2.5倍）；
+# 配合fullmatch使用，末尾可选换行与原先的'$'语义一致
+_UUID_RE = re.compile(
+    r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\n?'
+)
+
+
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern: str) -> "re.Pattern":
+    """编译schema中的pattern规则（按模式字符串缓存）"""
+    return re.compile(pattern)
+
+
+class CompiledSchema:
+    """
+    预编译的验证schema
+    
+    fields中每项为 (字段名, 是否必填, 字段schema, ((验证函数, 规则值), ...))，
+    验证函数已按规则顺序解析完毕，验证时无需再查表和分支判断。
+    """
+    
+    __slots__ = ("fields",)
+    
+    def __init__(self, fields: Tuple[Tuple[str, bool, Dict[str, Any], Tuple[Tuple[Callable, Any], ...]], ...]):
+        self.fields = fields
+
 
 class InputValidator:
     """输入验证器"""
     
-    def __init__(self):
-        """初始化验证器"""
+    def __init__(self, schema_cache_size: int = 128):
+        """
+        初始化验证器
+        
+        Args:
+            schema_cache_size: 预编译schema的缓存容量
+        """
         self.validators: Dict[str, Callable] = {
             'required': self._validate_required,
             'string': self._validate_string,
@@ -34,14 +69,61 @@ class InputValidator:
             'pattern': self._validate_pattern,
             'custom': self._validate_custom
         }
+        # id(schema) -> (schema, 编译结果)；持有schema引用，保证id在缓存期间不被复用
+        # 使用普通字典：单次查找无需加锁，常量schema的命中开销最低
+        self._compiled_schemas: Dict[int, Tuple[Dict[str, Any], CompiledSchema]] = {}
+        self._schema_cache_size = schema_cache_size
     
-    def validate(self, data: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
+    def compile_schema(self, schema: Dict[str, Any]) -> CompiledSchema:
+        """
+        将schema预编译为按顺序执行的验证函数列表（按schema对象缓存）
+        
+        schema编译后不应再原地修改，否则缓存的编译结果不会随之更新。
+        
+        Args:
+            schema: 验证规则schema
+        
+        Returns:
+            预编译的schema
+        """
+        cached = self._compiled_schemas.get(id(schema))
+        if cached is not None and cached[0] is schema:
+            return cached[1]
+        
+        compiled = CompiledSchema(tuple(
+            (field_name, bool(field_schema.get('required', False)), field_schema,
+             self._compile_field(field_schema))
+            for field_name, field_schema in schema.items()
+        ))
+        if len(self._compiled_schemas) >= self._schema_cache_size:
+            # 动态构造的schema过多时整体清空，常用schema会在下次调用时重新编译
+            self._compiled_schemas.clear()
+        self._compiled_schemas[id(schema)] = (schema, compiled)
+        return compiled
+    
+    def _compile_field(self, schema: Dict[str, Any]) -> Tuple[Tuple[Callable, Any], ...]:
+        """按规则顺序解析单个字段的验证函数"""
+        steps = []
+        for rule_name, rule_value in schema.items():
+            if rule_name == 'required' or rule_name == 'default':
+                continue
+            
+            if rule_name in self.validators:
+                steps.append((self.validators[rule_name], rule_value))
+            elif rule_name == 'type':
+                type_validator = self.validators.get(rule_value)
+                if type_validator:
+                    steps.append((type_validator, None))
+        
+        return tuple(steps)
+    
+    def validate(self, data: Dict[str, Any], schema: Union[Dict[str, Any], CompiledSchema]) -> Dict[str, Any]:
         """
         根据schema验证数据
         
         Args:
             data: 要验证的数据字典
-            schema: 验证规则schema
+            schema: 验证规则schema（或compile_schema的结果）
         
         Returns:
             验证后的数据字典
@@ -49,28 +131,28 @@ class InputValidator:
         Raises:
             ValidationError: 验证失败时抛出
         """
+        if not isinstance(schema, CompiledSchema):
+            schema = self.compile_schema(schema)
+        
         validated_data = {}
         errors = []
         
-        for field_name, field_schema in schema.items():
+        for field_name, required, field_schema, steps in schema.fields:
             value = data.get(field_name)
             
-            # 检查必填字段
-            if field_schema.get('required', False) and value is None:
-                errors.append(f"字段 '{field_name}' 是必填的")
-                continue
-            
-            # 如果字段为空且不是必填，跳过验证
             if value is None:
-                validated_data[field_name] = None
+                # 检查必填字段；非必填的空字段跳过验证
+                if required:
+                    errors.append(f"字段 '{field_name}' 是必填的")
+                else:
+                    validated_data[field_name] = None
                 continue
             
-            # 执行验证规则
+            # 按顺序执行验证规则
             try:
-                validated_value = self._validate_field(
-                    field_name, value, field_schema
-                )
-                validated_data[field_name] = validated_value
+                for validator, rule_value in steps:
+                    value = validator(field_name, value, rule_value, field_schema)
+                validated_data[field_name] = value
             except ValidationError as e:
                 errors.append(str(e))
         
@@ -79,28 +161,6 @@ class InputValidator:
         
         return validated_data
     
-    def _validate_field(self, field_name: str, value: Any, schema: Dict[str, Any]) -> Any:
-        """验证单个字段"""
-        validated_value = value
-        
-        # 按顺序执行验证规则
-        for rule_name, rule_value in schema.items():
-            if rule_name == 'required' or rule_name == 'default':
-                continue
-            
-            if rule_name in self.validators:
-                validated_value = self.validators[rule_name](
-                    field_name, validated_value, rule_value, schema
-                )
-            elif rule_name == 'type':
-                type_validator = self.validators.get(rule_value)
-                if type_validator:
-                    validated_value = type_validator(
-                        field_name, validated_value, None, schema
-                    )
-        
-        return validated_value
-    
     def _validate_required(self, field_name: str, value: Any, rule_value: Any, schema: Dict) -> Any:
         """验证必填字段"""
         if value is None or value == '':
@@ -132,8 +192,8 @@ class InputValidator:
         if not isinstance(value, str):
             raise ValidationError(f"字段 '{field_name}' 必须是字符串类型")
         
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, value):
+        # 先用廉价的字符检查排除明显无效的输入，再用正则做完整确认
+        if '@' not in value or '.' not in value or not _EMAIL_RE.match(value):
             raise ValidationError(f"字段 '{field_name}' 必须是有效的邮箱地址")
         
         return value
@@ -143,8 +203,7 @@ class InputValidator:
         if not isinstance(value, str):
             raise ValidationError(f"字段 '{field_name}' 必须是字符串类型")
         
-        url_pattern = r'^https?://[^\s/$.?#].[^\s]*$'
-        if not re.match(url_pattern, value):
+        if not value.startswith(('http://', 'https://')) or not _URL_RE.match(value):
             raise ValidationError(f"字段 '{field_name}' 必须是有效的URL")
         
         return value
@@ -154,8 +213,7 @@ class InputValidator:
         if not isinstance(value, str):
             raise ValidationError(f"字段 '{field_name}' 必须是字符串类型")
         
-        uuid_pattern = r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
-        if not re.match(uuid_pattern, value, re.IGNORECASE):
+        if len(value) < 36 or not _UUID_RE.fullmatch(value):
             raise ValidationError(f"字段 '{field_name}' 必须是有效的UUID格式")
         
         return value
@@ -213,7 +271,7 @@ class InputValidator:
         if not isinstance(value, str):
             raise ValidationError(f"字段 '{field_name}' 必须是字符串类型")
         
-        if not re.match(rule_value, value):
+        if not _compile_pattern(rule_value).match(value):
             raise ValidationError(f"字段 '{field_name}' 格式不正确")
         
         return value
@@ -281,10 +339,14 @@ CARD_SCHEMA = {
 }
 
 
+# 导入时创建的共享验证器。唯一的可变状态是schema编译缓存，多线程共享仍无需加锁：
+# 字典的单次读写/清空在GIL下是原子的；两个线程同时编译同一schema只会得到等价结果并重复写入同一键；
+# 命中时校验schema对象身份，清空或覆盖只会导致下次重新编译，不会返回错误的编译结果
+_VALIDATOR_INSTANCE = InputValidator()
+
+
 def get_validator() -> InputValidator:
     """获取验证器实例（单例模式）"""
-    if not hasattr(get_validator, '_instance'):
-        get_validator._instance = InputValidator()
-    return get_validator._instance
+    return _VALIDATOR_INSTANCE
 
 
@@ -3,19 +3,25 @@
 支持日志轮转、文件大小限制等功能
 """
 
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import Optional
 
+# 后台写日志的监听器（setup_logging启用队列时创建）
+_queue_listener: Optional[QueueListener] = None
+
 
 def setup_logging(
     log_level: str = "INFO",
     log_file: str = "novel_extractor.log",
     max_bytes: int = 10 * 1024 * 1024,  # 10MB
     backup_count: int = 5,
-    console_output: bool = True
+    console_output: bool = True,
+    use_queue: bool = True
 ) -> logging.Logger:
     """
     设置日志配置，支持日志轮转
@@ -26,14 +32,12 @@ def setup_logging(
         max_bytes: 单个日志文件最大大小（字节）
         backup_count: 保留的备份文件数量
         console_output: 是否输出到控制台
+        use_queue: 是否经队列由后台线程写日志（调用方不再阻塞于文件/控制台I/O）
     
     Returns:
         配置好的logger实例
     """
-    # 创建日志目录（如果不存在）
-    log_path = Path(log_file)
-    if log_path.parent != Path("."):
-        log_path.parent.mkdir(parents=True, exist_ok=True)
+    global _queue_listener
     
     # 获取日志级别
     level = getattr(logging, log_level.upper(), logging.INFO)
@@ -46,13 +50,22 @@ def setup_logging(
     # 创建处理器列表
     handlers = []
     
-    # 文件处理器（带轮转）
-    file_handler = RotatingFileHandler(
-        log_file,
-        maxBytes=max_bytes,
-        backupCount=backup_count,
-        encoding='utf-8'
-    )
+    # 文件处理器（带轮转）；日志目录不存在时才创建，避免每次配置都调用mkdir
+    try:
+        file_handler = RotatingFileHandler(
+            log_file,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding='utf-8'
+        )
+    except FileNotFoundError:
+        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            log_file,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding='utf-8'
+        )
     file_handler.setFormatter(formatter)
     file_handler.setLevel(level)
     handlers.append(file_handler)
@@ -68,12 +81,19 @@ def setup_logging(
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
     
-    # 清除现有处理器
+    # 清除现有处理器（重复配置时先停止上一次的后台线程并关闭其处理器）
+    _stop_queue_listener(close_handlers=True)
     root_logger.handlers.clear()
     
-    # 添加新处理器
-    for handler in handlers:
-        root_logger.addHandler(handler)
+    if use_queue:
+        # 根logger只挂队列处理器，实际写入由后台线程完成
+        log_queue: queue.Queue = queue.Queue(-1)
+        _queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _queue_listener.start()
+        root_logger.addHandler(QueueHandler(log_queue))
+    else:
+        for handler in handlers:
+            root_logger.addHandler(handler)
     
     # 设置第三方库的日志级别
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -83,6 +103,44 @@ def setup_logging(
     return root_logger
 
 
+def get_queue_listener() -> Optional[QueueListener]:
+    """获取当前的后台日志监听器（未启用队列时为None）"""
+    return _queue_listener
+
+
+def _stop_queue_listener(close_handlers: bool) -> Optional[QueueListener]:
+    """停止后台日志线程并写出队列中剩余的日志，返回已停止的监听器"""
+    global _queue_listener
+    listener, _queue_listener = _queue_listener, None
+    if listener is not None:
+        listener.stop()
+        if close_handlers:
+            for handler in listener.handlers:
+                handler.close()
+    return listener
+
+
+def shutdown_logging():
+    """
+    停止后台日志线程：写出队列中剩余的日志
+    
+    根logger上的队列处理器替换回实际的处理器，之后（如其他atexit回调中）
+    记录的日志改为同步写入而不会丢失；处理器由logging.shutdown在退出时关闭。
+    """
+    listener = _stop_queue_listener(close_handlers=False)
+    if listener is None:
+        return
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        if isinstance(handler, QueueHandler) and handler.queue is listener.queue:
+            root_logger.removeHandler(handler)
+    for handler in listener.handlers:
+        root_logger.addHandler(handler)
+
+
+atexit.register(shutdown_logging)
+
+
 def get_logger(name: str) -> logging.Logger:
     """获取指定名称的logger"""
     return logging.getLogger(name)
@@ -4,148 +4,335 @@
 """
 
 import os
+import copy
+import stat
+import tempfile
 import yaml
-import json
-from typing import Dict, List, Optional, Any
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from pathlib import Path
 import logging
 from datetime import datetime
 
+# 优先使用libyaml的C实现
+try:
+    from yaml import CSafeLoader as YAMLLoader, CSafeDumper as YAMLDumper
+except ImportError:
+    from yaml import SafeLoader as YAMLLoader, SafeDumper as YAMLDumper
+
+from .utils import dump_json_bytes, load_json_bytes
+
 logger = logging.getLogger(__name__)
 
+# 进程的umask（os.umask只能通过设置来读取，导入时读取一次）；临时文件默认权限为0600，替换后按此恢复常规权限
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 
 class MemoryManager:
     """记忆体管理器"""
     
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self, output_dir: str = "output", use_json: bool = True):
+        """
+        初始化记忆体管理器
+        
+        Args:
+            output_dir: 输出目录
+            use_json: 伏笔追踪表是否以JSON存储（每章都会重写，JSON序列化远快于YAML；
+                      可用foreshadowing_to_yaml导出YAML视图）
+        """
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # 记忆体文件路径
         self.worldview_path = self.output_dir / "02_世界观记忆体.yaml"
         self.character_path = self.output_dir / "03_人物记忆体.yaml"
         self.plot_path = self.output_dir / "04_剧情规划大纲.yaml"
-        self.foreshadowing_path = self.output_dir / "05_伏笔追踪表.yaml"
+        self.foreshadowing_yaml_path = self.output_dir / "05_伏笔追踪表.yaml"
+        self.foreshadowing_path = (
+            self.output_dir / "05_伏笔追踪表.json" if use_json else self.foreshadowing_yaml_path
+        )
+        self._labels = {
+            self.worldview_path: "世界观记忆体",
+            self.character_path: "人物记忆体",
+            self.plot_path: "剧情规划大纲",
+            self.foreshadowing_path: "伏笔追踪表",
+        }
+        
+        # 记忆体缓存：路径 -> [数据, 是否有未写盘的修改, 加载/写入时的文件签名]
+        # 更新操作直接修改缓存中的数据，无需每次重新解析整个YAML文件
+        self._cache: Dict[Path, list] = {}
+        self._batch_depth = 0
+        # 下一个自动分配的伏笔ID（None表示需要重新扫描伏笔追踪表）
+        self._next_foreshadowing_id: Optional[int] = None
         
         # 初始化记忆体
         self._init_memories()
     
     def _init_memories(self):
         """初始化记忆体文件"""
-        if not self.worldview_path.exists():
+        missing = {
+            path for path in (self.worldview_path, self.character_path,
+                              self.plot_path, self.foreshadowing_path)
+            if not path.exists()
+        }
+        if missing:
+            # 仅在有记忆体文件缺失时创建目录，打开已有项目时不再调用mkdir
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.worldview_path in missing:
             self.save_worldview({})
-        if not self.character_path.exists():
+        if self.character_path in missing:
             self.save_characters({})
-        if not self.plot_path.exists():
+        if self.plot_path in missing:
             self.save_plot({})
-        if not self.foreshadowing_path.exists():
+        if self.foreshadowing_path in missing:
+            if self.foreshadowing_yaml_path.exists():
+                self._migrate_foreshadowing_yaml()
+            else:
+                self.save_foreshadowing([])
+        self._next_foreshadowing_id = self._scan_next_foreshadowing_id()
+    
+    def _migrate_foreshadowing_yaml(self):
+        """
+        将已有的YAML伏笔追踪表迁移为JSON存储
+        
+        迁移成功后原YAML文件改名为.yaml.migrated，避免用户继续编辑已不再读取的旧文件；
+        读取失败时保留原文件以便排查。
+        """
+        try:
+            with open(self.foreshadowing_yaml_path, 'r', encoding='utf-8') as f:
+                data = yaml.load(f, Loader=YAMLLoader) or []
+        except Exception as e:
+            logger.error(f"读取旧版伏笔追踪表失败: {e}")
             self.save_foreshadowing([])
+            return
+        self.save_foreshadowing(data)
+        migrated_path = self.foreshadowing_yaml_path.with_name(self.foreshadowing_yaml_path.name + '.migrated')
+        try:
+            os.replace(self.foreshadowing_yaml_path, migrated_path)
+        except OSError as e:
+            logger.warning(f"旧版伏笔追踪表改名失败（其内容已不再读取）: {e}")
+            migrated_path = self.foreshadowing_yaml_path
+        logger.info(f"伏笔追踪表已迁移到 {self.foreshadowing_path}，原文件保留为 {migrated_path}")
     
-    def load_worldview(self) -> Dict:
-        """加载世界观记忆体"""
+    @staticmethod
+    def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+        """获取文件的(修改时间, 大小)，用于判断缓存是否过期（文件不存在返回None）"""
         try:
-            if self.worldview_path.exists():
-                with open(self.worldview_path, 'r', encoding='utf-8') as f:
-                    return yaml.safe_load(f) or {}
-            return {}
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _read_memory(self, path: Path, empty: Callable[[], Any]) -> Any:
+        """
+        读取记忆体（返回缓存中的对象，调用方不得修改）
+        
+        文件在缓存后被外部修改时重新加载；有未写盘的修改时以缓存为准。
+        """
+        entry = self._cache.get(path)
+        if entry is not None:
+            data, dirty, signature = entry
+            if dirty or self._file_signature(path) == signature:
+                return data
+        
+        # 先取签名再读取，读取期间文件被修改时下次会重新加载
+        signature = self._file_signature(path)
+        if signature is None:
+            return empty()
+        if path.suffix == '.json':
+            data = load_json_bytes(path.read_bytes()) or empty()
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = yaml.load(f, Loader=YAMLLoader) or empty()
+        self._cache[path] = [data, False, signature]
+        if path == self.foreshadowing_path:
+            self._next_foreshadowing_id = None
+        return data
+    
+    def _load_memory(self, path: Path, empty: Callable[[], Any]) -> Any:
+        """读取记忆体，失败时记录日志并返回空数据"""
+        try:
+            return self._read_memory(path, empty)
         except Exception as e:
-            logger.error(f"加载世界观记忆体失败: {e}")
-            return {}
+            logger.error(f"加载{self._labels[path]}失败: {e}")
+            return empty()
     
-    def save_worldview(self, data: Dict):
-        """保存世界观记忆体"""
+    def _write_memory(self, path: Path, data: Any):
+        """写入记忆体（批量模式下只标记为待写盘，退出批量模式时统一写入）"""
+        if self._batch_depth > 0:
+            self._cache[path] = [data, True, None]
+            return
+        
         try:
-            with open(self.worldview_path, 'w', encoding='utf-8') as f:
-                yaml.dump(data, f, allow_unicode=True, default_flow_style=False, sort_keys=False)
-            logger.info(f"世界观记忆体已保存到 {self.worldview_path}")
+            if path.suffix == '.json':
+                payload = dump_json_bytes(data, default=str)
+            else:
+                payload = yaml.dump(data, Dumper=YAMLDumper, allow_unicode=True,
+                                    default_flow_style=False, sort_keys=False, encoding='utf-8')
+            self._atomic_write(path, payload)
+            self._cache[path] = [data, False, self._file_signature(path)]
+            logger.info(f"{self._labels[path]}已保存到 {path}")
         except Exception as e:
-            logger.error(f"保存世界观记忆体失败: {e}")
+            # 缓存可能与磁盘不一致，丢弃后下次从磁盘重新加载
+            self._cache.pop(path, None)
+            logger.error(f"保存{self._labels[path]}失败: {e}")
             raise
     
+    @staticmethod
+    def _atomic_write(path: Path, payload: bytes):
+        """
+        先写同目录下的唯一临时文件并落盘，再原子替换
+        
+        进程或系统中途崩溃时不会留下写了一半的记忆体文件；临时文件名唯一，
+        多个进程同时保存同一文件也不会互相覆盖临时文件。
+        """
+        try:
+            mode = stat.S_IMODE(path.stat().st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        
+        tmp_file = tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + '.',
+                                               suffix='.tmp', delete=False)
+        tmp_path = Path(tmp_file.name)
+        try:
+            with tmp_file as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+    
+    @contextmanager
+    def batch(self):
+        """
+        批量更新：期间的修改只保存在内存中，退出时每个文件只写盘一次
+        
+        用法:
+            with memory_manager.batch():
+                for item in items:
+                    memory_manager.add_foreshadowing(item)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush()
+    
+    def flush(self):
+        """将所有待写盘的记忆体写入文件"""
+        if self._batch_depth > 0:
+            return
+        for path, (data, dirty, _) in list(self._cache.items()):
+            if dirty:
+                self._write_memory(path, data)
+    
+    def load_worldview(self) -> Dict:
+        """加载世界观记忆体"""
+        return copy.deepcopy(self._load_memory(self.worldview_path, dict))
+    
+    def save_worldview(self, data: Dict):
+        """保存世界观记忆体"""
+        self._write_memory(self.worldview_path, copy.deepcopy(data))
+    
     def update_worldview(self, updates: Dict, merge: bool = True):
         """更新世界观记忆体"""
-        current = self.load_worldview()
+        updates = copy.deepcopy(updates)
+        current = self._load_memory(self.worldview_path, dict)
         if merge:
-            current = self._deep_merge(current, updates)
+            self._deep_merge(current, updates, in_place=True)
         else:
             current.update(updates)
-        self.save_worldview(current)
+        self._write_memory(self.worldview_path, current)
     
     def load_characters(self) -> Dict:
         """加载人物记忆体"""
-        try:
-            if self.character_path.exists():
-                with open(self.character_path, 'r', encoding='utf-8') as f:
-                    return yaml.safe_load(f) or {}
-            return {}
-        except Exception as e:
-            logger.error(f"加载人物记忆体失败: {e}")
-            return {}
+        return copy.deepcopy(self._load_memory(self.character_path, dict))
     
     def save_characters(self, data: Dict):
         """保存人物记忆体"""
-        try:
-            with open(self.character_path, 'w', encoding='utf-8') as f:
-                yaml.dump(data, f, allow_unicode=True, default_flow_style=False, sort_keys=False)
-            logger.info(f"人物记忆体已保存到 {self.character_path}")
-        except Exception as e:
-            logger.error(f"保存人物记忆体失败: {e}")
-            raise
+        self._write_memory(self.character_path, copy.deepcopy(data))
     
     def update_character(self, character_name: str, updates: Dict, merge: bool = True):
         """更新特定人物信息"""
-        characters = self.load_characters()
+        updates = copy.deepcopy(updates)
+        characters = self._load_memory(self.character_path, dict)
         if character_name not in characters:
             characters[character_name] = {}
         
         if merge:
-            characters[character_name] = self._deep_merge(characters[character_name], updates)
+            self._deep_merge(characters[character_name], updates, in_place=True)
         else:
             characters[character_name].update(updates)
         
-        self.save_characters(characters)
+        self._write_memory(self.character_path, characters)
+    
+    def update_characters(self, updates: Dict[str, Dict], merge: bool = True):
+        """
+        批量更新多个人物信息（人物记忆体只写盘一次）
+        
+        Args:
+            updates: 人物名 -> 更新内容
+            merge: 是否深度合并到已有信息
+        """
+        with self.batch():
+            for character_name, character_updates in updates.items():
+                self.update_character(character_name, character_updates, merge=merge)
     
     def load_plot(self) -> Dict:
         """加载剧情规划大纲"""
-        try:
-            if self.plot_path.exists():
-                with open(self.plot_path, 'r', encoding='utf-8') as f:
-                    return yaml.safe_load(f) or {}
-            return {}
-        except Exception as e:
-            logger.error(f"加载剧情规划大纲失败: {e}")
-            return {}
+        return copy.deepcopy(self._load_memory(self.plot_path, dict))
     
     def save_plot(self, data: Dict):
         """保存剧情规划大纲"""
-        try:
-            with open(self.plot_path, 'w', encoding='utf-8') as f:
-                yaml.dump(data, f, allow_unicode=True, default_flow_style=False, sort_keys=False)
-            logger.info(f"剧情规划大纲已保存到 {self.plot_path}")
-        except Exception as e:
-            logger.error(f"保存剧情规划大纲失败: {e}")
-            raise
+        self._write_memory(self.plot_path, copy.deepcopy(data))
     
     def load_foreshadowing(self) -> List[Dict]:
         """加载伏笔追踪表"""
-        try:
-            if self.foreshadowing_path.exists():
-                with open(self.foreshadowing_path, 'r', encoding='utf-8') as f:
-                    return yaml.safe_load(f) or []
-            return []
-        except Exception as e:
-            logger.error(f"加载伏笔追踪表失败: {e}")
-            return []
+        return copy.deepcopy(self._load_memory(self.foreshadowing_path, list))
     
     def save_foreshadowing(self, data: List[Dict]):
         """保存伏笔追踪表"""
+        self._write_memory(self.foreshadowing_path, copy.deepcopy(data))
+        self._next_foreshadowing_id = None
+    
+    def foreshadowing_to_yaml(self, write_file: bool = False) -> str:
+        """
+        导出伏笔追踪表的YAML视图（便于人工阅读）
+        
+        Args:
+            write_file: 是否同时写入05_伏笔追踪表.yaml
+        
+        Returns:
+            YAML文本
+        """
+        data = self._load_memory(self.foreshadowing_path, list)
+        text = yaml.dump(data, Dumper=YAMLDumper, allow_unicode=True,
+                         default_flow_style=False, sort_keys=False)
+        if write_file and self.foreshadowing_path != self.foreshadowing_yaml_path:
+            self._atomic_write(self.foreshadowing_yaml_path, text.encode('utf-8'))
+        return text
+    
+    @staticmethod
+    def _parse_foreshadowing_id(fid: Any) -> int:
+        """解析伏笔ID（移除前导零并转换为整数，无法解析时为0）"""
         try:
-            with open(self.foreshadowing_path, 'w', encoding='utf-8') as f:
-                yaml.dump(data, f, allow_unicode=True, default_flow_style=False, sort_keys=False)
-            logger.info(f"伏笔追踪表已保存到 {self.foreshadowing_path}")
-        except Exception as e:
-            logger.error(f"保存伏笔追踪表失败: {e}")
-            raise
+            return int(fid.lstrip("0") or "0")
+        except (ValueError, AttributeError):
+            return 0
+    
+    def _scan_next_foreshadowing_id(self) -> int:
+        """扫描伏笔追踪表，返回下一个可用的伏笔ID"""
+        foreshadowings = self._load_memory(self.foreshadowing_path, list)
+        return max(
+            (self._parse_foreshadowing_id(f.get("id", "0")) for f in foreshadowings),
+            default=0
+        ) + 1
     
     def add_foreshadowing(self, foreshadowing: Dict):
         """添加新伏笔"""
@@ -153,50 +340,44 @@ class MemoryManager:
             logger.warning(f"伏笔数据格式错误，期望字典类型，得到: {type(foreshadowing)}")
             return
         
-        foreshadowings = self.load_foreshadowing()
+        foreshadowings = self._load_memory(self.foreshadowing_path, list)
+        if self._next_foreshadowing_id is None:
+            # 仅在整表保存或文件被外部修改后重新扫描，之后增量维护
+            self._next_foreshadowing_id = self._scan_next_foreshadowing_id()
+        
         # 生成ID
         if not foreshadowing.get("id"):
-            if foreshadowings:
-                # 提取所有ID并找到最大值
-                ids = []
-                for f in foreshadowings:
-                    fid = f.get("id", "0")
-                    # 移除前导零并转换为整数
-                    try:
-                        ids.append(int(fid.lstrip("0") or "0"))
-                    except (ValueError, AttributeError):
-                        ids.append(0)
-                max_id = max(ids) if ids else 0
-            else:
-                max_id = 0
-            foreshadowing["id"] = f"{max_id + 1:03d}"
+            foreshadowing["id"] = f"{self._next_foreshadowing_id:03d}"
         
         foreshadowing.setdefault("status", "未回收")
         foreshadowing.setdefault("埋设时间", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
         
-        foreshadowings.append(foreshadowing)
-        self.save_foreshadowing(foreshadowings)
+        self._next_foreshadowing_id = max(
+            self._next_foreshadowing_id, self._parse_foreshadowing_id(foreshadowing["id"]) + 1
+        )
+        foreshadowings.append(copy.deepcopy(foreshadowing))
+        self._write_memory(self.foreshadowing_path, foreshadowings)
     
     def mark_foreshadowing_resolved(self, foreshadowing_id: str, resolved_chapter: str):
         """标记伏笔已回收"""
-        foreshadowings = self.load_foreshadowing()
+        foreshadowings = self._load_memory(self.foreshadowing_path, list)
         for f in foreshadowings:
             if f.get("id") == foreshadowing_id:
                 f["status"] = "已回收"
                 f["实际回收章节"] = resolved_chapter
                 f["回收时间"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 break
-        self.save_foreshadowing(foreshadowings)
+        self._write_memory(self.foreshadowing_path, foreshadowings)
     
     def check_consistency(self, new_data: Dict, data_type: str) -> List[str]:
         """检查新数据与现有记忆体的一致性，返回冲突列表"""
         conflicts = []
         
         if data_type == "worldview":
-            current = self.load_worldview()
+            current = self._load_memory(self.worldview_path, dict)
             conflicts = self._check_worldview_conflicts(current, new_data)
         elif data_type == "character":
-            current = self.load_characters()
+            current = self._load_memory(self.character_path, dict)
             conflicts = self._check_character_conflicts(current, new_data)
         
         return conflicts
@@ -226,13 +407,32 @@ class MemoryManager:
                         conflicts.append(f"{char_name}的MBTI类型不一致: {current_char['MBTI类型']} vs {char_data['MBTI类型']}")
         return conflicts
     
-    def _deep_merge(self, base: Dict, updates: Dict) -> Dict:
-        """深度合并字典"""
-        result = base.copy()
-        for key, value in updates.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self._deep_merge(result[key], value)
-            else:
-                result[key] = value
+    def _deep_merge(self, base: Dict, updates: Dict, in_place: bool = False) -> Dict:
+        """
+        深度合并字典（迭代实现，避免深层嵌套时的递归开销）
+        
+        Args:
+            base: 基础字典
+            updates: 更新内容（其中的值直接引用，不复制）
+            in_place: 是否直接修改base；否则只复制合并路径上的字典，其余值与base共享
+        
+        Returns:
+            合并后的字典
+        """
+        result = base if in_place else base.copy()
+        if not updates:
+            return result
+        
+        stack = [(result, updates)]
+        while stack:
+            dst, src = stack.pop()
+            for key, value in src.items():
+                current = dst.get(key)
+                if isinstance(current, dict) and isinstance(value, dict):
+                    if not in_place:
+                        current = dst[key] = current.copy()
+                    stack.append((current, value))
+                else:
+                    dst[key] = value
         return result
 
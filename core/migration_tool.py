@@ -5,9 +5,14 @@
 
 import json
 import logging
+import os
 import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Callable, List, Optional
 from datetime import datetime
 
 from core.exceptions import ConfigurationError, FileProcessingError
@@ -15,6 +20,82 @@ from core.utils import safe_read_json, safe_write_json, ensure_dir
 
 logger = logging.getLogger(__name__)
 
+# FICLONE ioctl编号（linux/fs.h），在支持reflink的文件系统（btrfs/xfs等）上以写时复制方式瞬间完成复制
+_FICLONE = 0x40049409
+# copy_file_range单次调用复制的最大字节数
+_COPY_CHUNK_SIZE = 1 << 30
+
+
+def _copy_file(src, dst):
+    """
+    复制文件内容与元数据（语义同shutil.copy2，src、dst均为文件路径）
+    
+    Linux上依次尝试reflink（FICLONE）和内核态的copy_file_range，数据不经过用户空间；
+    文件系统不支持时回退到shutil.copy2。
+    """
+    if sys.platform.startswith("linux") and hasattr(os, "copy_file_range"):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                try:
+                    import fcntl
+                    fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+                except OSError:
+                    while os.copy_file_range(fsrc.fileno(), fdst.fileno(), _COPY_CHUNK_SIZE):
+                        pass
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            pass  # 跨文件系统等不支持的情况，回退到通用实现（会重新截断dst）
+    shutil.copy2(src, dst)
+
+
+# 备份目录修改后至少经过该时长才缓存其列表（纳秒）
+_REPORT_CACHE_MIN_AGE_NS = 1_000_000_000
+
+# robocopy返回码小于8表示成功（0无变化，1有文件复制，2~7存在多余/不匹配文件）
+_ROBOCOPY_MAX_SUCCESS_CODE = 7
+
+
+def _fast_copytree(src: Path, dst: Path):
+    """
+    并行复制目录树（语义同shutil.copytree(dirs_exist_ok=True)）
+    
+    Windows上交给多线程的robocopy；其他平台先按目录结构创建目录，
+    再用线程池并发执行逐文件的shutil.copy2，避免逐个文件串行等待I/O。
+    """
+    if sys.platform == "win32":
+        try:
+            completed = subprocess.run(
+                ["robocopy", str(src), str(dst), "/E", "/MT:16",
+                 "/NDL", "/NFL", "/NJH", "/NJS", "/NP"],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        except FileNotFoundError:
+            shutil.copytree(src, dst, dirs_exist_ok=True)
+            return
+        if completed.returncode > _ROBOCOPY_MAX_SUCCESS_CODE:
+            raise FileProcessingError(f"robocopy复制失败（返回码 {completed.returncode}）: {src} -> {dst}")
+        return
+    
+    copy_jobs = []
+    for dir_path, _, file_names in os.walk(src, followlinks=True):
+        target_dir = dst / os.path.relpath(dir_path, src)
+        os.makedirs(target_dir, exist_ok=True)
+        copy_jobs.extend(
+            (os.path.join(dir_path, name), target_dir / name) for name in file_names
+        )
+    
+    if len(copy_jobs) <= 1:
+        for source_file, target_file in copy_jobs:
+            _copy_file(source_file, target_file)
+        return
+    
+    max_workers = min(32, (os.cpu_count() or 1) * 4, len(copy_jobs))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # 遍历结果以抛出复制过程中的异常
+        for _ in executor.map(lambda job: _copy_file(*job), copy_jobs):
+            pass
+
 
 class MigrationTool:
     """数据迁移工具"""
@@ -30,6 +111,9 @@ class MigrationTool:
             backup_dir = Path("backups") / datetime.now().strftime("%Y%m%d_%H%M%S")
         self.backup_dir = Path(backup_dir)
         ensure_dir(self.backup_dir)
+        # 备份目录列表缓存，目录的修改时间不变时复用
+        self._report_files: List[Path] = []
+        self._report_mtime_ns: Optional[int] = None
     
     def backup_data(self, source_path: Path) -> Path:
         """
@@ -44,11 +128,13 @@ class MigrationTool:
         backup_path = self.backup_dir / source_path.name
         
         if source_path.is_file():
-            shutil.copy2(source_path, backup_path)
-            logger.info(f"已备份文件: {source_path} -> {backup_path}")
+            _copy_file(source_path, backup_path)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"已备份文件: {source_path} -> {backup_path}")
         elif source_path.is_dir():
-            shutil.copytree(source_path, backup_path, dirs_exist_ok=True)
-            logger.info(f"已备份目录: {source_path} -> {backup_path}")
+            _fast_copytree(source_path, backup_path)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"已备份目录: {source_path} -> {backup_path}")
         else:
             raise FileProcessingError(f"源路径不存在: {source_path}")
         
@@ -78,7 +164,9 @@ class MigrationTool:
             # 这里可以添加具体的迁移逻辑
             # 例如：更新字段名、添加新字段等
             
-            logger.info(f"项目格式迁移完成: {project_path} -> v{target_version}")
+            # 逐项日志只在DEBUG级别输出，批量迁移的汇总见_migrate_all
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"项目格式迁移完成: {project_path} -> v{target_version}")
             return True
             
         except Exception as e:
@@ -115,63 +203,84 @@ class MigrationTool:
             # 保存迁移后的数据
             safe_write_json(card_path / "card.json", card_data)
             
-            logger.info(f"卡片格式迁移完成: {card_path} -> v{target_version}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"卡片格式迁移完成: {card_path} -> v{target_version}")
             return True
             
         except Exception as e:
             logger.error(f"卡片格式迁移失败: {e}", exc_info=True)
             return False
     
-    def migrate_all_projects(self, projects_dir: Path, target_version: str = "2.0") -> Dict[str, bool]:
+    def migrate_all_projects(
+        self,
+        projects_dir: Path,
+        target_version: str = "2.0",
+        max_workers: int = 8
+    ) -> Dict[str, bool]:
         """
         迁移所有项目
         
         Args:
             projects_dir: 项目目录
             target_version: 目标版本
+            max_workers: 并发迁移的项目数（1表示串行）
         
         Returns:
             Dict[str, bool]: 迁移结果 {项目名: 是否成功}
         """
-        results = {}
-        
         if not projects_dir.exists():
             logger.warning(f"项目目录不存在: {projects_dir}")
-            return results
+            return {}
         
-        for project_path in projects_dir.iterdir():
-            if project_path.is_dir():
-                project_name = project_path.name
-                results[project_name] = self.migrate_project_format(
-                    project_path, target_version
-                )
-        
-        return results
+        return self._migrate_all(projects_dir, self.migrate_project_format, target_version, max_workers, "项目")
     
-    def migrate_all_cards(self, cards_dir: Path, target_version: str = "2.0") -> Dict[str, bool]:
+    def migrate_all_cards(
+        self,
+        cards_dir: Path,
+        target_version: str = "2.0",
+        max_workers: int = 8
+    ) -> Dict[str, bool]:
         """
         迁移所有卡片
         
         Args:
             cards_dir: 卡片目录
             target_version: 目标版本
+            max_workers: 并发迁移的卡片数（1表示串行）
         
         Returns:
             Dict[str, bool]: 迁移结果 {卡片名: 是否成功}
         """
-        results = {}
-        
         if not cards_dir.exists():
             logger.warning(f"卡片目录不存在: {cards_dir}")
-            return results
+            return {}
         
-        for card_path in cards_dir.iterdir():
-            if card_path.is_dir():
-                card_name = card_path.name
-                results[card_name] = self.migrate_card_format(
-                    card_path, target_version
-                )
+        return self._migrate_all(cards_dir, self.migrate_card_format, target_version, max_workers, "卡片")
+    
+    @staticmethod
+    def _migrate_all(
+        parent_dir: Path,
+        migrate: Callable[[Path, str], bool],
+        target_version: str,
+        max_workers: int,
+        label: str
+    ) -> Dict[str, bool]:
+        """
+        并发迁移目录下的每个子目录
+        
+        各子目录备份到backup_dir下各自的同名目录、读写各自的文件，互不冲突，无需加锁。
+        结果按子目录的遍历顺序返回，完成后输出一条INFO汇总日志。
+        """
+        paths = [path for path in parent_dir.iterdir() if path.is_dir()]
+        if max_workers <= 1 or len(paths) <= 1:
+            results = {path.name: migrate(path, target_version) for path in paths}
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+                outcomes = executor.map(lambda path: migrate(path, target_version), paths)
+                results = {path.name: outcome for path, outcome in zip(paths, outcomes)}
         
+        succeeded = sum(results.values())
+        logger.info(f"{label}格式迁移完成: {succeeded}/{len(results)} -> v{target_version} ({parent_dir})")
         return results
     
     def get_migration_report(self) -> Dict[str, Any]:
@@ -181,10 +290,27 @@ class MigrationTool:
         Returns:
             Dict[str, Any]: 迁移报告
         """
+        try:
+            mtime_ns = self.backup_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._report_mtime_ns = None
+            return {
+                "backup_dir": str(self.backup_dir),
+                "backup_exists": False,
+                "backup_files": []
+            }
+        
+        if mtime_ns != self._report_mtime_ns:
+            with os.scandir(self.backup_dir) as entries:
+                self._report_files = [Path(entry.path) for entry in entries]
+            # 修改时间距今过近时不缓存：同一时间戳精度内的后续修改不会改变修改时间
+            recent = time.time_ns() - mtime_ns < _REPORT_CACHE_MIN_AGE_NS
+            self._report_mtime_ns = None if recent else mtime_ns
+        
         return {
             "backup_dir": str(self.backup_dir),
-            "backup_exists": self.backup_dir.exists(),
-            "backup_files": list(self.backup_dir.iterdir()) if self.backup_dir.exists() else []
+            "backup_exists": True,
+            "backup_files": list(self._report_files)
         }
 
 
@@ -192,7 +318,8 @@ def migrate_data(
     projects_dir: Optional[Path] = None,
     cards_dir: Optional[Path] = None,
     target_version: str = "2.0",
-    backup_dir: Optional[Path] = None
+    backup_dir: Optional[Path] = None,
+    max_workers: int = 8
 ) -> Dict[str, Any]:
     """
     迁移数据的便捷函数
@@ -202,6 +329,7 @@ def migrate_data(
         cards_dir: 卡片目录
         target_version: 目标版本
         backup_dir: 备份目录
+        max_workers: 并发迁移的项目/卡片数
     
     Returns:
         Dict[str, Any]: 迁移结果
@@ -214,10 +342,10 @@ def migrate_data(
     }
     
     if projects_dir:
-        results["projects"] = tool.migrate_all_projects(projects_dir, target_version)
+        results["projects"] = tool.migrate_all_projects(projects_dir, target_version, max_workers)
     
     if cards_dir:
-        results["cards"] = tool.migrate_all_cards(cards_dir, target_version)
+        results["cards"] = tool.migrate_all_cards(cards_dir, target_version, max_workers)
     
     return results
 
@@ -5,15 +5,112 @@
 
 import os
 import json
+import asyncio
+import hashlib
+import threading
+import weakref
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, AsyncGenerator
+from typing import Any, List, Dict, Optional, AsyncGenerator, Tuple
 import logging
 
+from .cache_manager import LRUCache
+
 logger = logging.getLogger(__name__)
 
+# OpenAI兼容客户端共享的httpx连接池（同一主机的多个Agent复用TCP/TLS连接）
+_HTTP_MAX_CONNECTIONS = 100
+_HTTP_MAX_KEEPALIVE_CONNECTIONS = 50
+_http_pool_lock = threading.Lock()
+_shared_http_client: Any = None
+# 事件循环 -> (异步httpx客户端, 守护生成器)（httpx.AsyncClient的连接绑定创建它的事件循环，每个事件循环各用一个）
+_shared_async_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+# (API地址, 模型, API密钥摘要) -> 确定性请求的响应缓存
+# 同一账号同一服务同一模型的多个客户端/Agent共享；不同API密钥（不同租户/账号）互不共享
+_response_cache_lock = threading.Lock()
+_shared_response_caches: Dict[Tuple[str, str, str], LRUCache] = {}
+
+
+def _create_http_client(use_async: bool):
+    """创建httpx客户端（优先使用openai的默认配置：超时、重定向等）"""
+    import httpx
+    import openai
+    
+    limits = httpx.Limits(
+        max_connections=_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=_HTTP_MAX_KEEPALIVE_CONNECTIONS
+    )
+    client_class = getattr(openai, "DefaultAsyncHttpxClient" if use_async else "DefaultHttpxClient", None)
+    if client_class is None:
+        # 旧版openai没有默认客户端类
+        client_class = httpx.AsyncClient if use_async else httpx.Client
+        return client_class(limits=limits, follow_redirects=True)
+    return client_class(limits=limits)
+
+
+def _get_shared_http_client():
+    """获取共享的同步httpx客户端（线程安全，进程内复用）"""
+    global _shared_http_client
+    if _shared_http_client is None:
+        with _http_pool_lock:
+            if _shared_http_client is None:
+                _shared_http_client = _create_http_client(use_async=False)
+    return _shared_http_client
+
+
+def _get_shared_response_cache(base_url: str, model: str, api_key: str, size: int) -> LRUCache:
+    """获取(API地址, 模型, API密钥)共享的响应缓存（首次创建时的容量生效；密钥只以摘要形式保存）"""
+    key = (base_url, model, hashlib.sha256(api_key.encode("utf-8")).hexdigest())
+    with _response_cache_lock:
+        cache = _shared_response_caches.get(key)
+        if cache is None:
+            cache = _shared_response_caches[key] = LRUCache(size)
+        return cache
+
+
+def _drop_closed_loops(clients: "weakref.WeakKeyDictionary") -> None:
+    """移除已关闭事件循环的条目（调用方持有锁）"""
+    for loop in [loop for loop in clients if loop.is_closed()]:
+        del clients[loop]
+
+
+def _get_shared_async_http_client():
+    """
+    获取当前事件循环共享的异步httpx客户端
+    
+    每个事件循环一个客户端，多个事件循环（如API服务与后台循环）各自复用连接，互不替换。
+    事件循环收尾（asyncio.run调用shutdown_asyncgens）时由守护生成器关闭客户端。
+    """
+    loop = asyncio.get_running_loop()
+    with _http_pool_lock:
+        entry = _shared_async_http_clients.get(loop)
+        if entry is None:
+            _drop_closed_loops(_shared_async_http_clients)
+            client = _create_http_client(use_async=True)
+            guard = _close_on_loop_shutdown(client)
+            # 保存守护生成器的强引用（事件循环只弱引用跟踪异步生成器）
+            entry = _shared_async_http_clients[loop] = (client, guard)
+            loop.create_task(_start_guard(guard))
+    return entry[0]
+
+
+async def _start_guard(guard):
+    """在当前事件循环中启动守护生成器，使其被事件循环跟踪"""
+    await guard.__anext__()
+
+
+async def _close_on_loop_shutdown(client: Any):
+    """事件循环关闭异步生成器时关闭客户端，释放连接"""
+    try:
+        yield
+    finally:
+        await client.aclose()
+
 
 class LLMClient(ABC):
     """抽象LLM客户端接口"""
+    # 空__slots__不影响子类，仅让声明了__slots__的子类（如Agent客户端包装器）实例不带__dict__
+    __slots__ = ()
     
     @abstractmethod
     def send_prompt(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
@@ -34,15 +131,86 @@ class LLMClient(ABC):
 class OpenAIClient(LLMClient):
     """OpenAI模型客户端"""
     
-    def __init__(self, api_key: str, model: str = "gpt-4", base_url: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4",
+        base_url: Optional[str] = None,
+        response_cache_size: int = 1024
+    ):
+        """
+        初始化OpenAI客户端
+        
+        Args:
+            api_key: API密钥
+            model: 模型名称
+            base_url: API地址（兼容OpenAI接口的服务）
+            response_cache_size: 确定性请求（temperature<=0）的响应缓存条数，0表示不缓存；
+                                 缓存按(API地址, 模型, API密钥)在进程内共享，容量以首个创建该缓存的客户端为准
+        """
         try:
             import openai
-            self.client = openai.OpenAI(api_key=api_key, base_url=base_url)
+            self.client = openai.OpenAI(api_key=api_key, base_url=base_url, http_client=_get_shared_http_client())
             self.model = model
         except ImportError:
             raise ImportError("请安装openai库: pip install openai")
+        self._response_cache = (
+            _get_shared_response_cache(str(self.client.base_url), model, self.client.api_key, response_cache_size)
+            if response_cache_size > 0 else None
+        )
+        # 异步客户端按事件循环在首次异步调用时创建并复用，底层使用该事件循环共享的连接池
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._async_clients_lock = threading.Lock()
+    
+    def _get_async_client(self):
+        """
+        获取当前事件循环复用的AsyncOpenAI客户端
+        
+        连接池绑定创建它的事件循环，每个事件循环各自一个客户端；已关闭事件循环的客户端被清理。
+        """
+        loop = asyncio.get_running_loop()
+        with self._async_clients_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                from openai import AsyncOpenAI
+                _drop_closed_loops(self._async_clients)
+                client = AsyncOpenAI(
+                    api_key=self.client.api_key,
+                    base_url=self.client.base_url,
+                    http_client=_get_shared_async_http_client()
+                )
+                self._async_clients[loop] = client
+        return client
+    
+    def _response_cache_key(self, prompt: str, system_prompt: Optional[str], kwargs: Dict) -> Optional[bytes]:
+        """
+        计算响应缓存键
+        
+        只缓存确定性请求：未显式设置temperature<=0（API默认采样）、多候选或流式请求返回None。
+        """
+        if self._response_cache is None or kwargs.get("stream") or kwargs.get("n", 1) != 1:
+            return None
+        temperature = kwargs.get("temperature")
+        if temperature is None or temperature > 0:
+            return None
+        
+        try:
+            options = json.dumps(kwargs, sort_keys=True, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return None
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (self.model, system_prompt or "", prompt, options):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.digest()
     
     def send_prompt(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+        cache_key = self._response_cache_key(prompt, system_prompt, kwargs)
+        if cache_key is not None:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
@@ -54,16 +222,23 @@ class OpenAIClient(LLMClient):
                 messages=messages,
                 **kwargs
             )
-            return response.choices[0].message.content
+            content = response.choices[0].message.content
         except Exception as e:
             logger.error(f"OpenAI API调用失败: {e}")
             raise
+        
+        if cache_key is not None and content is not None:
+            self._response_cache.set(cache_key, content)
+        return content
     
     async def send_prompt_async(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
-        import asyncio
-        from openai import AsyncOpenAI
+        cache_key = self._response_cache_key(prompt, system_prompt, kwargs)
+        if cache_key is not None:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                return cached
         
-        client = AsyncOpenAI(api_key=self.client.api_key, base_url=self.client.base_url)
+        client = self._get_async_client()
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
@@ -75,15 +250,17 @@ class OpenAIClient(LLMClient):
                 messages=messages,
                 **kwargs
             )
-            return response.choices[0].message.content
+            content = response.choices[0].message.content
         except Exception as e:
             logger.error(f"OpenAI异步API调用失败: {e}")
             raise
+        
+        if cache_key is not None and content is not None:
+            self._response_cache.set(cache_key, content)
+        return content
     
     async def stream_prompt(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> AsyncGenerator[str, None]:
-        from openai import AsyncOpenAI
-        
-        client = AsyncOpenAI(api_key=self.client.api_key, base_url=self.client.base_url)
+        client = self._get_async_client()
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
@@ -129,8 +306,21 @@ class GeminiClient(LLMClient):
             raise
     
     async def send_prompt_async(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
-        # Gemini异步调用实现
-        return self.send_prompt(prompt, system_prompt, **kwargs)
+        generate_async = getattr(self.model, "generate_content_async", None)
+        if generate_async is None:
+            # 旧版SDK没有原生异步接口，放到线程中执行，避免阻塞事件循环
+            return await asyncio.to_thread(self.send_prompt, prompt, system_prompt, **kwargs)
+        
+        full_prompt = prompt
+        if system_prompt:
+            full_prompt = f"{system_prompt}\n\n{prompt}"
+        
+        try:
+            response = await generate_async(full_prompt, **kwargs)
+            return response.text
+        except Exception as e:
+            logger.error(f"Gemini API调用失败: {e}")
+            raise
     
     async def stream_prompt(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> AsyncGenerator[str, None]:
         full_prompt = prompt
@@ -3,11 +3,11 @@
 根据可用API数量（1-5）智能分配Agent角色和协同策略
 """
 
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, NamedTuple, Tuple
 from enum import Enum
 import logging
 import asyncio
-from dataclasses import dataclass
+from collections import ChainMap
 
 from .model_interface import LLMClient
 from .enhanced_model_interface import EnhancedLLMClient
@@ -28,15 +28,106 @@ class AgentRole(str, Enum):
     ARCHIVIST = "archivist"     # 档案员：保存记录
 
 
-@dataclass
-class AgentAssignment:
-    """Agent分配信息"""
+class AgentAssignment(NamedTuple):
+    """Agent分配信息（不可变、可哈希，实例无__dict__）"""
     role: AgentRole
     api_index: int  # 使用的API索引
     priority: int   # 优先级（1-5，1最高）
     can_parallel: bool  # 是否可以并行执行
 
 
+# 各API数量对应的协同策略（导入时构建一次，所有协同管理器共享）
+# 同一优先级内的Agent分配到不同的API，同批并行的请求不会在同一API上排队
+_STRATEGIES: Dict[int, Dict[str, Any]] = {
+    1: {
+        "name": "单API串行模式",
+        "description": "所有Agent串行执行，共享单个API",
+        "assignments": [
+            AgentAssignment(AgentRole.READER, 0, 1, False),
+            AgentAssignment(AgentRole.ANALYST, 0, 2, False),
+            AgentAssignment(AgentRole.PLANNER, 0, 3, False),
+            AgentAssignment(AgentRole.WRITER, 0, 4, False),
+            AgentAssignment(AgentRole.CRITIC, 0, 5, False),
+        ]
+    },
+    2: {
+        "name": "双API并行模式",
+        "description": "核心Agent并行，辅助Agent串行",
+        "assignments": [
+            AgentAssignment(AgentRole.READER, 0, 1, True),
+            AgentAssignment(AgentRole.ANALYST, 1, 1, True),
+            AgentAssignment(AgentRole.PLANNER, 0, 2, False),
+            AgentAssignment(AgentRole.WRITER, 1, 3, False),
+            AgentAssignment(AgentRole.CRITIC, 0, 4, False),
+        ]
+    },
+    3: {
+        "name": "三API三角模式",
+        "description": "分析-规划-写作三角协同，评论串行",
+        "assignments": [
+            AgentAssignment(AgentRole.READER, 0, 1, True),
+            AgentAssignment(AgentRole.ANALYST, 1, 1, True),
+            AgentAssignment(AgentRole.EXTRACTOR, 2, 1, True),
+            AgentAssignment(AgentRole.PLANNER, 0, 2, False),
+            AgentAssignment(AgentRole.WRITER, 1, 3, False),
+            AgentAssignment(AgentRole.STYLIST, 2, 3, True),
+            AgentAssignment(AgentRole.CRITIC, 0, 4, False),
+        ]
+    },
+    4: {
+        "name": "四API协同模式",
+        "description": "多阶段并行，质量审查独立",
+        "assignments": [
+            AgentAssignment(AgentRole.READER, 0, 1, True),
+            AgentAssignment(AgentRole.ANALYST, 1, 1, True),
+            AgentAssignment(AgentRole.EXTRACTOR, 2, 1, True),
+            AgentAssignment(AgentRole.PLANNER, 3, 1, True),
+            AgentAssignment(AgentRole.WRITER, 0, 2, False),
+            AgentAssignment(AgentRole.STYLIST, 1, 2, True),
+            AgentAssignment(AgentRole.CRITIC, 2, 3, False),
+            AgentAssignment(AgentRole.ARCHIVIST, 3, 4, False),
+        ]
+    },
+    5: {
+        "name": "五API蜂群模式",
+        "description": "全功能并行，最大化效率",
+        "assignments": [
+            AgentAssignment(AgentRole.READER, 0, 1, True),
+            AgentAssignment(AgentRole.ANALYST, 1, 1, True),
+            AgentAssignment(AgentRole.EXTRACTOR, 2, 1, True),
+            AgentAssignment(AgentRole.PLANNER, 3, 1, True),
+            AgentAssignment(AgentRole.WRITER, 4, 2, False),
+            AgentAssignment(AgentRole.STYLIST, 0, 2, True),
+            AgentAssignment(AgentRole.CRITIC, 1, 3, True),
+            AgentAssignment(AgentRole.ARCHIVIST, 2, 4, False),
+        ]
+    }
+}
+
+
+class AgentLLMClientWrapper(LLMClient):
+    """强制使用指定API的LLM客户端包装器"""
+    __slots__ = ("base_client", "api_name", "provider")
+    
+    def __init__(self, base_client: EnhancedLLMClient, api_name: str, provider: APIProvider):
+        self.base_client = base_client
+        self.api_name = api_name
+        self.provider = provider
+    
+    def send_prompt(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+        kwargs['provider'] = self.provider
+        return self.base_client.send_prompt(prompt, system_prompt, **kwargs)
+    
+    async def send_prompt_async(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+        kwargs['provider'] = self.provider
+        return await self.base_client.send_prompt_async(prompt, system_prompt, **kwargs)
+    
+    async def stream_prompt(self, prompt: str, system_prompt: Optional[str] = None, **kwargs):
+        kwargs['provider'] = self.provider
+        async for chunk in self.base_client.stream_prompt(prompt, system_prompt, **kwargs):
+            yield chunk
+
+
 class MultiAgentCoordinator:
     """多Agent协同管理器"""
     
@@ -62,98 +153,46 @@ class MultiAgentCoordinator:
         
         # 根据API数量选择协同策略
         self.strategy = self._select_strategy()
+        self._build_assignment_index()
+        self._strategy_info = self._build_strategy_info()
         logger.info(f"多Agent协同管理器初始化: {self.available_apis}个API, 策略={self.strategy['name']}")
     
     def _select_strategy(self) -> Dict[str, Any]:
         """根据API数量选择协同策略"""
-        strategies = {
-            1: {
-                "name": "单API串行模式",
-                "description": "所有Agent串行执行，共享单个API",
-                "assignments": [
-                    AgentAssignment(AgentRole.READER, 0, 1, False),
-                    AgentAssignment(AgentRole.ANALYST, 0, 2, False),
-                    AgentAssignment(AgentRole.PLANNER, 0, 3, False),
-                    AgentAssignment(AgentRole.WRITER, 0, 4, False),
-                    AgentAssignment(AgentRole.CRITIC, 0, 5, False),
-                ]
-            },
-            2: {
-                "name": "双API并行模式",
-                "description": "核心Agent并行，辅助Agent串行",
-                "assignments": [
-                    AgentAssignment(AgentRole.READER, 0, 1, True),
-                    AgentAssignment(AgentRole.ANALYST, 1, 1, True),
-                    AgentAssignment(AgentRole.PLANNER, 0, 2, False),
-                    AgentAssignment(AgentRole.WRITER, 1, 3, False),
-                    AgentAssignment(AgentRole.CRITIC, 0, 4, False),
-                ]
-            },
-            3: {
-                "name": "三API三角模式",
-                "description": "分析-规划-写作三角协同，评论串行",
-                "assignments": [
-                    AgentAssignment(AgentRole.READER, 0, 1, True),
-                    AgentAssignment(AgentRole.ANALYST, 1, 1, True),
-                    AgentAssignment(AgentRole.EXTRACTOR, 2, 1, True),
-                    AgentAssignment(AgentRole.PLANNER, 0, 2, False),
-                    AgentAssignment(AgentRole.WRITER, 1, 3, False),
-                    AgentAssignment(AgentRole.STYLIST, 2, 3, True),
-                    AgentAssignment(AgentRole.CRITIC, 0, 4, False),
-                ]
-            },
-            4: {
-                "name": "四API协同模式",
-                "description": "多阶段并行，质量审查独立",
-                "assignments": [
-                    AgentAssignment(AgentRole.READER, 0, 1, True),
-                    AgentAssignment(AgentRole.ANALYST, 1, 1, True),
-                    AgentAssignment(AgentRole.EXTRACTOR, 2, 1, True),
-                    AgentAssignment(AgentRole.PLANNER, 3, 1, True),
-                    AgentAssignment(AgentRole.WRITER, 0, 2, False),
-                    AgentAssignment(AgentRole.STYLIST, 1, 2, True),
-                    AgentAssignment(AgentRole.CRITIC, 2, 3, False),
-                    AgentAssignment(AgentRole.ARCHIVIST, 3, 4, False),
-                ]
-            },
-            5: {
-                "name": "五API蜂群模式",
-                "description": "全功能并行，最大化效率",
-                "assignments": [
-                    AgentAssignment(AgentRole.READER, 0, 1, True),
-                    AgentAssignment(AgentRole.ANALYST, 1, 1, True),
-                    AgentAssignment(AgentRole.EXTRACTOR, 2, 1, True),
-                    AgentAssignment(AgentRole.PLANNER, 3, 1, True),
-                    AgentAssignment(AgentRole.WRITER, 4, 2, False),
-                    AgentAssignment(AgentRole.STYLIST, 0, 2, True),
-                    AgentAssignment(AgentRole.CRITIC, 1, 3, True),
-                    AgentAssignment(AgentRole.ARCHIVIST, 2, 4, False),
-                ]
-            }
-        }
-        
-        return strategies.get(self.available_apis, strategies[1])
+        return _STRATEGIES.get(self.available_apis, _STRATEGIES[1])
+    
+    def _build_assignment_index(self):
+        """预建角色→分配、角色→API与优先级分组索引（策略在初始化后不变，每步生成无需重复扫描）"""
+        self._role_to_assignment: Dict[AgentRole, AgentAssignment] = {}
+        self._api_for_role: Dict[AgentRole, Optional[str]] = {}
+        self._parallel_by_priority: Dict[int, List[AgentRole]] = {}
+        groups: Dict[int, List[AgentRole]] = {}
+        for assignment in self.strategy["assignments"]:
+            if assignment.role in self._role_to_assignment:
+                continue
+            self._role_to_assignment[assignment.role] = assignment
+            self._api_for_role[assignment.role] = (
+                self.api_names[assignment.api_index]
+                if assignment.api_index < len(self.api_names) else None
+            )
+            groups.setdefault(assignment.priority, []).append(assignment.role)
+            if assignment.can_parallel:
+                self._parallel_by_priority.setdefault(assignment.priority, []).append(assignment.role)
+        # 按优先级升序排列的 (优先级, 角色列表)
+        self._priority_groups_all: List[Tuple[int, List[AgentRole]]] = sorted(groups.items())
     
     def get_agent_assignments(self) -> List[AgentAssignment]:
         """获取Agent分配列表"""
-        return self.strategy["assignments"]
+        return list(self.strategy["assignments"])
     
     def get_api_for_agent(self, role: AgentRole) -> Optional[str]:
         """为指定Agent获取分配的API"""
-        for assignment in self.strategy["assignments"]:
-            if assignment.role == role:
-                api_index = assignment.api_index
-                if api_index < len(self.api_names):
-                    return self.api_names[api_index]
-        return None
+        return self._api_for_role.get(role)
     
     def get_parallel_agents(self, priority: int) -> List[AgentRole]:
         """获取指定优先级可以并行执行的Agent列表"""
-        parallel_agents = []
-        for assignment in self.strategy["assignments"]:
-            if assignment.priority == priority and assignment.can_parallel:
-                parallel_agents.append(assignment.role)
-        return parallel_agents
+        # 返回副本，避免调用方修改内部索引
+        return list(self._parallel_by_priority.get(priority, ()))
     
     async def execute_agents_parallel(
         self, 
@@ -164,38 +203,29 @@ class MultiAgentCoordinator:
         并行执行多个Agent
         Args:
             agent_functions: Agent角色到执行函数的映射
-            context: 共享上下文
+            context: 共享上下文（每个Agent收到以ChainMap叠加了api_name的视图，写入不会影响其他Agent）
         Returns:
             Agent角色到结果的映射
         """
-        # 按优先级分组
-        priority_groups: Dict[int, List[AgentRole]] = {}
-        for assignment in self.strategy["assignments"]:
-            if assignment.role in agent_functions:
-                if assignment.priority not in priority_groups:
-                    priority_groups[assignment.priority] = []
-                priority_groups[assignment.priority].append(assignment.role)
+        role_to_assignment = self._role_to_assignment
         
-        # 按优先级顺序执行
+        # 按优先级顺序执行（分组已预建，这里只过滤出本次提供了执行函数的Agent）
         results: Dict[AgentRole, Any] = {}
-        for priority in sorted(priority_groups.keys()):
-            agents_in_priority = priority_groups[priority]
+        for _, roles in self._priority_groups_all:
+            agents_in_priority = [role for role in roles if role in agent_functions]
+            if not agents_in_priority:
+                continue
             
             # 检查是否可以并行
-            can_parallel = all(
-                any(a.role == agent and a.can_parallel 
-                    for a in self.strategy["assignments"])
-                for agent in agents_in_priority
-            )
+            can_parallel = all(role_to_assignment[agent].can_parallel for agent in agents_in_priority)
             
             if can_parallel and len(agents_in_priority) > 1:
                 # 并行执行
                 tasks = []
                 for agent_role in agents_in_priority:
                     func = agent_functions[agent_role]
-                    # 为每个Agent创建独立的上下文副本
-                    agent_context = context.copy()
-                    agent_context['api_name'] = self.get_api_for_agent(agent_role)
+                    # 为每个Agent叠加独立的上层映射，无需复制整个上下文
+                    agent_context = ChainMap({'api_name': self._api_for_role.get(agent_role)}, context)
                     tasks.append(func(agent_context))
                 
                 agent_results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -209,8 +239,7 @@ class MultiAgentCoordinator:
                 # 串行执行
                 for agent_role in agents_in_priority:
                     func = agent_functions[agent_role]
-                    agent_context = context.copy()
-                    agent_context['api_name'] = self.get_api_for_agent(agent_role)
+                    agent_context = ChainMap({'api_name': self._api_for_role.get(agent_role)}, context)
                     try:
                         result = await func(agent_context)
                         results[agent_role] = result
@@ -233,40 +262,25 @@ class MultiAgentCoordinator:
         if not api_name or api_name not in self.api_pool.apis:
             return self.llm_client
         
-        # 创建使用指定API的客户端包装器
-        from .enhanced_model_interface import EnhancedLLMClient
-        api_config = self.api_pool.apis[api_name]
-        provider = api_config.provider
-        
         # 返回一个包装器，强制使用指定的API
-        class AgentLLMClientWrapper(LLMClient):
-            def __init__(self, base_client: EnhancedLLMClient, api_name: str, provider: APIProvider):
-                self.base_client = base_client
-                self.api_name = api_name
-                self.provider = provider
-            
-            def send_prompt(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
-                kwargs['provider'] = self.provider
-                return self.base_client.send_prompt(prompt, system_prompt, **kwargs)
-            
-            async def send_prompt_async(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
-                kwargs['provider'] = self.provider
-                return await self.base_client.send_prompt_async(prompt, system_prompt, **kwargs)
-            
-            async def stream_prompt(self, prompt: str, system_prompt: Optional[str] = None, **kwargs):
-                kwargs['provider'] = self.provider
-                async for chunk in self.base_client.stream_prompt(prompt, system_prompt, **kwargs):
-                    yield chunk
-        
+        provider = self.api_pool.apis[api_name].provider
         return AgentLLMClientWrapper(self.llm_client, api_name, provider)
     
     def get_strategy_info(self) -> Dict[str, Any]:
-        """获取策略信息"""
+        """
+        获取策略信息
+        
+        策略在初始化后不变，返回预先构建结果的浅拷贝（嵌套的列表与字典为共享只读数据）
+        """
+        return dict(self._strategy_info)
+    
+    def _build_strategy_info(self) -> Dict[str, Any]:
+        """构建策略信息"""
         return {
             "strategy_name": self.strategy["name"],
             "description": self.strategy["description"],
             "available_apis": self.available_apis,
-            "api_names": self.api_names,
+            "api_names": list(self.api_names),
             "assignments": [
                 {
                     "role": a.role.value,
@@ -3,11 +3,23 @@ API限流器
 实现请求频率控制和限流功能
 """
 
+import asyncio
+import logging
 import time
+import weakref
 from collections import defaultdict
-from typing import Dict, Optional, Tuple
+from typing import Any, Callable, Dict, Optional, Tuple
 from threading import Lock
 
+try:
+    from redis.exceptions import RedisError
+except ImportError:
+    # 未安装redis时不会创建RedisTokenBucket，仅供except子句引用
+    class RedisError(Exception):
+        """redis未安装时的占位异常"""
+
+logger = logging.getLogger(__name__)
+
 
 class RateLimiter:
     """简单的令牌桶限流器"""
@@ -75,6 +87,136 @@ class RateLimiter:
             self.requests[key] = []
 
 
+# 令牌桶的原子更新脚本：使用Redis服务器时钟，返回需要等待的秒数（0表示已取得令牌）
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HMSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class LoopLocalRedis:
+    """
+    按事件循环创建并复用redis.asyncio连接
+    
+    redis.asyncio的连接池绑定首次使用它的事件循环，换一个事件循环（如同步调用所用的
+    后台循环与asyncio.run）再使用会抛出RuntimeError，因此每个事件循环各用一个连接。
+    """
+    
+    def __init__(self, factory: Callable[[], Any]):
+        """
+        Args:
+            factory: 创建redis.asyncio.Redis连接的无参函数
+        """
+        self._factory = factory
+        self._connections: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._lock = Lock()
+    
+    def get(self) -> Any:
+        """获取当前事件循环的连接（顺带清理已关闭事件循环的连接）"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            connection = self._connections.get(loop)
+            if connection is None:
+                for closed in [item for item in self._connections if item.is_closed()]:
+                    del self._connections[closed]
+                connection = self._connections[loop] = self._factory()
+            return connection
+
+
+class RedisTokenBucket:
+    """基于Redis的分布式令牌桶（多进程/多worker共享同一配额）"""
+    
+    def __init__(self, connection: Any, name: str, capacity: int,
+                 refill_amount: Optional[int] = None, refill_frequency: float = 60):
+        """
+        初始化分布式令牌桶
+        
+        Args:
+            connection: LoopLocalRedis（按事件循环取连接），或只在单个事件循环中使用的redis.asyncio.Redis连接
+            name: 桶名称（Redis键）
+            capacity: 桶容量（允许的突发请求数）
+            refill_amount: 每个周期补充的令牌数（默认等于容量）
+            refill_frequency: 补充周期（秒）
+        """
+        self.name = name
+        self.capacity = capacity
+        self.rate = (refill_amount or capacity) / refill_frequency
+        if isinstance(connection, LoopLocalRedis):
+            self._get_connection = connection.get
+        else:
+            self._get_connection = lambda: connection
+        # 事件循环 -> 注册在该循环连接上的限流脚本
+        self._scripts: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._scripts_lock = Lock()
+        # Redis不可用时回退到的进程内令牌桶状态（令牌数, 上次更新时间）
+        self._local_tokens = float(capacity)
+        self._local_ts = time.monotonic()
+        self._redis_failed = False
+    
+    def _get_script(self) -> Any:
+        """获取当前事件循环连接上的限流脚本"""
+        loop = asyncio.get_running_loop()
+        with self._scripts_lock:
+            script = self._scripts.get(loop)
+            if script is None:
+                script = self._scripts[loop] = self._get_connection().register_script(_TOKEN_BUCKET_SCRIPT)
+            return script
+    
+    async def acquire(self):
+        """取得一个令牌，配额不足时异步等待（不阻塞事件循环）；Redis出错时改用进程内限流"""
+        script = self._get_script()
+        while True:
+            try:
+                wait = float(await script(keys=[self.name], args=[self.capacity, self.rate]))
+            except RedisError as e:
+                if not self._redis_failed:
+                    self._redis_failed = True
+                    logger.warning(f"Redis限流不可用，回退到进程内限流 {self.name}: {e}")
+                await self._acquire_local()
+                return
+            if self._redis_failed:
+                self._redis_failed = False
+                logger.info(f"Redis限流已恢复 {self.name}")
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+    
+    async def _acquire_local(self):
+        """进程内令牌桶：先预占令牌，令牌为负时等待补足"""
+        now = time.monotonic()
+        self._local_tokens = min(self.capacity, self._local_tokens + (now - self._local_ts) * self.rate)
+        self._local_ts = now
+        self._local_tokens -= 1
+        if self._local_tokens < 0:
+            await asyncio.sleep(-self._local_tokens / self.rate)
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
 class APIRateLimiter:
     """API限流管理器"""
     
@@ -4,15 +4,31 @@
 """
 
 import json
+import math
+import mmap
+import os
+import re
 import yaml
 import uuid
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 from datetime import datetime
 import logging
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# 不小于该大小的JSON文件通过mmap解析（小文件直接读取更快）
+_MMAP_READ_THRESHOLD = 1024 * 1024
+
+# 19位及以上的连续数字可能超出orjson支持的64位整数范围（字符串中的长数字只会导致改用标准库）
+_LONG_NUMBER_PATTERN = re.compile(rb'\d{19,}')
+
 
 def generate_id() -> str:
     """
@@ -57,6 +73,9 @@ def safe_read_json(file_path: Union[str, Path], default: Dict = None) -> Dict[st
         return default
     
     try:
+        if ORJSON_AVAILABLE:
+            # orjson直接解析UTF-8字节，省去解码为str和纯Python层的开销
+            return _orjson_load_file(file_path) or default
         with open(file_path, 'r', encoding='utf-8') as f:
             return json.load(f) or default
     except Exception as e:
@@ -86,14 +105,87 @@ def safe_write_json(
     ensure_dir(file_path.parent)
     
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=indent, ensure_ascii=ensure_ascii)
+        file_path.write_bytes(dump_json_bytes(data, indent, ensure_ascii))
         return True
     except Exception as e:
         logger.error(f"写入JSON文件失败 {file_path}: {e}")
         return False
 
 
+def _orjson_load_file(file_path: Path) -> Any:
+    """用orjson解析JSON文件；大文件直接解析mmap映射的页面，不再复制出完整的bytes"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < _MMAP_READ_THRESHOLD:
+            return load_json_bytes(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return load_json_bytes(view)
+
+
+def _has_non_finite_float(data: Any) -> bool:
+    """数据中是否含NaN/±Infinity（orjson会把它们静默写成null）"""
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if not math.isfinite(item):
+                return True
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return False
+
+
+def dump_json_bytes(
+    data: Any,
+    indent: Optional[int] = 2,
+    ensure_ascii: bool = False,
+    default: Optional[Callable[[Any], Any]] = None
+) -> bytes:
+    """
+    序列化为UTF-8 JSON字节（优先使用orjson）
+    
+    orjson仅支持2空格缩进且总是输出非ASCII字符，其他格式要求、
+    含NaN/±Infinity（orjson会写成null）或orjson无法序列化的数据
+    （如超过64位的整数）回退到标准库json。两者输出的数据等价，
+    但浮点数的文本形式可能不同（如orjson写1e16，标准库写1e+16）。
+    
+    Args:
+        data: 要序列化的数据
+        indent: 缩进空格数（None为紧凑格式）
+        ensure_ascii: 是否确保ASCII编码
+        default: 无法直接序列化的对象的转换函数
+    
+    Returns:
+        JSON字节串
+    """
+    if ORJSON_AVAILABLE and not ensure_ascii and indent in (None, 2) and not _has_non_finite_float(data):
+        option = orjson.OPT_NON_STR_KEYS
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(data, default=default, option=option)
+        except orjson.JSONEncodeError:
+            pass  # 含orjson不支持的类型时回退到标准库
+    return json.dumps(data, indent=indent, ensure_ascii=ensure_ascii, default=default).encode('utf-8')
+
+
+def load_json_bytes(payload: Union[bytes, memoryview]) -> Any:
+    """
+    解析UTF-8 JSON字节（优先使用orjson）
+    
+    orjson不接受NaN/Infinity，且会把超过64位的整数解析为浮点数；
+    解析失败或含可能超出64位的长数字时回退到标准库json，结果与标准库一致。
+    """
+    if ORJSON_AVAILABLE and _LONG_NUMBER_PATTERN.search(payload) is None:
+        try:
+            return orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(bytes(payload).decode('utf-8'))
+
+
 def safe_read_yaml(file_path: Union[str, Path], default: Dict = None) -> Dict[str, Any]:
     """
     安全读取YAML文件
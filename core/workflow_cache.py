@@ -0,0 +1,193 @@
+"""
+创作工作流结果缓存
+按分块内容哈希缓存确定性工具的分析结果，避免重复运行时对未修改章节重新计算
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .cache_manager import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# 缓存格式/评分逻辑版本，计入缓存键；工具的评分逻辑变化时递增，使旧结果失效
+CACHE_VERSION = "1"
+
+
+class WorkflowCache:
+    """基于内容哈希的工作流缓存（JSON Lines 持久化，LRU 限制条目数）"""
+
+    def __init__(self, cache_dir: str = "output", filename: str = "workflow_cache.jsonl",
+                 max_entries: int = 4096):
+        """
+        初始化工作流缓存
+
+        Args:
+            cache_dir: 缓存目录（通常为记忆体输出目录）
+            filename: 缓存文件名
+            max_entries: 最多保留的缓存条目数（超出时淘汰最久未用的条目）
+        """
+        self.cache_path = Path(cache_dir) / filename
+        self.max_entries = max_entries
+        # 键 -> 结果的JSON文本；命中时反序列化，调用方拿到的总是独立副本
+        self._entries = LRUCache(max_entries)
+        self._lock = Lock()
+        # 缓存文件中的记录行数（含重复与已淘汰的条目），过多时压缩
+        self._file_lines = 0
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @staticmethod
+    def make_key(tool_name: str, text: str, params: Optional[Dict[str, Any]] = None,
+                 version: str = CACHE_VERSION) -> str:
+        """根据缓存版本、工具名、输入文本与参数生成缓存键"""
+        params_json = json.dumps(params or {}, sort_keys=True, ensure_ascii=False, default=str)
+        digest = hashlib.sha256()
+        for part in (version, tool_name, params_json):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _load(self):
+        """从磁盘加载已有缓存条目，文件中有重复、残缺或超出容量的记录时压缩"""
+        if not self.cache_path.exists():
+            return
+        lines = 0
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    lines += 1
+                    try:
+                        record = json.loads(line)
+                        key = record["key"]
+                        value = record["value"]
+                    except (json.JSONDecodeError, KeyError, TypeError):
+                        # 跳过写入中断留下的残缺行
+                        continue
+                    self._entries.set(key, json.dumps(value, ensure_ascii=False))
+        except Exception as e:
+            logger.warning(f"加载工作流缓存失败 {self.cache_path}: {e}")
+            return
+
+        self._file_lines = lines
+        if lines > len(self._entries):
+            self._compact()
+
+    def _snapshot(self) -> Iterable[Tuple[str, str]]:
+        """当前条目的快照（按最近使用顺序）"""
+        with self._entries.lock:
+            return list(self._entries.cache.items())
+
+    def _compact(self):
+        """只保留内存中的条目重写缓存文件（先写临时文件再替换）"""
+        entries = self._snapshot()
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for key, serialized in entries:
+                    f.write(f'{{"key": {json.dumps(key)}, "value": {serialized}}}\n')
+            os.replace(tmp_path, self.cache_path)
+            self._file_lines = len(entries)
+        except Exception as e:
+            logger.warning(f"压缩工作流缓存失败 {self.cache_path}: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+    def _append(self, key: str, serialized: str):
+        """追加一条缓存记录到磁盘，记录数超过容量两倍时压缩"""
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_path, "a", encoding="utf-8") as f:
+                f.write(f'{{"key": {json.dumps(key)}, "value": {serialized}}}\n')
+            self._file_lines += 1
+        except Exception as e:
+            logger.warning(f"写入工作流缓存失败 {self.cache_path}: {e}")
+            return
+        if self._file_lines > 2 * self.max_entries:
+            self._compact()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        查询缓存（计入命中统计）
+
+        Returns:
+            缓存值的独立副本，未命中返回None
+        """
+        with self._lock:
+            serialized = self._entries.get(key)
+            if serialized is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(serialized)
+
+    def set(self, key: str, value: Any) -> bool:
+        """
+        写入缓存（内存与磁盘）
+
+        Returns:
+            是否已缓存；无法序列化为JSON的结果不缓存
+        """
+        return self._store(key, value) is not None
+
+    def _store(self, key: str, value: Any) -> Optional[str]:
+        """序列化并写入缓存，返回JSON文本；无法序列化时返回None"""
+        try:
+            serialized = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"工作流结果无法序列化为JSON，不缓存: {e}")
+            return None
+        self._entries.set(key, serialized)
+        self._append(key, serialized)
+        return serialized
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        命中则返回缓存值，否则计算并写入缓存
+
+        结果按JSON往返后返回（命中与未命中类型一致，各次调用互不共享对象）；
+        无法序列化为JSON的结果不缓存，直接返回。
+
+        Args:
+            key: 缓存键（见 make_key）
+            compute: 未命中时调用的计算函数
+
+        Returns:
+            缓存或新计算的结果
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        value = compute()
+        serialized = self._store(key, value)
+        return value if serialized is None else json.loads(serialized)
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取命中统计"""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def clear(self):
+        """清空缓存（内存与磁盘）"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self._file_lines = 0
+        try:
+            if self.cache_path.exists():
+                self.cache_path.unlink()
+        except Exception as e:
+            logger.warning(f"清空工作流缓存失败 {self.cache_path}: {e}")
@@ -439,11 +439,8 @@ class IntegratedWorkflow(WorkflowBase):
                         memory_context += f"\n\n## 人物记忆体\n{character_content[:1000]}\n"
                 
                 # 伏笔追踪表
-                foreshadowing_file = self.memory_manager.output_dir / "05_伏笔追踪表.yaml"
-                if foreshadowing_file.exists():
-                    with open(foreshadowing_file, 'r', encoding='utf-8') as f:
-                        foreshadowing_content = f.read()
-                        memory_context += f"\n\n## 伏笔追踪表\n{foreshadowing_content[:500]}\n"
+                foreshadowing_content = self.memory_manager.foreshadowing_to_yaml()
+                memory_context += f"\n\n## 伏笔追踪表\n{foreshadowing_content[:500]}\n"
             except Exception as e:
                 logger.warning(f"读取记忆体失败: {e}")
         
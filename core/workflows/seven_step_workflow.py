@@ -446,11 +446,8 @@ class SevenStepWorkflow(WorkflowBase):
                     memory_context += f"\n\n人物记忆体：\n{str(characters)[:1000]}\n"
                 
                 # 获取伏笔追踪表（如果存在）
-                foreshadowing_file = self.memory_manager.output_dir / "05_伏笔追踪表.yaml"
-                if foreshadowing_file.exists():
-                    with open(foreshadowing_file, 'r', encoding='utf-8') as f:
-                        foreshadowing_content = f.read()
-                        memory_context += f"\n\n现有伏笔追踪表（用于参考）：\n{foreshadowing_content[:1000]}"
+                foreshadowing_content = self.memory_manager.foreshadowing_to_yaml()
+                memory_context += f"\n\n现有伏笔追踪表（用于参考）：\n{foreshadowing_content[:1000]}"
             except Exception as e:
                 logger.warning(f"读取记忆体失败: {e}")
         
@@ -543,14 +540,14 @@ class SevenStepWorkflow(WorkflowBase):
                                 f['id'] = f"{i+1:03d}"
                                 f['status'] = "未回收"
                         self.memory_manager.save_foreshadowing(foreshadowing_data)
-                        memory_files_created.append("05_伏笔追踪表.yaml")
+                        memory_files_created.append(self.memory_manager.foreshadowing_path.name)
                         logger.info(f"伏笔追踪表已创建，共 {len(foreshadowing_data)} 个伏笔")
                 except Exception as e:
                     logger.warning(f"解析伏笔YAML失败，保存为文本: {e}")
                     # 如果解析失败，尝试手动提取
                     foreshadowing_list = [{"伏笔内容": foreshadowing_result, "id": "001", "status": "未回收"}]
                     self.memory_manager.save_foreshadowing(foreshadowing_list)
-                    memory_files_created.append("05_伏笔追踪表.yaml")
+                    memory_files_created.append(self.memory_manager.foreshadowing_path.name)
                     
             except Exception as e:
                 logger.warning(f"创建记忆体失败: {e}，继续执行")
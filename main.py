@@ -51,7 +51,8 @@ def setup_logging(config: dict = None):
             log_file=log_file,
             max_bytes=max_bytes,
             backup_count=backup_count,
-            console_output=True
+            console_output=True,
+            use_queue=log_config.get("use_queue", True)
         )
     except ImportError:
         # 如果日志配置模块不可用，使用基本配置
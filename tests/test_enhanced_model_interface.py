@@ -0,0 +1,155 @@
+"""
+增强模型接口测试
+"""
+
+import asyncio
+import unittest
+from core.api_manager import APIPool, APIProvider
+from core.enhanced_model_interface import EnhancedLLMClient, create_enhanced_client_from_config
+
+
+class TestEnhancedLLMClient(unittest.TestCase):
+    """增强LLM客户端测试"""
+
+    def setUp(self):
+        """设置测试环境"""
+        self.client = EnhancedLLMClient(APIPool())
+        self.calls = []
+        self.release = None
+        self.error = None
+
+        async def fake_dispatch(prompt, system_prompt, *args):
+            self.calls.append(prompt)
+            await self.release.wait()
+            if self.error is not None:
+                raise self.error
+            return f"回答:{prompt}"
+
+        self.client._dispatch = fake_dispatch
+
+    def _run(self, coro_factory):
+        async def main():
+            self.release = asyncio.Event()
+            return await coro_factory()
+        return asyncio.run(main())
+
+    def test_concurrent_duplicates_merged(self):
+        """测试并发的相同请求只调用一次上游"""
+        async def scenario():
+            tasks = [asyncio.ensure_future(self.client.send_prompt_async("问题")) for _ in range(3)]
+            await asyncio.sleep(0)
+            self.release.set()
+            return await asyncio.gather(*tasks)
+
+        self.assertEqual(self._run(scenario), ["回答:问题"] * 3)
+        self.assertEqual(self.calls, ["问题"])
+        self.assertEqual(self.client._inflight, {})
+
+    def test_error_shared(self):
+        """测试上游异常传给所有合并的调用方"""
+        self.error = RuntimeError("上游失败")
+
+        async def scenario():
+            tasks = [asyncio.ensure_future(self.client.send_prompt_async("问题")) for _ in range(2)]
+            await asyncio.sleep(0)
+            self.release.set()
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = self._run(scenario)
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(len(self.calls), 1)
+
+    def test_leader_cancel_keeps_followers(self):
+        """测试取消首个调用方不影响合并进来的其他调用方"""
+        async def scenario():
+            leader = asyncio.ensure_future(self.client.send_prompt_async("问题"))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(self.client.send_prompt_async("问题"))
+            await asyncio.sleep(0)
+            leader.cancel()
+            await asyncio.sleep(0)
+            self.release.set()
+            return leader, await follower
+
+        leader, result = self._run(scenario)
+        self.assertTrue(leader.cancelled())
+        self.assertEqual(result, "回答:问题")
+        self.assertEqual(self.calls, ["问题"])
+
+    def test_response_cache_single_layer(self):
+        """测试响应缓存命中且不再使用API池缓存"""
+        client = EnhancedLLMClient(APIPool())
+        calls = []
+
+        async def fake_send_request(**kwargs):
+            calls.append(kwargs)
+            return "回答"
+
+        client.client.send_request = fake_send_request
+
+        async def scenario():
+            first = await client.send_prompt_async("问题", temperature=0)
+            second = await client.send_prompt_async("问题", temperature=0)
+            third = await client.send_prompt_async("问题", temperature=0.9)
+            return first, second, third
+
+        self.assertEqual(asyncio.run(scenario()), ("回答", "回答", "回答"))
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(all(call["use_cache"] is False for call in calls))
+        self.assertEqual(client.api_pool.cache, {})
+
+    def test_pool_cache_key_includes_model(self):
+        """测试API池缓存键区分提供商和模型"""
+        pool = APIPool()
+        self.assertNotEqual(
+            pool.get_cache_key("问题", "系统", APIProvider.OPENAI, "gpt-4"),
+            pool.get_cache_key("问题", "系统", APIProvider.DEEPSEEK, "deepseek-chat")
+        )
+
+    def test_sync_send_prompt_inside_running_loop(self):
+        """测试在运行中的事件循环内调用同步send_prompt"""
+        async def scenario():
+            self.release.set()
+            return self.client.send_prompt("问题")
+
+        self.assertEqual(self._run(scenario), "回答:问题")
+
+    def test_prompt_cache_key(self):
+        """测试仅支持前缀缓存的提供商收到稳定的系统提示词指纹"""
+        client = EnhancedLLMClient(APIPool(), response_cache_size=0)
+        keys = []
+
+        async def fake_send_request(**kwargs):
+            keys.append(kwargs["prompt_cache_key"])
+            return "回答"
+
+        client.client.send_request = fake_send_request
+
+        async def scenario():
+            await client.send_prompt_async("问题一", "系统", provider=APIProvider.OPENAI)
+            await client.send_prompt_async("问题二", "系统", provider=APIProvider.ANTHROPIC)
+            await client.send_prompt_async("问题三", "系统", provider=APIProvider.DEEPSEEK)
+            await client.send_prompt_async("问题四", "系统", use_prompt_cache=False)
+
+        asyncio.run(scenario())
+        self.assertIsNotNone(keys[0])
+        self.assertEqual(keys[0], keys[1])
+        self.assertEqual(keys[2:], [None, None])
+
+
+class TestCreateEnhancedClient(unittest.TestCase):
+    """从配置创建增强客户端测试"""
+
+    def test_default_provider_skips_unknown(self):
+        """测试默认提供商取第一个可解析的配置"""
+        client = create_enhanced_client_from_config([
+            {"provider": "unknown", "api_key": "k0"},
+            {"provider": "deepseek", "api_key": "k1"},
+            {"provider": "openai", "api_key": "k2"},
+        ])
+        self.assertEqual(client.default_provider, APIProvider.DEEPSEEK)
+        self.assertEqual(len(client.api_pool.apis), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@
 文件处理器测试
 """
 
+import asyncio
 import unittest
 import tempfile
 import shutil
@@ -48,6 +49,36 @@ class TestFileProcessor(unittest.TestCase):
         result = self.processor.read_yaml(file_path)
         self.assertEqual(result, data)
     
+    def test_async_read_write(self):
+        """测试异步读写"""
+        json_path = Path(self.temp_dir) / "test.json"
+        yaml_path = Path(self.temp_dir) / "test.yaml"
+        data = {"key": "值", "number": 123}
+        
+        async def run():
+            await self.processor.awrite_json(json_path, data)
+            await self.processor.awrite_yaml(yaml_path, data)
+            return (
+                await self.processor.aread_json(json_path, use_cache=False),
+                await self.processor.aread_yaml(yaml_path, use_cache=False),
+            )
+        
+        json_result, yaml_result = asyncio.run(run())
+        self.assertEqual(json_result, data)
+        self.assertEqual(yaml_result, data)
+    
+    def test_async_read_json_batch(self):
+        """测试异步批量读取（跳过失败文件）"""
+        paths = [Path(self.temp_dir) / f"batch_{i}.json" for i in range(3)]
+        for i, path in enumerate(paths):
+            self.processor.write_json(path, {"index": i})
+        missing = Path(self.temp_dir) / "missing.json"
+        
+        results = asyncio.run(self.processor.aread_json_batch(paths + [missing]))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[str(paths[2])], {"index": 2})
+        self.assertNotIn(str(missing), results)
+    
     def test_cache(self):
         """测试缓存功能"""
         file_path = Path(self.temp_dir) / "test.json"
@@ -74,6 +105,28 @@ class TestFileProcessor(unittest.TestCase):
         
         # 缓存应该已清除
         self.assertNotIn(str(file_path.absolute()), self.processor._cache)
+    
+    def test_json_nan_and_large_int(self):
+        """测试含NaN与超过64位整数的JSON读写与标准库一致"""
+        file_path = Path(self.temp_dir) / "special.json"
+        file_path.write_text('{"score": NaN, "id": 123456789012345678901234}', encoding='utf-8')
+        data = self.processor.read_json(file_path, use_cache=False)
+        self.assertNotEqual(data["score"], data["score"])
+        self.assertEqual(data["id"], 123456789012345678901234)
+        
+        self.processor.write_json(file_path, {"score": float("inf"), "id": 2 ** 70})
+        self.assertEqual(self.processor.read_json(file_path, use_cache=False),
+                         {"score": float("inf"), "id": 2 ** 70})
+        self.assertIn("Infinity", file_path.read_text(encoding='utf-8'))
+    
+    def test_path_locks_bounded(self):
+        """测试文件锁数量不随写入的文件数增长"""
+        for i in range(FileProcessor.PATH_LOCK_STRIPES * 2):
+            self.processor.write_json(Path(self.temp_dir) / f"{i}.json", {"i": i})
+        self.assertEqual(len(self.processor._path_locks), FileProcessor.PATH_LOCK_STRIPES)
+        
+        key = str((Path(self.temp_dir) / "0.json").absolute())
+        self.assertIs(self.processor._get_path_lock(key), self.processor._get_path_lock(key))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,93 @@
+"""
+Frankentexts语料库管理测试
+"""
+
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from core.frankentexts import FrankentextsManager
+
+
+class TestFrankentextsManager(unittest.TestCase):
+    """Frankentexts语料库管理器测试"""
+
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = FrankentextsManager(corpus_dir=self.temp_dir)
+        self.manager.vector_db = None
+
+    def tearDown(self):
+        """清理测试环境"""
+        self.manager.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _save(self, text, fragment_type, genre="玄幻"):
+        fragment = self.manager.extract_fragment(text, fragment_type, {"source": "test"})
+        self.manager.save_fragment(fragment, genre=genre)
+        return fragment
+
+    def test_fts_search(self):
+        """测试全文索引搜索"""
+        self._save("他拔出长剑，寒光一闪", "战斗")
+        self._save("湖面平静如镜", "环境描写", genre="言情")
+
+        results = self.manager.search_fragments("长剑")
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["text"], "他拔出长剑，寒光一闪")
+        self.assertEqual(results[0]["metadata"], {"source": "test"})
+
+        results = self.manager.search_fragments("平静如镜", genre="言情")
+        self.assertEqual(results[0]["type"], "环境描写")
+
+    def test_fts_search_filters_type(self):
+        """测试按片段类型过滤"""
+        self._save("剑光如雨", "战斗")
+        self._save("剑光映照湖面", "环境描写")
+
+        results = self.manager.get_fragments_by_type("环境描写")
+        self.assertEqual([r["text"] for r in results], ["剑光映照湖面"])
+
+    def test_file_search_fallback(self):
+        """测试无全文索引时回退到文件搜索"""
+        self.manager.close()
+        self._save("他拔出长剑，寒光一闪", "战斗")
+
+        results = self.manager.search_fragments("长剑")
+        self.assertEqual(len(results), 1)
+        self.assertIn("他拔出长剑", results[0]["text"])
+
+    def test_saved_fragment_on_disk(self):
+        """测试片段保存后无需flush即已写入语料文件"""
+        self._save("他拔出长剑，寒光一闪", "战斗")
+        corpus_file = self.manager.corpus_files["玄幻"]
+        self.assertIn("他拔出长剑", corpus_file.read_text(encoding="utf-8"))
+
+    def test_fts_index_backfilled_from_corpus(self):
+        """测试新建全文索引时导入已有语料文件"""
+        self.manager.close()
+        fragment = self.manager.extract_fragment("他拔出长剑，寒光一闪", "战斗", {"source": "test"})
+        self.manager.templateize_fragment(fragment, {"他": "{主角}"})
+        self.manager.save_fragment(fragment, genre="玄幻")
+        Path(self.temp_dir, "通用预料库.txt").write_text("手写的长剑样例", encoding="utf-8")
+        Path(self.temp_dir, "corpus.db").unlink()
+
+        self.manager = FrankentextsManager(corpus_dir=self.temp_dir)
+        self.manager.vector_db = None
+        results = self.manager._fts_search("长剑", None, None, 10)
+        by_id = {r["id"]: r for r in results}
+        self.assertEqual(len(results), 2)
+        self.assertEqual(by_id[fragment["id"]]["text"], "他拔出长剑，寒光一闪")
+        self.assertEqual(by_id[fragment["id"]]["type"], "战斗")
+        self.assertEqual(by_id[fragment["id"]]["metadata"], {"source": "test"})
+        self.assertEqual(by_id[fragment["id"]]["template"], "{主角}拔出长剑，寒光一闪")
+
+        # 已有索引不再重复导入
+        self.manager.close()
+        self.manager = FrankentextsManager(corpus_dir=self.temp_dir)
+        self.assertEqual(len(self.manager._fts_search("长剑", None, None, 10)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
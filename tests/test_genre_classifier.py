@@ -0,0 +1,95 @@
+"""
+小说类型分类器测试
+"""
+
+import re
+import unittest
+from unittest import mock
+from core.genre_classifier import (
+    GenreClassifier, GenreCategory, HYPERSCAN_AVAILABLE, get_default_classifier
+)
+
+
+class TestGenreClassifier(unittest.TestCase):
+    """小说类型分类器测试"""
+
+    def setUp(self):
+        """设置测试环境"""
+        self.classifier = GenreClassifier()
+
+    def test_classify_text(self):
+        """测试文本分类得分"""
+        scores = self.classifier.classify_text("他重生回到过去，前世的仇人还在，这辈子他要复仇")
+        self.assertEqual(len(scores), len(GenreCategory))
+        self.assertAlmostEqual(scores[GenreCategory.REBIRTH], 0.4)
+        self.assertGreater(scores[GenreCategory.REVENGE], 0)
+        self.assertEqual(scores[GenreCategory.CYBERPUNK], 0.0)
+
+    def test_score_saturates(self):
+        """测试得分上限为1"""
+        scores = self.classifier.classify_text("系统" * 20)
+        self.assertEqual(scores[GenreCategory.SYSTEM], 1.0)
+
+    def test_case_insensitive(self):
+        """测试英文关键词忽略大小写"""
+        scores = self.classifier.classify_text("这对cp太甜了，Cp感拉满")
+        self.assertAlmostEqual(scores[GenreCategory.CP_FOCUSED], 0.2)
+
+    def test_classify_text_cached(self):
+        """测试分类结果缓存"""
+        text = "末世来临，丧尸遍地"
+        first = self.classifier.classify_text(text)
+        first[GenreCategory.APOCALYPTIC] = 0.0
+        self.assertEqual(len(self.classifier._score_cache), 1)
+        second = self.classifier.classify_text(text)
+        self.assertGreater(second[GenreCategory.APOCALYPTIC], 0)
+        self.assertEqual(len(self.classifier._score_cache), 1)
+
+    def test_keyword_engine_matches_regex(self):
+        """测试关键词匹配器与正则路径的计数一致"""
+        text = "古代社会里，恋爱中的男女主心动不已，虐恋情深，CP感强，系统面板属性大增"
+        expected = {
+            genre: min(len(re.findall("(?:" + ")|(?:".join(patterns) + ")", text, re.IGNORECASE)) * 0.1, 1.0)
+            for genre, patterns in self.classifier.genre_patterns.items()
+        }
+
+        self.assertEqual(self.classifier.classify_text(text), expected)
+        with mock.patch("core.genre_classifier.AHOCORASICK_AVAILABLE", False):
+            if HYPERSCAN_AVAILABLE:
+                hyperscan_classifier = GenreClassifier()
+                self.assertIsNotNone(hyperscan_classifier._keyword_hs_db)
+                self.assertEqual(hyperscan_classifier.classify_text(text), expected)
+            with mock.patch("core.genre_classifier.HYPERSCAN_AVAILABLE", False):
+                trie_classifier = GenreClassifier()
+        self.assertIsNotNone(trie_classifier._keyword_trie_pattern)
+        self.assertEqual(trie_classifier.classify_text(text), expected)
+
+    def test_get_primary_genres(self):
+        """测试获取主要类型"""
+        primary = self.classifier.get_primary_genres("末世来临，丧尸遍地，他只想求生", top_k=2)
+        self.assertEqual(primary[0][0], GenreCategory.APOCALYPTIC)
+        self.assertLessEqual(len(primary), 2)
+        self.assertEqual(self.classifier.get_primary_genres("", top_k=3), [])
+
+    def test_classify_many(self):
+        """测试批量分类与逐条分类一致"""
+        texts = ["他重生回到过去", "", "末世来临，丧尸遍地", "系统" * 20]
+        scores = self.classifier.classify_many(texts)
+        self.assertEqual(scores.shape, (len(texts), len(GenreCategory)))
+        for row, text in zip(scores, texts):
+            self.assertEqual(row.tolist(), list(self.classifier.classify_text(text).values()))
+
+    def test_classify_tokens(self):
+        """测试按已分词的输入分类"""
+        scores = self.classifier.classify_tokens(["他", "重生", "回到", "前世", "Cp"])
+        self.assertAlmostEqual(scores[GenreCategory.REBIRTH], 0.2)
+        self.assertAlmostEqual(scores[GenreCategory.CP_FOCUSED], 0.1)
+        self.assertEqual(scores[GenreCategory.CYBERPUNK], 0.0)
+
+    def test_get_default_classifier(self):
+        """测试默认分类器单例"""
+        self.assertIs(get_default_classifier(), get_default_classifier())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Hook模型写作指导测试
+"""
+
+import unittest
+from unittest import mock
+from core.hook_model import HookModelGuide, HookStage
+
+
+class TestHookModelGuide(unittest.TestCase):
+    """Hook模型写作指导测试"""
+
+    def setUp(self):
+        """设置测试环境"""
+        self.guide = HookModelGuide()
+
+    def test_analyze_chapter(self):
+        """测试章节分析得分"""
+        content = "他突然发誓要逆袭，立刻动身，没想到竟有意外之喜"
+        scores = self.guide.analyze_chapter(content, 1)
+        self.assertAlmostEqual(scores[HookStage.TRIGGER], 2 / 8 * 3)
+        self.assertAlmostEqual(scores[HookStage.ACTION], 2 / 6 * 2)
+        self.assertAlmostEqual(scores[HookStage.REWARD], 2 / 6 * 2)
+        self.assertEqual(scores[HookStage.INVESTMENT], 0.2)
+
+        scores = self.guide.analyze_chapter(content, 100)
+        self.assertEqual(scores[HookStage.ACTION], 0.4)
+        self.assertEqual(scores[HookStage.INVESTMENT], 0.0)
+
+    def test_keyword_counted_once(self):
+        """测试关键词重复出现只计一次"""
+        scores = self.guide.analyze_chapter("逆袭" * 10, 1)
+        self.assertAlmostEqual(scores[HookStage.TRIGGER], 1 / 8 * 3)
+
+    def test_fallback_matches_automaton(self):
+        """测试未安装pyahocorasick时的回退路径结果一致"""
+        content = "渐渐地，他一步步积累成就，回忆起往日的羁绊，异变陡生"
+        with mock.patch("core.hook_model.AHOCORASICK_AVAILABLE", False):
+            fallback = HookModelGuide()
+        self.assertIsNone(fallback._keyword_automaton)
+        self.assertEqual(fallback.analyze_chapter(content, 30), self.guide.analyze_chapter(content, 30))
+
+    def test_fallback_overlapping_keywords(self):
+        """测试回退路径不漏掉相互重叠的关键词"""
+        keywords = {
+            HookStage.TRIGGER: ("意外", "意外之喜", "之喜欢"),
+            HookStage.ACTION: ("立刻",),
+            HookStage.REWARD: ("惊喜",),
+            HookStage.INVESTMENT: ("回忆",),
+        }
+        with mock.patch("core.hook_model._STAGE_KEYWORDS", keywords), \
+                mock.patch("core.hook_model.AHOCORASICK_AVAILABLE", False):
+            fallback = HookModelGuide()
+            self.assertEqual(set(fallback._overlapping_keywords), {"意外", "意外之喜", "之喜欢"})
+            scores = fallback.analyze_chapter("意外之喜欢，立刻", 1)
+        self.assertEqual(scores[HookStage.TRIGGER], 1.0)
+        self.assertEqual(scores[HookStage.ACTION], 1.0)
+        self.assertEqual(scores[HookStage.REWARD], 0.0)
+
+    def test_stage_scores_cached(self):
+        """测试同一章节重复分析时复用缓存"""
+        content = "他突然发誓要逆袭"
+        first = self.guide.analyze_chapter(content, 1)
+        first[HookStage.TRIGGER] = 0.0
+        with mock.patch.object(self.guide, "_score_all", wraps=self.guide._score_all) as score_all:
+            second = self.guide.analyze_chapter(content, 30)
+            self.guide.suggest_improvements(content, 1)
+        score_all.assert_not_called()
+        self.assertAlmostEqual(self.guide.analyze_chapter(content, 1)[HookStage.TRIGGER], 2 / 8 * 3)
+        self.assertAlmostEqual(second[HookStage.ACTION], 1 / 6 * 2)
+
+    def test_analyze_chapters(self):
+        """测试批量分析与逐章分析一致"""
+        contents = ["他突然发誓要逆袭", "渐渐地，他一步步积累成就", "平静的一天"]
+        numbers = [1, 30, 100]
+        self.assertEqual(
+            self.guide.analyze_chapters(contents, numbers),
+            [self.guide.analyze_chapter(c, n) for c, n in zip(contents, numbers)]
+        )
+        with self.assertRaises(ValueError):
+            self.guide.analyze_chapters(contents, numbers[:2])
+
+    def test_suggest_improvements(self):
+        """测试改进建议"""
+        suggestions = self.guide.suggest_improvements("平静的一天", 1)
+        self.assertIn("增加触发元素：加入冲突、悬念或情绪痛点", suggestions)
+
+
+if __name__ == '__main__':
+    unittest.main()
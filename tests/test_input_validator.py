@@ -3,7 +3,7 @@
 """
 
 import unittest
-from core.input_validator import InputValidator, ValidationError, PROJECT_SCHEMA, WORKFLOW_SCHEMA, CARD_SCHEMA
+from core.input_validator import InputValidator, ValidationError, CompiledSchema, PROJECT_SCHEMA, WORKFLOW_SCHEMA, CARD_SCHEMA
 
 
 class TestInputValidator(unittest.TestCase):
@@ -122,6 +122,22 @@ class TestInputValidator(unittest.TestCase):
                 'workflow_type': 'seven_step'
             }, WORKFLOW_SCHEMA)
 
+    
+    def test_compiled_schema(self):
+        """测试预编译schema"""
+        compiled = self.validator.compile_schema(PROJECT_SCHEMA)
+        self.assertIsInstance(compiled, CompiledSchema)
+        # 同一schema对象复用编译结果
+        self.assertIs(self.validator.compile_schema(PROJECT_SCHEMA), compiled)
+        
+        data = {'name': 'Test Project'}
+        self.assertEqual(
+            self.validator.validate(data, compiled),
+            self.validator.validate(data, PROJECT_SCHEMA)
+        )
+        with self.assertRaises(ValidationError):
+            self.validator.validate({'name': ''}, compiled)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,79 @@
+"""
+日志配置测试
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+from logging.handlers import QueueHandler
+from core.logging_config import setup_logging, shutdown_logging, get_queue_listener
+
+
+class TestLoggingConfig(unittest.TestCase):
+    """日志配置测试"""
+
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_file = os.path.join(self.temp_dir, "logs", "test.log")
+        root_logger = logging.getLogger()
+        self.saved_handlers = root_logger.handlers[:]
+        self.saved_level = root_logger.level
+
+    def tearDown(self):
+        """恢复根logger"""
+        shutdown_logging()
+        root_logger = logging.getLogger()
+        for handler in root_logger.handlers:
+            if handler not in self.saved_handlers:
+                handler.close()
+        root_logger.handlers[:] = self.saved_handlers
+        root_logger.setLevel(self.saved_level)
+        shutil.rmtree(self.temp_dir)
+
+    def _read_log(self):
+        with open(self.log_file, encoding="utf-8") as f:
+            return f.read()
+
+    def test_queue_logging(self):
+        """测试经队列由后台线程写日志"""
+        root_logger = setup_logging(log_file=self.log_file, console_output=False)
+        self.assertEqual(len(root_logger.handlers), 1)
+        self.assertIsInstance(root_logger.handlers[0], QueueHandler)
+        self.assertIsNotNone(get_queue_listener())
+
+        logging.getLogger("test").info("保存世界观记忆体")
+        logging.getLogger("test").debug("不应写入")
+        shutdown_logging()
+        self.assertIsNone(get_queue_listener())
+        content = self._read_log()
+        self.assertIn("保存世界观记忆体", content)
+        self.assertNotIn("不应写入", content)
+
+    def test_logging_after_shutdown(self):
+        """测试停止后台线程后日志仍写入实际处理器"""
+        root_logger = setup_logging(log_file=self.log_file, console_output=False)
+        shutdown_logging()
+        self.assertFalse(any(isinstance(h, QueueHandler) for h in root_logger.handlers))
+
+        logging.getLogger("test").warning("退出阶段的日志")
+        for handler in root_logger.handlers:
+            handler.flush()
+        self.assertIn("退出阶段的日志", self._read_log())
+
+    def test_direct_logging(self):
+        """测试关闭队列时直接写日志"""
+        root_logger = setup_logging(log_file=self.log_file, console_output=False, use_queue=False)
+        self.assertIsNone(get_queue_listener())
+        logging.getLogger("test").warning("直接写入")
+        for handler in root_logger.handlers:
+            handler.flush()
+        self.assertIn("直接写入", self._read_log())
+        for handler in root_logger.handlers:
+            handler.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
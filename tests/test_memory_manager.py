@@ -0,0 +1,158 @@
+"""
+记忆体管理器测试
+"""
+
+import math
+import os
+import stat
+import unittest
+import tempfile
+import shutil
+import yaml
+from unittest import mock
+from core.memory_manager import MemoryManager
+from core.utils import dump_json_bytes
+
+
+class TestMemoryManager(unittest.TestCase):
+    """记忆体管理器测试"""
+
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = MemoryManager(output_dir=self.temp_dir)
+
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_add_foreshadowing_ids(self):
+        """测试伏笔ID递增"""
+        self.manager.add_foreshadowing({"内容": "玉佩"})
+        self.manager.add_foreshadowing({"id": "010", "内容": "古剑"})
+        self.manager.add_foreshadowing({"内容": "密信"})
+
+        foreshadowings = MemoryManager(output_dir=self.temp_dir).load_foreshadowing()
+        self.assertEqual([f["id"] for f in foreshadowings], ["001", "010", "011"])
+        self.assertEqual(foreshadowings[0]["status"], "未回收")
+
+    def test_foreshadowing_id_after_external_change(self):
+        """测试伏笔追踪表被外部修改后重新计算下一个ID"""
+        self.manager.add_foreshadowing({"内容": "玉佩"})
+        self.manager.foreshadowing_path.write_bytes(dump_json_bytes([{"id": "050", "内容": "古剑"}]))
+        self.manager.add_foreshadowing({"内容": "密信"})
+        self.assertEqual([f["id"] for f in self.manager.load_foreshadowing()], ["050", "051"])
+
+    def test_batch_writes_once(self):
+        """测试批量模式退出时才写盘"""
+        with mock.patch("core.memory_manager.yaml.dump", wraps=yaml.dump) as dump, \
+                mock.patch("core.memory_manager.dump_json_bytes", wraps=dump_json_bytes) as dumps_json:
+            with self.manager.batch():
+                for i in range(5):
+                    self.manager.add_foreshadowing({"内容": f"伏笔{i}"})
+                self.manager.update_worldview({"力量体系": {"等级划分": ["练气", "筑基"]}})
+                self.assertEqual(dump.call_count + dumps_json.call_count, 0)
+                self.assertEqual(len(self.manager.load_foreshadowing()), 5)
+            self.assertEqual(dump.call_count, 1)
+            self.assertEqual(dumps_json.call_count, 1)
+
+        reloaded = MemoryManager(output_dir=self.temp_dir)
+        self.assertEqual(len(reloaded.load_foreshadowing()), 5)
+        self.assertEqual(reloaded.load_worldview()["力量体系"]["等级划分"], ["练气", "筑基"])
+
+    def test_failed_write_keeps_file(self):
+        """测试写入中途失败时保留原文件"""
+        self.manager.update_worldview({"地点": "青阳镇"})
+        with mock.patch("core.memory_manager.os.replace", side_effect=OSError("磁盘已满")):
+            with self.assertRaises(OSError):
+                self.manager.update_worldview({"地点": "天玄大陆"})
+        self.assertEqual(self.manager.load_worldview(), {"地点": "青阳镇"})
+        self.assertEqual(list(self.manager.output_dir.glob("*.tmp")), [])
+
+    def test_write_fsyncs_before_replace(self):
+        """测试替换前临时文件已落盘，且新文件权限与普通文件一致"""
+        events = []
+        real_fsync, real_replace = os.fsync, os.replace
+        with mock.patch("core.memory_manager.os.fsync",
+                        side_effect=lambda fd: (events.append("fsync"), real_fsync(fd))[1]), \
+                mock.patch("core.memory_manager.os.replace",
+                           side_effect=lambda a, b: (events.append("replace"), real_replace(a, b))[1]):
+            self.manager.update_worldview({"地点": "青阳镇"})
+        self.assertEqual(events, ["fsync", "replace"])
+
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = stat.S_IMODE(self.manager.worldview_path.stat().st_mode)
+        self.assertEqual(mode, 0o666 & ~umask)
+
+    def test_update_characters(self):
+        """测试批量更新多个人物只写盘一次"""
+        self.manager.update_character("林动", {"身份": "林家子弟"})
+        with mock.patch("core.memory_manager.yaml.dump", wraps=yaml.dump) as dump:
+            self.manager.update_characters({
+                "林动": {"MBTI类型": "ENFP"},
+                "应欢欢": {"身份": "道宗弟子"},
+            })
+        self.assertEqual(dump.call_count, 1)
+        characters = MemoryManager(output_dir=self.temp_dir).load_characters()
+        self.assertEqual(characters["林动"], {"身份": "林家子弟", "MBTI类型": "ENFP"})
+        self.assertEqual(characters["应欢欢"], {"身份": "道宗弟子"})
+
+    def test_load_returns_copy(self):
+        """测试修改加载结果不影响记忆体"""
+        self.manager.update_character("林动", {"MBTI类型": "ENFP"})
+        characters = self.manager.load_characters()
+        characters["林动"]["MBTI类型"] = "INTJ"
+        self.assertEqual(self.manager.load_characters()["林动"]["MBTI类型"], "ENFP")
+
+    def test_update_deep_merge(self):
+        """测试嵌套更新深度合并"""
+        self.manager.update_character("林动", {"能力": {"武学": {"等级": "地元境"}, "天赋": "祖石"}})
+        self.manager.update_character("林动", {"能力": {"武学": {"功法": ["通背拳"]}}})
+        self.assertEqual(self.manager.load_characters()["林动"]["能力"], {
+            "武学": {"等级": "地元境", "功法": ["通背拳"]}, "天赋": "祖石"
+        })
+
+    def test_reload_after_external_change(self):
+        """测试文件被外部修改后重新加载"""
+        self.manager.update_worldview({"地点": "青阳镇"})
+        self.manager.worldview_path.write_text("地点: 天玄大陆\n门派: 道宗\n", encoding="utf-8")
+        self.assertEqual(self.manager.load_worldview(), {"地点": "天玄大陆", "门派": "道宗"})
+
+    def test_foreshadowing_json_migration(self):
+        """测试伏笔追踪表从YAML迁移为JSON并导出YAML视图"""
+        legacy_dir = tempfile.mkdtemp(dir=self.temp_dir)
+        legacy = MemoryManager(output_dir=legacy_dir, use_json=False)
+        legacy.add_foreshadowing({"内容": "玉佩"})
+        self.assertEqual(legacy.foreshadowing_path.suffix, ".yaml")
+
+        migrated = MemoryManager(output_dir=legacy_dir)
+        self.assertTrue(migrated.foreshadowing_path.exists())
+        self.assertEqual(migrated.foreshadowing_path.suffix, ".json")
+        self.assertEqual(migrated.load_foreshadowing()[0]["内容"], "玉佩")
+        # 旧文件改名，不会被误当作仍在使用的伏笔追踪表继续编辑
+        self.assertFalse(migrated.foreshadowing_yaml_path.exists())
+        migrated_yaml = migrated.foreshadowing_yaml_path.with_name("05_伏笔追踪表.yaml.migrated")
+        self.assertEqual(yaml.safe_load(migrated_yaml.read_text(encoding="utf-8"))[0]["内容"], "玉佩")
+
+        migrated.add_foreshadowing({"内容": "古剑"})
+        view = yaml.safe_load(migrated.foreshadowing_to_yaml(write_file=True))
+        self.assertEqual([f["id"] for f in view], ["001", "002"])
+        self.assertEqual(yaml.safe_load(migrated.foreshadowing_yaml_path.read_text(encoding="utf-8")), view)
+
+    def test_foreshadowing_json_float_round_trip(self):
+        """测试JSON伏笔追踪表中的浮点数（含NaN/Infinity）与大整数读写后不变"""
+        table = [{"id": "001", "内容": "玉佩", "权重": 0.1, "热度": 1e16,
+                  "进度": float("inf"), "评分": float("nan"), "字数": 2 ** 70}]
+        self.manager.save_foreshadowing(table)
+
+        loaded = MemoryManager(output_dir=self.temp_dir).load_foreshadowing()[0]
+        self.assertTrue(math.isnan(loaded.pop("评分")))
+        expected = dict(table[0])
+        expected.pop("评分")
+        self.assertEqual(loaded, expected)
+        self.assertIsInstance(loaded["字数"], int)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+数据迁移工具测试
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from core.migration_tool import MigrationTool
+
+
+class TestMigrationTool(unittest.TestCase):
+    """数据迁移工具测试"""
+
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.tool = MigrationTool(backup_dir=self.temp_dir / "backups")
+
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_backup_directory(self):
+        """测试目录备份保留完整结构"""
+        project = self.temp_dir / "project"
+        (project / "chapters" / "vol1").mkdir(parents=True)
+        (project / "empty").mkdir()
+        (project / "config.yaml").write_text("name: 测试", encoding="utf-8")
+        for i in range(5):
+            (project / "chapters" / "vol1" / f"{i}.txt").write_text(f"第{i}章", encoding="utf-8")
+
+        backup = self.tool.backup_data(project)
+        self.assertEqual(backup, self.temp_dir / "backups" / "project")
+        self.assertEqual((backup / "config.yaml").read_text(encoding="utf-8"), "name: 测试")
+        self.assertEqual(len(list((backup / "chapters" / "vol1").iterdir())), 5)
+        self.assertTrue((backup / "empty").is_dir())
+
+    def test_migrate_card_format(self):
+        """测试卡片格式迁移"""
+        card = self.temp_dir / "cards" / "card1"
+        card.mkdir(parents=True)
+        (card / "card.json").write_text(json.dumps({"名称": "林动"}), encoding="utf-8")
+
+        with self.assertLogs("core.migration_tool", level="INFO") as logs:
+            self.assertEqual(self.tool.migrate_all_cards(card.parent), {"card1": True})
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("1/1", logs.output[0])
+        card_data = json.loads((card / "card.json").read_text(encoding="utf-8"))
+        self.assertEqual(card_data["version"], "2.0")
+        self.assertEqual(card_data["名称"], "林动")
+        self.assertTrue((self.temp_dir / "backups" / "card1" / "card.json").exists())
+
+    def test_migrate_all_projects_parallel(self):
+        """测试并发迁移与串行迁移结果一致"""
+        projects_dir = self.temp_dir / "projects"
+        for i in range(6):
+            project = projects_dir / f"project{i}"
+            project.mkdir(parents=True)
+            if i % 2 == 0:
+                (project / "config.yaml").write_text(f"name: 项目{i}", encoding="utf-8")
+
+        expected = {f"project{i}": i % 2 == 0 for i in range(6)}
+        self.assertEqual(self.tool.migrate_all_projects(projects_dir, max_workers=4), expected)
+        self.assertEqual(self.tool.migrate_all_projects(projects_dir, max_workers=1), expected)
+        for i in range(6):
+            self.assertTrue((self.temp_dir / "backups" / f"project{i}").is_dir())
+
+    def test_migration_report(self):
+        """测试迁移报告在备份目录变化后更新"""
+        report = self.tool.get_migration_report()
+        self.assertTrue(report["backup_exists"])
+        self.assertEqual(report["backup_files"], [])
+
+        source = self.temp_dir / "card.json"
+        source.write_text("{}", encoding="utf-8")
+        self.tool.backup_data(source)
+        report = self.tool.get_migration_report()
+        self.assertEqual(report["backup_files"], [self.temp_dir / "backups" / "card.json"])
+
+        shutil.rmtree(self.tool.backup_dir)
+        self.assertFalse(self.tool.get_migration_report()["backup_exists"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+模型接口测试
+"""
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from core.model_interface import OpenAIClient, _get_shared_async_http_client
+
+
+def _completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class TestOpenAIClient(unittest.TestCase):
+    """OpenAI客户端测试"""
+
+    def setUp(self):
+        """设置测试环境"""
+        self.client = OpenAIClient(api_key="test-key", base_url="http://localhost:1/v1")
+        # 响应缓存按(API地址, 模型)进程内共享，各测试之间先清空
+        self.client._response_cache.clear()
+
+    def test_deterministic_response_cached(self):
+        """测试temperature为0的相同请求只调用一次API"""
+        with mock.patch.object(self.client.client.chat.completions, "create",
+                               return_value=_completion("回答")) as create:
+            self.assertEqual(self.client.send_prompt("问题", "系统", temperature=0), "回答")
+            self.assertEqual(self.client.send_prompt("问题", "系统", temperature=0), "回答")
+            self.client.send_prompt("问题", "另一个系统", temperature=0)
+        self.assertEqual(create.call_count, 2)
+
+    def test_response_cache_shared_per_model(self):
+        """测试同一API地址、模型和密钥的客户端共享响应缓存，不同密钥或模型不共享"""
+        same = OpenAIClient(api_key="test-key", base_url="http://localhost:1/v1")
+        other_key = OpenAIClient(api_key="other-key", base_url="http://localhost:1/v1")
+        other_model = OpenAIClient(api_key="test-key", model="gpt-4o", base_url="http://localhost:1/v1")
+        other_key._response_cache.clear()
+        other_model._response_cache.clear()
+        with mock.patch.object(self.client.client.chat.completions, "create",
+                               return_value=_completion("回答")):
+            self.client.send_prompt("问题", temperature=0)
+        with mock.patch.object(same.client.chat.completions, "create") as create:
+            self.assertEqual(same.send_prompt("问题", temperature=0), "回答")
+        create.assert_not_called()
+        for client in (other_key, other_model):
+            with mock.patch.object(client.client.chat.completions, "create",
+                                   return_value=_completion("另一个回答")) as create:
+                self.assertEqual(client.send_prompt("问题", temperature=0), "另一个回答")
+            create.assert_called_once()
+
+    def test_sampling_response_not_cached(self):
+        """测试采样请求不使用缓存"""
+        with mock.patch.object(self.client.client.chat.completions, "create",
+                               return_value=_completion("回答")) as create:
+            self.client.send_prompt("问题")
+            self.client.send_prompt("问题")
+            self.client.send_prompt("问题", temperature=0.7)
+        self.assertEqual(create.call_count, 3)
+
+    def test_async_client_per_event_loop(self):
+        """测试异步客户端按事件循环复用，事件循环结束时关闭连接池"""
+        async def get_clients():
+            first = self.client._get_async_client()
+            self.assertIs(self.client._get_async_client(), first)
+            http_client = _get_shared_async_http_client()
+            await asyncio.sleep(0)
+            return first, http_client
+
+        first, first_http = asyncio.run(get_clients())
+        second, second_http = asyncio.run(get_clients())
+        self.assertIsNot(first, second)
+        self.assertIsNot(first_http, second_http)
+        self.assertTrue(first_http.is_closed)
+        self.assertTrue(second_http.is_closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+多Agent协同管理器测试
+"""
+
+import asyncio
+import unittest
+from core.multi_agent_coordinator import MultiAgentCoordinator, AgentRole, _STRATEGIES
+
+
+class TestMultiAgentCoordinator(unittest.TestCase):
+    """多Agent协同管理器测试"""
+
+    def test_same_priority_uses_distinct_apis(self):
+        """测试同一优先级内的Agent不共享API"""
+        for apis, strategy in _STRATEGIES.items():
+            seen = set()
+            for assignment in strategy["assignments"]:
+                key = (assignment.priority, assignment.api_index)
+                self.assertNotIn(key, seen, f"{apis}个API的策略中优先级{assignment.priority}重复使用API")
+                seen.add(key)
+
+    def test_assignment_lookups(self):
+        """测试API与并行分组查询"""
+        coordinator = MultiAgentCoordinator(object(), 3)
+        self.assertEqual(coordinator.get_api_for_agent(AgentRole.EXTRACTOR), "api_2")
+        self.assertIsNone(coordinator.get_api_for_agent(AgentRole.ARCHIVIST))
+        self.assertEqual(
+            coordinator.get_parallel_agents(1),
+            [AgentRole.READER, AgentRole.ANALYST, AgentRole.EXTRACTOR]
+        )
+        self.assertEqual(coordinator.get_parallel_agents(5), [])
+
+    def test_execute_agents_parallel(self):
+        """测试按优先级执行且各Agent上下文互不影响"""
+        coordinator = MultiAgentCoordinator(object(), 2)
+        order = []
+
+        def make_task(role):
+            async def task(ctx):
+                order.append(role)
+                ctx["seen"] = role
+                return ctx["api_name"], ctx["text"]
+            return task
+
+        context = {"text": "正文"}
+        roles = [AgentRole.WRITER, AgentRole.READER, AgentRole.ANALYST]
+        results = asyncio.run(coordinator.execute_agents_parallel(
+            {role: make_task(role) for role in roles}, context
+        ))
+
+        self.assertEqual(order, [AgentRole.READER, AgentRole.ANALYST, AgentRole.WRITER])
+        self.assertEqual(results[AgentRole.ANALYST], ("api_1", "正文"))
+        self.assertEqual(results[AgentRole.WRITER], ("api_1", "正文"))
+        self.assertEqual(context, {"text": "正文"})
+
+    def test_strategy_info(self):
+        """测试策略信息"""
+        coordinator = MultiAgentCoordinator(object(), 9)
+        info = coordinator.get_strategy_info()
+        self.assertEqual(info["available_apis"], 5)
+        self.assertEqual(len(info["assignments"]), 8)
+        info["extra"] = True
+        self.assertNotIn("extra", coordinator.get_strategy_info())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,9 +2,11 @@
 限流器测试
 """
 
+import asyncio
 import unittest
 import time
-from core.rate_limiter import RateLimiter, APIRateLimiter
+from unittest import mock
+from core.rate_limiter import RateLimiter, APIRateLimiter, RedisTokenBucket, RedisError, LoopLocalRedis
 
 
 class TestRateLimiter(unittest.TestCase):
@@ -51,6 +53,89 @@ class TestRateLimiter(unittest.TestCase):
         self.assertEqual(remaining, 2)
 
 
+class FakeRedis:
+    """只实现register_script的假Redis连接，脚本依次返回给定结果"""
+    
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = 0
+    
+    def register_script(self, script):
+        async def run(keys, args):
+            self.calls += 1
+            result = self.results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return run
+
+
+class LoopBoundFakeRedis:
+    """模拟redis.asyncio：连接绑定首次使用它的事件循环，换循环使用时报错"""
+    
+    def __init__(self):
+        self.loop = None
+    
+    def register_script(self, script):
+        async def run(keys, args):
+            loop = asyncio.get_running_loop()
+            if self.loop is None:
+                self.loop = loop
+            elif self.loop is not loop:
+                raise RuntimeError("Event loop is closed")
+            return b"0"
+        return run
+
+
+class TestRedisTokenBucket(unittest.TestCase):
+    """Redis分布式令牌桶测试"""
+    
+    def test_waits_for_script_wait_time(self):
+        """测试脚本返回等待时间时等待后重试"""
+        connection = FakeRedis([b"0.25", b"0"])
+        bucket = RedisTokenBucket(connection, name="llm:openai", capacity=1)
+        with mock.patch("core.rate_limiter.asyncio.sleep", new=mock.AsyncMock()) as sleep:
+            asyncio.run(bucket.acquire())
+        sleep.assert_awaited_once_with(0.25)
+        self.assertEqual(connection.calls, 2)
+    
+    def test_acquire_from_different_event_loops(self):
+        """测试在不同事件循环中取令牌时各用各的连接"""
+        created = []
+        
+        def factory():
+            created.append(LoopBoundFakeRedis())
+            return created[-1]
+        
+        connections = LoopLocalRedis(factory)
+        first = RedisTokenBucket(connections, name="llm:openai", capacity=1)
+        second = RedisTokenBucket(connections, name="llm:deepseek", capacity=1)
+        
+        async def acquire_both():
+            await first.acquire()
+            await second.acquire()
+        
+        asyncio.run(acquire_both())
+        asyncio.run(acquire_both())
+        # 同一事件循环内的桶共用一个连接，每个事件循环各一个
+        self.assertEqual(len(created), 2)
+    
+    def test_falls_back_to_local_limit_on_redis_error(self):
+        """测试Redis出错时回退到进程内令牌桶"""
+        connection = FakeRedis([RedisError("connection refused")] * 3)
+        bucket = RedisTokenBucket(connection, name="llm:openai", capacity=2, refill_frequency=60)
+        with mock.patch("core.rate_limiter.asyncio.sleep", new=mock.AsyncMock()) as sleep, \
+                self.assertLogs("core.rate_limiter", level="WARNING") as logs:
+            async def acquire_three():
+                for _ in range(3):
+                    await bucket.acquire()
+            asyncio.run(acquire_three())
+        # 容量2：前两次立即取得，第三次等待约一个令牌的补充时间（60秒/2个）
+        sleep.assert_awaited_once()
+        self.assertAlmostEqual(sleep.await_args.args[0], 30, delta=0.5)
+        self.assertEqual(len(logs.records), 1)
+
+
 if __name__ == '__main__':
     unittest.main()
 
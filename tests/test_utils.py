@@ -7,8 +7,10 @@ from core.utils import (
     generate_id, ensure_dir, safe_read_json, safe_write_json,
     safe_read_yaml, safe_write_yaml, get_timestamp, merge_dicts,
     deep_merge_dicts, validate_uuid, sanitize_filename, chunk_list,
-    flatten_dict, safe_get, format_file_size, truncate_string
+    flatten_dict, safe_get, format_file_size, truncate_string,
+    dump_json_bytes, load_json_bytes
 )
+import json
 import tempfile
 import shutil
 from pathlib import Path
@@ -55,6 +57,50 @@ class TestUtils(unittest.TestCase):
         result = safe_read_json(Path(self.temp_dir) / "nonexistent.json", default={})
         self.assertEqual(result, {})
     
+    def test_safe_read_large_json(self):
+        """测试读取超过mmap阈值的大JSON文件"""
+        file_path = Path(self.temp_dir) / "large.json"
+        data = {"chapters": ["第一章" * 100] * 2000}
+        self.assertTrue(safe_write_json(file_path, data))
+        self.assertGreater(file_path.stat().st_size, 1024 * 1024)
+        self.assertEqual(safe_read_json(file_path), data)
+    
+    def test_dump_json_bytes(self):
+        """测试JSON序列化辅助函数与标准库输出一致"""
+        data = {"标题": "第一章", "章节": [1, 2]}
+        self.assertEqual(load_json_bytes(dump_json_bytes(data)), data)
+        self.assertEqual(
+            dump_json_bytes(data, indent=4, ensure_ascii=True),
+            json.dumps(data, indent=4, ensure_ascii=True).encode('utf-8')
+        )
+        # orjson与标准库都无法直接序列化集合，由default转换
+        self.assertEqual(load_json_bytes(dump_json_bytes({"ids": {3}}, default=sorted)), {"ids": [3]})
+    
+    def test_json_bytes_match_stdlib_values(self):
+        """测试NaN/Infinity、超过64位的整数与浮点数的读写结果与标准库一致"""
+        data = {"nan": float("nan"), "inf": float("-inf"), "big": 2 ** 70,
+                "neg": -(2 ** 63) - 1, "float": 1e16, "small": 1.5e-7}
+        payload = dump_json_bytes(data)
+        self.assertIn(b"NaN", payload)
+        self.assertIn(b"-Infinity", payload)
+        result = load_json_bytes(payload)
+        self.assertNotEqual(result["nan"], result["nan"])
+        self.assertEqual({k: v for k, v in result.items() if k != "nan"},
+                         {k: v for k, v in data.items() if k != "nan"})
+        self.assertIsInstance(result["neg"], int)
+        
+        # 解析与标准库相同
+        raw = b'{"a": NaN, "b": 123456789012345678901234, "c": [1e16, 0.1]}'
+        self.assertEqual(repr(load_json_bytes(raw)), repr(json.loads(raw)))
+    
+    def test_safe_read_json_with_nan(self):
+        """测试含NaN的JSON文件仍能读取（不返回默认值）"""
+        file_path = Path(self.temp_dir) / "card.json"
+        file_path.write_text('{"name": "林动", "score": NaN}', encoding='utf-8')
+        result = safe_read_json(file_path)
+        self.assertEqual(result["name"], "林动")
+        self.assertNotEqual(result["score"], result["score"])
+    
     def test_safe_read_write_yaml(self):
         """测试安全YAML读写"""
         file_path = Path(self.temp_dir) / "test.yaml"
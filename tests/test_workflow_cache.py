@@ -0,0 +1,108 @@
+"""
+工作流缓存测试
+"""
+
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from core.workflow_cache import WorkflowCache
+
+
+class TestWorkflowCache(unittest.TestCase):
+    """工作流缓存测试"""
+
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_make_key_depends_on_inputs(self):
+        """测试缓存键随工具、文本和参数变化"""
+        key = WorkflowCache.make_key("tool", "文本", {"a": 1})
+        self.assertEqual(key, WorkflowCache.make_key("tool", "文本", {"a": 1}))
+        self.assertNotEqual(key, WorkflowCache.make_key("other", "文本", {"a": 1}))
+        self.assertNotEqual(key, WorkflowCache.make_key("tool", "文本2", {"a": 1}))
+        self.assertNotEqual(key, WorkflowCache.make_key("tool", "文本", {"a": 2}))
+
+    def test_get_or_compute_hits_after_first_call(self):
+        """测试首次计算后命中缓存"""
+        cache = WorkflowCache(self.temp_dir)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"score": 0.5}
+
+        key = WorkflowCache.make_key("tool", "章节内容")
+        self.assertEqual(cache.get_or_compute(key, compute), {"score": 0.5})
+        self.assertEqual(cache.get_or_compute(key, compute), {"score": 0.5})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.get_stats()["hits"], 1)
+        self.assertEqual(cache.get_stats()["misses"], 1)
+
+    def test_persisted_across_instances(self):
+        """测试缓存持久化到磁盘"""
+        key = WorkflowCache.make_key("tool", "章节内容")
+        WorkflowCache(self.temp_dir).get_or_compute(key, lambda: {"score": 0.8})
+
+        reloaded = WorkflowCache(self.temp_dir)
+        value = reloaded.get_or_compute(key, lambda: self.fail("不应重新计算"))
+        self.assertEqual(value, {"score": 0.8})
+
+    def test_make_key_depends_on_version(self):
+        """测试缓存版本变化时缓存键失效"""
+        self.assertNotEqual(
+            WorkflowCache.make_key("tool", "文本", version="1"),
+            WorkflowCache.make_key("tool", "文本", version="2"),
+        )
+
+    def test_hit_returns_independent_copy(self):
+        """测试命中返回独立副本，调用方修改不影响缓存"""
+        cache = WorkflowCache(self.temp_dir)
+        key = WorkflowCache.make_key("tool", "章节内容")
+        first = cache.get_or_compute(key, lambda: {"issues": ["a"]})
+        first["issues"].append("b")
+
+        second = cache.get_or_compute(key, lambda: self.fail("不应重新计算"))
+        self.assertEqual(second, {"issues": ["a"]})
+
+    def test_non_json_value_not_cached(self):
+        """测试无法序列化为JSON的结果直接返回且不缓存"""
+        cache = WorkflowCache(self.temp_dir)
+        key = WorkflowCache.make_key("tool", "章节内容")
+        value = {"items": {1, 2}}
+        self.assertIs(cache.get_or_compute(key, lambda: value), value)
+        self.assertEqual(cache.get_stats()["size"], 0)
+        self.assertFalse(cache.cache_path.exists())
+
+    def test_max_entries_bounds_cache_and_file(self):
+        """测试条目数受限，超限记录在加载时被压缩掉"""
+        cache = WorkflowCache(self.temp_dir, max_entries=2)
+        keys = [WorkflowCache.make_key("tool", f"章节{i}") for i in range(5)]
+        for i, key in enumerate(keys):
+            cache.get_or_compute(key, lambda i=i: {"score": i})
+        self.assertEqual(cache.get_stats()["size"], 2)
+
+        reloaded = WorkflowCache(self.temp_dir, max_entries=2)
+        self.assertEqual(reloaded.get_stats()["size"], 2)
+        lines = Path(reloaded.cache_path).read_text(encoding="utf-8").splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(reloaded.get_or_compute(keys[-1], lambda: self.fail("不应重新计算")), {"score": 4})
+
+    def test_get_and_set(self):
+        """测试按键查询与写入（未命中返回None并计入统计）"""
+        cache = WorkflowCache(self.temp_dir)
+        key = WorkflowCache.make_key("tool", "第一章")
+        self.assertIsNone(cache.get(key))
+        self.assertTrue(cache.set(key, 0.75))
+        self.assertEqual(cache.get(key), 0.75)
+        self.assertFalse(cache.set(key, {1, 2}))
+        self.assertEqual(cache.get_stats(), {"hits": 1, "misses": 1, "size": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,6 +13,9 @@ logger = logging.getLogger(__name__)
 class EmotionCurveOptimizer:
     """情感曲线优化器"""
     
+    # 章节评分是纯函数，可按章节分发到多进程执行
+    PARALLELIZABLE = True
+    
     def __init__(self):
         self.emotion_keywords = self._build_emotion_keywords()
         self.curve_patterns = self._build_curve_patterns()
@@ -35,19 +38,27 @@ class EmotionCurveOptimizer:
             "roller_coaster": [0.5, 0.8, 0.3, 0.9, 0.4, 1.0, 0.6, 0.95]  # 过山车式
         }
     
-    def analyze_emotion_curve(self, chapters: List[Dict]) -> Dict:
+    def score_chapter(self, content: str) -> float:
+        """计算单个章节的情感分数"""
+        return self._calculate_emotion_score(content)
+    
+    def analyze_emotion_curve(self, chapters: List[Dict],
+                              chapter_scores: Optional[List[float]] = None) -> Dict:
         """
         分析情感曲线
         Args:
             chapters: 章节列表，每个章节包含content
+            chapter_scores: 预先计算好的章节情感分数（可选）
         Returns:
             情感曲线分析结果
         """
         emotion_scores = []
         
         for i, chapter in enumerate(chapters):
-            content = chapter.get("content", "")
-            score = self._calculate_emotion_score(content)
+            if chapter_scores is not None:
+                score = chapter_scores[i]
+            else:
+                score = self._calculate_emotion_score(chapter.get("content", ""))
             emotion_scores.append({
                 "chapter": i + 1,
                 "score": score,
@@ -77,17 +88,19 @@ class EmotionCurveOptimizer:
         }
     
     def optimize_emotion_curve(self, chapters: List[Dict], 
-                               target_pattern: str = "wave") -> List[Dict]:
+                               target_pattern: str = "wave",
+                               chapter_scores: Optional[List[float]] = None) -> List[Dict]:
         """
         优化情感曲线
         Args:
             chapters: 章节列表
             target_pattern: 目标曲线模式
+            chapter_scores: 预先计算好的章节情感分数（可选）
         """
         target_curve = self.curve_patterns.get(target_pattern, self.curve_patterns["wave"])
         
         # 分析当前曲线
-        analysis = self.analyze_emotion_curve(chapters)
+        analysis = self.analyze_emotion_curve(chapters, chapter_scores=chapter_scores)
         current_scores = [s["score"] for s in analysis["emotion_scores"]]
         
         # 调整章节情感强度
@@ -111,10 +124,16 @@ class EmotionCurveOptimizer:
         
         return optimized_chapters
 
-    def get_curve_dashboard(self, chapters: List[Dict], target_pattern: str = "wave") -> Dict:
+    def get_curve_dashboard(self, chapters: List[Dict], target_pattern: str = "wave",
+                            chapter_scores: Optional[List[float]] = None) -> Dict:
         """生成参数化仪表盘数据"""
-        analysis = self.analyze_emotion_curve(chapters)
-        optimized = self.optimize_emotion_curve(chapters, target_pattern=target_pattern)
+        if chapter_scores is None:
+            # 分析与优化共用同一份章节分数
+            chapter_scores = [self.score_chapter(chapter.get("content", "")) for chapter in chapters]
+        analysis = self.analyze_emotion_curve(chapters, chapter_scores=chapter_scores)
+        optimized = self.optimize_emotion_curve(
+            chapters, target_pattern=target_pattern, chapter_scores=chapter_scores
+        )
         return {
             "analysis": analysis,
             "optimized_plan": optimized,